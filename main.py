@@ -1,164 +1,432 @@
-import os
+"""Ponto de entrada do ETL Vetorial.
+
+Modos de execução:
+  daemon    (padrão) processo residente; cada conta roda no seu intervalo
+            (agenda adaptativa) ou todas a cada N horas (--interval-hours)
+  run-once  um único ciclo e sai (cron, Swarm job, Kubernetes CronJob);
+            com --due-only, só as contas vencidas na agenda adaptativa
+  --queue   (daemon/run-once) as contas viram jobs numa fila no Postgres,
+            consumida com FOR UPDATE SKIP LOCKED: N réplicas dividem as
+            contas sem processar a mesma conta duas vezes
+  backfill  reprocessa um intervalo de datas fixo, em janelas de N dias
+  replay    reprocessa payloads brutos salvos (.jsonl/.json), sem chamar a API
+  rollup    reconstrói os rollups (conta/campanha/plataforma × dia) a partir
+            da tabela fato; os ciclos já os atualizam só nas datas gravadas
+  export-parquet  regrava o Parquet (conta × mês) a partir da tabela fato;
+            com ETL_PARQUET_EXPORT=1 os ciclos já exportam as linhas alteradas
+  migrate-dimensions  move os nomes de conta/campanha/anúncio de uma tabela
+            fato antiga para as dimensões (e, com --drop-columns, tira da fato)
+
+Os modos de disparo único devolvem código de saída 0 (ok), 1 (alguma conta
+falhou) ou 2 (ciclo quebrou), para o agendador externo detectar falhas. Como
+o processo termina ao fim do ciclo, a memória do pandas/SDK é devolvida ao
+sistema entre execuções.
+
+Uso:
+    python main.py run-once --accounts act_123,act_456 --skip-instagram
+    python main.py run-once --since 2026-01-01 --until 2026-01-31
+    python main.py backfill --since 2025-07-01 --until 2025-12-31 --window-days 30
+    python main.py replay data/raw/20260213_080000 --accounts act_123
+    python main.py run-once --due-only          # cron a cada 15 min
+    python main.py daemon                       # agenda adaptativa
+    python main.py daemon --interval-hours 4    # ciclo fixo (antigo)
+    python main.py daemon --queue               # N réplicas dividindo as contas
+    python main.py run-once --profile account_daily   # totais conta/dia (leve)
+    python main.py rollup --since 2025-01-01    # primeira carga dos rollups
+    python main.py export-parquet --since 2025-01-01  # primeira carga do Parquet
+    python main.py migrate-dimensions --drop-columns  # fato só com IDs
+"""
+
+import argparse
+import sys
 import time
-import schedule
-from datetime import datetime
+from datetime import date, timedelta
+
 from dotenv import load_dotenv
-import pandas as pd
-from sqlalchemy.dialects.postgresql import insert
 
-# Importando Módulos
-from src.ingestion.extractor import MetaExtractor
-from src.ingestion.ig_profile_extractor import InstagramProfileExtractor
-from src.transformation.cleaner import DataCleaner
-from src.load.postgres_loader import PostgresLoader
-from src.notification.discord_alert import DiscordAlert
+from src.ingestion.profiles import BASE_PROFILE, PROFILES, get_profile
 
 # Configuração
 load_dotenv()
-ACCOUNTS = os.getenv("META_AD_ACCOUNT_IDS", "").split(",")
-IG_ACCOUNT_IDS = os.getenv("META_IG_ACCOUNT_IDS", "").split(
-    ","
-)  # <--- Agora é uma lista!
-DATE_PRESET = "last_30d"
-META_ACCESS_TOKEN = os.getenv("META_ACCESS_TOKEN")
 
-# Instancia o Alerta globalmente para usar no script
-alert = DiscordAlert()
+EXIT_OK, EXIT_ERRO_CONTA, EXIT_CRASH = 0, 1, 2
+
 
+def _ids(value: str) -> list[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
 
-def run_etl_pipeline():
-    start_time = datetime.now()
-    print("\n" + "=" * 60)
-    print(f"🏭 COVIL LABS - ETL PIPELINE - {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
-    print("=" * 60)
 
+def _dia(value: str) -> date:
     try:
-        # Inicializa Workers globais
-        cleaner = DataCleaner()
-        loader = PostgresLoader()
-
-        total_processado = 0
-        erros_lista = []
-
-        # ==========================================
-        # 1. BLOCO DE ANÚNCIOS (META ADS)
-        # ==========================================
-        for account_id in ACCOUNTS:
-            acc_id = account_id.strip()
-            if not acc_id:
-                continue
-
-            print(f"\n🚀 Conta Ads: {acc_id}")
-
-            try:
-                # Extração
-                extractor = MetaExtractor(acc_id)
-                raw_data = extractor.get_ad_insights(date_preset=DATE_PRESET)
-
-                if not raw_data:
-                    print("⚠️ Sem dados (pausado/sem gasto).")
-                    continue
-
-                # Transformação e Carga
-                clean_df = cleaner.transform(raw_data)
-                loader.upsert_data(clean_df, raw_data)
-
-                total_processado += len(clean_df)
-                print("✅ Conta finalizada.")
-                time.sleep(2)
-
-            except Exception as e:
-                erro_msg = f"Falha na conta Ads {acc_id}: {e}"
-                print(f"❌ {erro_msg}")
-                erros_lista.append(erro_msg)
-
-        # ==========================================
-        # 2. BLOCO DE SEGUIDORES (INSTAGRAM MULTI-CONTA)
-        # ==========================================
-        seguidores_salvos = 0
-
-        print("\n📱 Iniciando Extração de Seguidores do Instagram...")
-        for ig_id_raw in IG_ACCOUNT_IDS:
-            ig_id = ig_id_raw.strip()
-            if not ig_id:
-                continue
-
-            print(f"\n   🔎 Extraindo IG ID: {ig_id}...")
-            try:
-                ig_extractor = InstagramProfileExtractor(
-                    access_token=META_ACCESS_TOKEN, ig_account_id=ig_id
-                )
-                df_seguidores = ig_extractor.get_daily_followers()
-
-                if not df_seguidores.empty:
-                    # Lógica de UPSERT com Chave Primária Composta
-                    with loader.engine.connect() as conn:
-                        data_values = df_seguidores.to_dict(orient="records")
-                        stmt = insert(
-                            pd.io.sql.get_schema(df_seguidores, "instagram_crescimento")
-                        ).values(data_values)
-
-                        # Atualiza caso rode mais de uma vez no mesmo dia para a MESMA conta
-                        on_conflict_stmt = stmt.on_conflict_do_update(
-                            index_elements=[
-                                "ig_account_id",
-                                "data_registro",
-                            ],  # <--- A mágica da chave composta
-                            set_={"seguidores_ganhos": stmt.excluded.seguidores_ganhos},
-                        )
-
-                        conn.execute(on_conflict_stmt)
-                        conn.commit()
-
-                    seguidores_salvos += len(df_seguidores)
-                    print(f"   ✅ Seguidores da conta {ig_id} atualizados com sucesso.")
-                else:
-                    print(f"   ⚠️ Nenhum dado retornado para a conta {ig_id} hoje.")
-
-            except Exception as e:
-                erro_msg = f"Falha na extração do Instagram {ig_id}: {e}"
-                print(f"   ❌ {erro_msg}")
-                erros_lista.append(erro_msg)
-
-        if seguidores_salvos == 0 and not any(ig.strip() for ig in IG_ACCOUNT_IDS):
-            print(
-                "⚠️ Nenhuma conta de Instagram configurada no .env (META_IG_ACCOUNT_IDS)."
-            )
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"data inválida '{value}' (use AAAA-MM-DD)")
+
 
-        # ==========================================
-        # 3. RELATÓRIO FINAL E ALERTAS
-        # ==========================================
-        end_time = datetime.now()
-        duration = end_time - start_time
-
-        msg_final = (
-            f"**Ciclo Finalizado!**\n"
-            f"⏱️ Duração: {duration}\n"
-            f"📊 Anúncios Salvos: {total_processado} linhas\n"
-            f"📈 IG Contas Salvas: {seguidores_salvos}"
+def exit_code(record) -> int:
+    # Contas adiadas por prazo não são falha: entram primeiro no próximo ciclo
+    if record is None:
+        return EXIT_CRASH
+    if any(m["status"] not in ("ok", "adiada") for m in record.accounts.values()):
+        return EXIT_ERRO_CONTA
+    return EXIT_OK
+
+
+def pipeline_kwargs(args) -> dict:
+    """Traduz os filtros comuns da CLI para os argumentos de run_etl_pipeline."""
+    kwargs = {
+        "accounts": args.accounts,
+        "ig_accounts": [] if args.skip_instagram else args.ig_accounts,
+        "raw_dir": args.save_raw,
+    }
+    if args.profile:
+        kwargs["profile"] = args.profile
+    if getattr(args, "date_preset", None):
+        kwargs["date_preset"] = args.date_preset
+    if args.cycle_deadline_min is not None:
+        kwargs["cycle_deadline_s"] = args.cycle_deadline_min * 60 or None
+    if args.account_deadline_min is not None:
+        kwargs["account_deadline_s"] = args.account_deadline_min * 60 or None
+    return kwargs
+
+
+def cmd_run_once(args) -> int:
+    from src.pipeline import run_due_accounts, run_etl_pipeline
+
+    kwargs = pipeline_kwargs(args)
+    if args.queue:
+        from src.pipeline import run_queue_worker
+        from src.scheduling.adaptive import AdaptiveScheduler
+
+        scheduler = AdaptiveScheduler() if args.due_only else None
+        return exit_code(
+            run_queue_worker(interval_min=args.cycle_minutes, scheduler=scheduler, **kwargs)
         )
-        print(f"\n🏁 {msg_final}")
+    if args.due_only:
+        return exit_code(run_due_accounts(**kwargs))
+    if args.since:
+        kwargs["time_range"] = {
+            "since": args.since.isoformat(),
+            "until": (args.until or date.today()).isoformat(),
+        }
+    return exit_code(run_etl_pipeline(**kwargs))
 
-        if erros_lista:
-            detalhes = "\n".join(erros_lista)
-            alert.send(
-                f"{msg_final}\n\n**Erros Encontrados:**\n{detalhes}", level="error"
-            )
+
+def cmd_backfill(args) -> int:
+    from src.pipeline import date_windows, run_etl_pipeline
+
+    kwargs = pipeline_kwargs(args)
+    # Backfill é sob demanda: sem prazo de ciclo (salvo se pedido) e sem carry-over
+    kwargs.setdefault("cycle_deadline_s", None)
+    kwargs["carry_over"] = False
+    pior = EXIT_OK
+    for inicio, fim in date_windows(args.since, args.until, args.window_days):
+        dias = [inicio + timedelta(days=d) for d in range((fim - inicio).days + 1)]
+        record = run_etl_pipeline(
+            time_range={"since": inicio.isoformat(), "until": fim.isoformat()},
+            ig_days=dias,
+            **kwargs,
+        )
+        pior = max(pior, exit_code(record))
+        if record is not None and record.deferred:
+            # Sem carry-over aqui: janela incompleta precisa ser refeita à mão
+            print(f"⚠️ Janela {inicio} → {fim} incompleta, contas adiadas: {record.deferred}")
+            pior = max(pior, EXIT_ERRO_CONTA)
+    return pior
+
+
+def cmd_replay(args) -> int:
+    from src.pipeline import replay_raw
+
+    record = replay_raw(
+        args.path,
+        accounts=args.accounts,
+        since=args.since.isoformat() if args.since else None,
+        until=args.until.isoformat() if args.until else None,
+        profile=args.profile,
+    )
+    return exit_code(record)
+
+
+def cmd_rollup(args) -> int:
+    from src.analysis.rollups import refresh_rollups, source_ranges
+    from src.load.postgres_loader import PostgresLoader
+
+    try:
+        engine = PostgresLoader().engine
+        fatias = source_ranges(
+            engine,
+            accounts=args.accounts,
+            since=args.since.isoformat() if args.since else None,
+            until=args.until.isoformat() if args.until else None,
+        )
+        if not fatias:
+            print("⚠️ [Rollups] Nenhuma linha na tabela fato para o filtro.")
+            return EXIT_OK
+        inicio = time.perf_counter()
+        linhas = refresh_rollups(engine, fatias)
+    except Exception as e:
+        print(f"❌ [Rollups] Falha ao reconstruir rollups: {e}")
+        return EXIT_CRASH
+    for nome, total in linhas.items():
+        print(f"🧮 [Rollups] {nome}: {total} linhas")
+    print(f"✅ {len(fatias)} contas reconstruídas em {time.perf_counter() - inicio:.2f}s")
+    return EXIT_OK
+
+
+def cmd_export_parquet(args) -> int:
+    from src.load.parquet_exporter import ParquetExporter
+    from src.load.postgres_loader import PostgresLoader
+
+    perfil = get_profile(args.profile)
+    try:
+        loader = PostgresLoader.for_profile(perfil)
+        exporter = ParquetExporter.for_profile(perfil)
+        inicio, linhas, particoes = time.perf_counter(), 0, set()
+        for chunk in loader.iter_rows(
+            accounts=args.accounts,
+            since=args.since.isoformat() if args.since else None,
+            until=args.until.isoformat() if args.until else None,
+        ):
+            particoes.update(exporter.export(chunk))
+            linhas += len(chunk)
+    except Exception as e:
+        print(f"❌ [Parquet] Falha ao exportar: {e}")
+        return EXIT_CRASH
+    if not linhas:
+        print("⚠️ [Parquet] Nenhuma linha na tabela para o filtro.")
+        return EXIT_OK
+    print(
+        f"✅ [Parquet] {linhas} linhas em {len(particoes)} partições ({exporter.root}) "
+        f"em {time.perf_counter() - inicio:.2f}s"
+    )
+    return EXIT_OK
+
+
+def cmd_daemon(args) -> int:
+    import schedule
+
+    from src.pipeline import run_etl_pipeline
+    from src.utils.metrics import start_metrics_server
+
+    kwargs = pipeline_kwargs(args)
+    start_metrics_server()
+
+    if args.queue:
+        from src.pipeline import run_queue_worker
+        from src.scheduling.adaptive import AdaptiveScheduler
+
+        # Réplicas concorrentes: cada uma enfileira o ciclo e consome a fila
+        if args.interval_hours:
+            scheduler, interval_min = None, args.interval_hours * 60
         else:
-            # alert.send(msg_final, level="info") # Descomente se quiser receber notificação a cada ciclo bem sucedido
-            pass
+            scheduler, interval_min = AdaptiveScheduler(), max(1, args.tick_seconds // 60)
+        print(f"🕰️ Iniciando worker de fila (verificação a cada {args.tick_seconds}s)...")
+        while True:
+            run_queue_worker(interval_min=interval_min, scheduler=scheduler, **kwargs)
+            time.sleep(args.tick_seconds)
 
-    except Exception as e_critico:
-        msg_crash = f"💥 O ETL PAROU COMPLETAMENTE!\nErro: {str(e_critico)}"
-        print(msg_crash)
-        alert.send(msg_crash, level="error")
+    if args.interval_hours:
+        print(f"🕰️ Iniciando Scheduler ({args.interval_hours} em {args.interval_hours} horas)...")
+        run_etl_pipeline(**kwargs)
+        schedule.every(args.interval_hours).hours.do(run_etl_pipeline, **kwargs)
+        print("💤 Aguardando próximo ciclo...")
+        while True:
+            schedule.run_pending()
+            time.sleep(60)
 
+    from src.pipeline import run_due_accounts
+    from src.scheduling.adaptive import AdaptiveScheduler
 
-if __name__ == "__main__":
-    print("🕰️ Iniciando Scheduler (4 em 4 horas)...")
-    run_etl_pipeline()
-    schedule.every(4).hours.do(run_etl_pipeline)
-    print("💤 Aguardando próximo ciclo...")
+    # Agenda adaptativa: a cada tick roda só as contas cujo intervalo venceu
+    scheduler = AdaptiveScheduler()
+    print(f"🕰️ Iniciando Scheduler adaptativo (verificação a cada {args.tick_seconds}s)...")
     while True:
-        schedule.run_pending()
-        time.sleep(60)
+        record = run_due_accounts(scheduler, **kwargs)
+        if record is not None and record.accounts:
+            print("💤 Aguardando próximas contas vencidas...")
+        time.sleep(args.tick_seconds)
+
+
+def cmd_migrate_dimensions(args) -> int:
+    from src.load.postgres_loader import PostgresLoader
+
+    loader = PostgresLoader.for_profile(get_profile(args.profile))
+    try:
+        inicio = time.perf_counter()
+        resultado = loader.migrate_dimensions(drop_columns=args.drop_columns)
+    except Exception as e:
+        print(f"❌ [Dimensões] Falha na migração: {e}")
+        return EXIT_CRASH
+    print(
+        f"✅ [Dimensões] {loader.table}: {resultado['contas']} contas, "
+        f"{resultado['campanhas']} campanhas e {resultado['anuncios']} anúncios preenchidos, "
+        f"{resultado['colunas_removidas']} colunas de nome removidas "
+        f"em {time.perf_counter() - inicio:.2f}s"
+    )
+    if resultado["anuncios_sem_campanha"]:
+        print(
+            f"⚠️ [Dimensões] {resultado['anuncios_sem_campanha']} anúncios ainda sem "
+            "campaign_id: a coluna campanha fica na fato até uma carga (ou backfill) "
+            "gravá-los"
+        )
+    return EXIT_OK
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="ETL Vetorial - Meta Ads → PostgreSQL",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split("Uso:")[1],
+    )
+    sub = parser.add_subparsers(dest="command")
+
+    # Filtros compartilhados pelos modos que falam com a API
+    filtros = argparse.ArgumentParser(add_help=False)
+    filtros.add_argument(
+        "--accounts", type=_ids, help="Contas Ads (act_1,act_2); padrão META_AD_ACCOUNT_IDS"
+    )
+    filtros.add_argument(
+        "--ig-accounts", type=_ids, help="Contas IG; padrão META_IG_ACCOUNT_IDS"
+    )
+    filtros.add_argument(
+        "--skip-instagram", action="store_true", help="Não extrai seguidores do IG"
+    )
+    filtros.add_argument(
+        "--save-raw", metavar="DIR", help="Grava o payload bruto por conta (para replay)"
+    )
+    filtros.add_argument(
+        "--profile",
+        choices=list(PROFILES),
+        help="Perfil de extração: campos/level/breakdowns e tabela (padrão ETL_EXTRACTION_PROFILE)",
+    )
+    filtros.add_argument(
+        "--cycle-deadline-min",
+        type=float,
+        help="Prazo do ciclo (padrão ETL_CYCLE_DEADLINE_MIN=210; 0 = sem limite)",
+    )
+    filtros.add_argument(
+        "--account-deadline-min",
+        type=float,
+        help="Prazo de extração por conta (padrão ETL_ACCOUNT_DEADLINE_MIN=30; 0 = sem limite)",
+    )
+
+    daemon = sub.add_parser("daemon", parents=[filtros], help="Processo residente (padrão)")
+    daemon.add_argument(
+        "--interval-hours", type=int, help="Ciclo fixo de N horas (desliga a agenda adaptativa)"
+    )
+    daemon.add_argument(
+        "--tick-seconds", type=int, default=60, help="Verificação da agenda adaptativa"
+    )
+    daemon.add_argument("--date-preset", help="Janela da API (padrão last_30d)")
+    daemon.add_argument(
+        "--queue",
+        action="store_true",
+        help="Fila no Postgres (SKIP LOCKED): várias réplicas dividem as contas",
+    )
+    daemon.set_defaults(func=cmd_daemon)
+
+    once = sub.add_parser("run-once", parents=[filtros], help="Um ciclo e sai")
+    once.add_argument("--date-preset", help="Janela da API (padrão last_30d)")
+    once.add_argument("--since", type=_dia, help="Início da janela fixa (AAAA-MM-DD)")
+    once.add_argument("--until", type=_dia, help="Fim da janela fixa (padrão: hoje)")
+    once.add_argument(
+        "--due-only", action="store_true", help="Só as contas vencidas na agenda adaptativa"
+    )
+    once.add_argument(
+        "--queue",
+        action="store_true",
+        help="Fila no Postgres (SKIP LOCKED): várias réplicas dividem as contas",
+    )
+    once.add_argument(
+        "--cycle-minutes",
+        type=int,
+        default=240,
+        help="Com --queue: janela que identifica o ciclo (réplicas na mesma janela dividem as contas)",
+    )
+    once.set_defaults(func=cmd_run_once)
+
+    backfill = sub.add_parser("backfill", parents=[filtros], help="Intervalo histórico")
+    backfill.add_argument("--since", type=_dia, required=True)
+    backfill.add_argument("--until", type=_dia, default=date.today() - timedelta(days=1))
+    backfill.add_argument(
+        "--window-days", type=int, default=30, help="Dias por chamada à API (padrão 30)"
+    )
+    backfill.set_defaults(func=cmd_backfill)
+
+    replay = sub.add_parser("replay", help="Reprocessa payloads brutos salvos")
+    replay.add_argument("path", help="Arquivo .jsonl/.json ou diretório (um por conta)")
+    replay.add_argument("--accounts", type=_ids, help="Só essas contas")
+    replay.add_argument("--since", type=_dia, help="Descarta linhas antes desta data")
+    replay.add_argument("--until", type=_dia, help="Descarta linhas depois desta data")
+    replay.add_argument(
+        "--profile", choices=list(PROFILES), help="Perfil com que o payload foi extraído"
+    )
+    replay.set_defaults(func=cmd_replay)
+
+    rollup = sub.add_parser("rollup", help="Reconstrói os rollups a partir da tabela fato")
+    rollup.add_argument("--accounts", type=_ids, help="Só essas contas")
+    rollup.add_argument("--since", type=_dia, help="Primeira data (padrão: todo o histórico)")
+    rollup.add_argument("--until", type=_dia, help="Última data")
+    rollup.set_defaults(func=cmd_rollup)
+
+    export = sub.add_parser(
+        "export-parquet", help="Regrava o Parquet (conta × mês) a partir da tabela"
+    )
+    export.add_argument("--accounts", type=_ids, help="Só essas contas")
+    export.add_argument("--since", type=_dia, help="Primeira data (padrão: todo o histórico)")
+    export.add_argument("--until", type=_dia, help="Última data")
+    export.add_argument(
+        "--profile", choices=list(PROFILES), help="Perfil (tabela) a exportar"
+    )
+    export.set_defaults(func=cmd_export_parquet)
+
+    migrate = sub.add_parser(
+        "migrate-dimensions", help="Move os nomes da tabela fato para as dimensões"
+    )
+    migrate.add_argument(
+        "--profile", choices=list(PROFILES), help="Perfil (tabela) a migrar"
+    )
+    migrate.add_argument(
+        "--drop-columns",
+        action="store_true",
+        help="Remove da fato nome_conta/campanha/anuncio depois de preencher as dimensões",
+    )
+    migrate.set_defaults(func=cmd_migrate_dimensions)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    argv = sys.argv[1:] if argv is None else argv
+    # Sem subcomando = processo residente (compatível com o CMD antigo do Docker)
+    if not argv or argv[0].startswith("-") and argv[0] not in ("-h", "--help"):
+        argv = ["daemon", *argv]
+    args = parser.parse_args(argv)
+
+    if getattr(args, "since", None) and getattr(args, "until", None):
+        if args.since > args.until:
+            parser.error("--since deve ser anterior ou igual a --until")
+    if args.command == "run-once" and args.until and not args.since:
+        parser.error("--until exige --since")
+    if args.command == "run-once" and args.due_only and args.since:
+        parser.error("--due-only não combina com --since/--until")
+    if args.command == "run-once" and args.queue and args.since:
+        parser.error("--queue não combina com --since/--until (use backfill)")
+    # Agenda adaptativa, carry-over e fila são do perfil granular
+    if get_profile(getattr(args, "profile", None))["nome"] != BASE_PROFILE:
+        agenda = args.command == "daemon" and not args.interval_hours
+        if agenda or getattr(args, "due_only", False) or getattr(args, "queue", False):
+            parser.error(
+                "perfis leves não usam agenda adaptativa nem fila "
+                "(use run-once/backfill ou daemon --interval-hours)"
+            )
+    if getattr(args, "window_days", 1) < 1:
+        parser.error("--window-days deve ser >= 1")
+
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
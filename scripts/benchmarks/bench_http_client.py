@@ -0,0 +1,143 @@
+"""Latência por requisição: requests.get avulso vs sessão compartilhada.
+
+Sobe fake_graph_api.py em background e faz N chamadas sequenciais ao mesmo
+endpoint do Instagram (o que o InstagramProfileExtractor chama por conta)
+de duas formas: requests.get/post sem sessão (uma conexão nova por chamada,
+como era antes) e src.utils.http.get_session() (keep-alive no pool). Com
+--tls o servidor atende em HTTPS com certificado autoassinado (gerado via
+openssl), que é onde o handshake por chamada mais pesa.
+
+Também reporta o tamanho de uma página de insights com e sem gzip.
+
+Uso:
+    python scripts/benchmarks/bench_http_client.py --calls 300 --tls
+"""
+
+import argparse
+import os
+import shutil
+import ssl
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from fake_graph_api import FakeGraphConfig, start_server
+
+
+def self_signed_cert(pasta: str) -> tuple[str, str]:
+    """Gera cert/chave autoassinados para 127.0.0.1 (precisa do openssl)."""
+    cert, key = os.path.join(pasta, "cert.pem"), os.path.join(pasta, "key.pem")
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+            "-keyout", key, "-out", cert, "-days", "1",
+            "-subj", "/CN=127.0.0.1", "-addext", "subjectAltName=IP:127.0.0.1",
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return cert, key
+
+
+def measure(get, url: str, params: dict, calls: int, **kwargs) -> list[float]:
+    """Latência (ms) de cada chamada, em sequência."""
+    latencias = []
+    for _ in range(calls):
+        inicio = time.perf_counter()
+        response = get(url, params=params, **kwargs)
+        response.raise_for_status()
+        response.content
+        latencias.append((time.perf_counter() - inicio) * 1000)
+    return latencias
+
+
+def resumo(latencias: list[float]) -> dict:
+    ordenadas = sorted(latencias)
+    return {
+        "media": statistics.fmean(ordenadas),
+        "p50": ordenadas[len(ordenadas) // 2],
+        "p95": ordenadas[int(len(ordenadas) * 0.95) - 1],
+    }
+
+
+def payload_bytes(session, url: str, params: dict, encoding: str, **kwargs) -> int:
+    """Bytes trafegados (antes de descomprimir) para um Accept-Encoding."""
+    response = session.get(
+        url, params=params, headers={"Accept-Encoding": encoding}, stream=True, **kwargs
+    )
+    bruto = response.raw.read(decode_content=False)
+    response.close()
+    return len(bruto)
+
+
+def run(args) -> None:
+    import requests
+
+    from src.utils.http import get_session
+
+    config = FakeGraphConfig(
+        ads=args.ads, latency_ms=args.latency_ms, calls_per_minute=1_000_000
+    )
+    server = start_server(0, config)
+    esquema, extra, pasta = "http", {}, None
+    if args.tls:
+        if not shutil.which("openssl"):
+            sys.exit("❌ --tls precisa do openssl no PATH")
+        pasta = tempfile.mkdtemp()
+        cert, key = self_signed_cert(pasta)
+        contexto = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        contexto.load_cert_chain(cert, key)
+        server.socket = contexto.wrap_socket(server.socket, server_side=True)
+        esquema, extra = "https", {"verify": cert}
+
+    base = f"{esquema}://127.0.0.1:{server.server_address[1]}/v25.0"
+    url = f"{base}/17841400000000/insights"
+    params = {"metric": "follows_and_unfollows", "access_token": "fake-token"}
+
+    session = get_session()
+    # Aquece (import, primeira conexão) para medir só o regime
+    measure(requests.get, url, params, 3, **extra)
+    measure(session.get, url, params, 3, **extra)
+
+    resultados = {
+        "sem sessão": resumo(measure(requests.get, url, params, args.calls, **extra)),
+        "sessão": resumo(measure(session.get, url, params, args.calls, **extra)),
+    }
+
+    pagina = f"{base}/act_900000000000000/insights"
+    pagina_params = {"limit": 500, "access_token": "fake-token"}
+    sem_gzip = payload_bytes(session, pagina, pagina_params, "identity", **extra)
+    com_gzip = payload_bytes(session, pagina, pagina_params, "gzip, deflate", **extra)
+
+    server.shutdown()
+    if pasta:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+    print("\n" + "=" * 60)
+    print(f"🌐 CLIENTE HTTP: {args.calls} chamadas sequenciais ({esquema.upper()})")
+    print("=" * 60)
+    print(f"   {'':<12} {'média':>9} {'p50':>9} {'p95':>9}")
+    for nome, r in resultados.items():
+        print(
+            f"   {nome:<12} {r['media']:>7.2f}ms {r['p50']:>7.2f}ms {r['p95']:>7.2f}ms"
+        )
+    antes, depois = resultados["sem sessão"], resultados["sessão"]
+    print(f"   Redução     : {1 - depois['media'] / antes['media']:.0%} da latência média")
+    print(
+        f"   Página de insights: {sem_gzip / 1024:.0f} KB sem gzip → "
+        f"{com_gzip / 1024:.0f} KB com gzip ({1 - com_gzip / sem_gzip:.0%} menor)"
+    )
+    print("   (requests já envia Accept-Encoding: gzip; o ganho da sessão é a conexão)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--ads", type=int, default=50, help="Anúncios (página de insights)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latência do servidor")
+    parser.add_argument("--tls", action="store_true", help="Servidor em HTTPS (openssl)")
+    run(parser.parse_args())
@@ -0,0 +1,156 @@
+"""Micro-benchmark do custo de parse/planejamento do merge do PostgresLoader.
+
+Simula o caso da janela incremental: muitos lotes pequenos. Compara:
+  - texto: o SQL do merge (+ feed de mudanças) enviado como texto a cada lote
+    (parse + plano sempre)
+  - preparado: o mesmo SQL via PREPARE/EXECUTE (caminho atual do loader)
+
+A tabela é recriada antes de cada variante, para as duas gravarem o mesmo
+volume (o merge não reescreve linhas sem mudança).
+
+Usa uma tabela descartável (bench_insights_meta_ads) no banco do .env.
+
+Uso:
+    python scripts/benchmarks/bench_upsert_planning.py --batches 200 --rows 20
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from src.load.postgres_loader import (
+    FACT_COLUMNS,
+    PostgresLoader,
+    build_change_feed_sql,
+)
+
+load_dotenv()
+
+BENCH_TABLE = "bench_insights_meta_ads"
+BENCH_RUN_ID = "bench"
+
+
+def make_batch(batch_idx: int, rows: int) -> tuple[pd.DataFrame, list[dict]]:
+    """Gera um lote pequeno com hash_ids que se repetem (metade update, metade insert)."""
+    records = []
+    for i in range(rows):
+        ad = (batch_idx // 2) * rows + i
+        records.append(
+            {
+                "id_anuncio": str(ad),
+                "data_registro": "2026-02-13",
+                "account_id": "1",
+                "nome_conta": "Conta Bench",
+                "campanha": "Campanha",
+                "anuncio": f"Anuncio {ad}",
+                "plataforma": "instagram",
+                "posicionamento": "feed",
+                "valor_gasto": round(1.5 * (batch_idx + 1), 2),
+                "impressoes": 100 + batch_idx,
+                "clique_link": 1,
+                "lead_formulario": 0,
+                "lead_site": 0,
+                "lead_mensagem": 0,
+                "seguidores_instagram": 0,
+                "videoview_3s": 0,
+                "videoview_50": 0,
+                "videoview_75": 0,
+                "lead": 0,
+                "hash_id": f"bench_{ad}",
+            }
+        )
+    return pd.DataFrame(records), [{"ad_id": r["id_anuncio"]} for r in records]
+
+
+def create_bench_table(loader: PostgresLoader) -> None:
+    cols = ", ".join(f"{col} {tipo}" for col, tipo, _ in FACT_COLUMNS)
+    with loader.engine.begin() as conn:
+        # CASCADE: a view com os nomes (vw_<tabela>) depende da tabela
+        conn.exec_driver_sql(f"DROP TABLE IF EXISTS {BENCH_TABLE} CASCADE")
+        conn.exec_driver_sql(
+            f"CREATE TABLE {BENCH_TABLE} ({cols}, "
+            "data_insercao TIMESTAMP DEFAULT CURRENT_TIMESTAMP, "
+            "UNIQUE (hash_id))"
+        )
+
+
+def planning_time_ms(loader: PostgresLoader, sql: str) -> float:
+    """Lê o 'Planning Time' do EXPLAIN (SUMMARY ON) de um statement."""
+    with loader.engine.connect() as conn:
+        loader._prepare_session(conn)
+        lines = conn.exec_driver_sql(f"EXPLAIN (SUMMARY ON) {sql}").scalars().all()
+    for line in lines:
+        match = re.search(r"Planning Time: ([\d.]+) ms", line)
+        if match:
+            return float(match.group(1))
+    return float("nan")
+
+
+def run(batches: int, rows: int) -> None:
+    loader = PostgresLoader(table=BENCH_TABLE)
+    create_bench_table(loader)
+    upsert_sql = build_change_feed_sql(
+        loader.table, loader.staging_table, run_id=f"'{BENCH_RUN_ID}'"
+    )
+    lotes = [make_batch(b, rows) for b in range(batches)]
+
+    # Texto: mesmo staging/COPY, mas o merge é reenviado e replanejado a cada lote
+    inicio = time.perf_counter()
+    with loader.engine.connect() as conn:
+        loader._prepare_session(conn)
+        for df, _ in lotes:
+            with conn.begin():
+                loader._copy_to_staging(conn, df)
+                conn.exec_driver_sql(upsert_sql)
+    tempo_texto = time.perf_counter() - inicio
+
+    # Preparado: EXECUTE do plano já preparado na conexão
+    create_bench_table(loader)
+    inicio = time.perf_counter()
+    with loader.engine.connect() as conn:
+        loader._prepare_session(conn)
+        for df, _ in lotes:
+            with conn.begin():
+                loader._copy_to_staging(conn, df)
+                conn.exec_driver_sql(f"EXECUTE {loader.statement_name}('{BENCH_RUN_ID}')")
+    tempo_preparado = time.perf_counter() - inicio
+
+    plano_texto = planning_time_ms(loader, upsert_sql)
+    plano_preparado = planning_time_ms(
+        loader, f"EXECUTE {loader.statement_name}('{BENCH_RUN_ID}')"
+    )
+
+    print("\n" + "=" * 60)
+    print(f"📏 MERGE: {batches} lotes x {rows} linhas")
+    print("=" * 60)
+    print(
+        f"   Texto     : {tempo_texto:.3f}s total | "
+        f"{tempo_texto / batches * 1000:.2f} ms/lote | plano {plano_texto:.3f} ms"
+    )
+    print(
+        f"   Preparado : {tempo_preparado:.3f}s total | "
+        f"{tempo_preparado / batches * 1000:.2f} ms/lote | plano {plano_preparado:.3f} ms"
+    )
+    if tempo_preparado > 0:
+        print(f"   Ganho     : {tempo_texto / tempo_preparado:.2f}x")
+
+    with loader.engine.begin() as conn:
+        conn.exec_driver_sql(f"DROP TABLE IF EXISTS {BENCH_TABLE} CASCADE")
+        conn.exec_driver_sql(
+            "DELETE FROM etl_changes WHERE tabela = %s", (BENCH_TABLE,)
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batches", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=20)
+    args = parser.parse_args()
+    run(args.batches, args.rows)
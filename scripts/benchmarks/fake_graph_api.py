@@ -0,0 +1,699 @@
+"""Servidor local que imita a Graph API / Marketing API para testes de carga.
+
+Serve, sem rede externa, os endpoints usados pelo ETL e pelos diagnósticos:
+
+  GET  /{versão}/act_{id}/insights           insights síncronos (paginação por cursor)
+  POST /{versão}/act_{id}/insights           cria job assíncrono (report_run_id)
+  GET  /{versão}/{report_run_id}             status do job (async_status / percent)
+  GET  /{versão}/{report_run_id}/insights    resultado paginado do job
+  GET  /{versão}/act_{id}                    detalhes da conta (name, currency)
+  GET  /{versão}/{ig_id}/insights            follows_and_unfollows do Instagram
+  GET  /{versão}/me/accounts                 páginas com instagram_business_account
+  GET  /{versão}/act_{id}/ads|campaigns      anúncios/campanhas da conta (paginado)
+  GET  /{versão}/?ids=a,b,c&fields=...       várias entidades numa chamada
+  POST /{versão}/{ad_id|campaign_id}         edita o nome (e o updated_time)
+
+Os dados vêm de synthetic_insights.py (determinísticos por conta), agregados
+conforme o level e os breakdowns pedidos (como nos perfis de extração) e com
+as actions recortadas pelo `filtering` de action_type, se enviado. Toda
+resposta traz os headers de uso x-business-use-case-usage, x-app-usage e
+x-fb-ads-insights-throttle, calculados por uma janela deslizante de chamadas
+por conta. Ao estourar o orçamento, a conta recebe o erro 80000 (como a API
+real); além disso é possível injetar latência, throttling (código 17) e
+falhas 5xx aleatórias.
+
+Uso:
+    python scripts/benchmarks/fake_graph_api.py --port 8765 --latency-ms 150 \\
+        --throttle-rate 0.02 --error-rate 0.01
+
+    META_GRAPH_URL=http://localhost:8765 python main.py
+"""
+
+import argparse
+import base64
+import gzip
+import json
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from synthetic_insights import iter_account_insights
+
+VERSION_PREFIX = re.compile(r"^/v\d+\.\d+")
+
+
+class FakeGraphConfig:
+    """Parâmetros de comportamento do servidor falso."""
+
+    def __init__(
+        self,
+        ads: int = 20,
+        days: int = 30,
+        seed: int = 42,
+        max_page_size: int = 500,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        latency_per_row_us: float = 0.0,
+        throttle_rate: float = 0.0,
+        error_rate: float = 0.0,
+        calls_per_minute: int = 200,
+        async_seconds: float = 2.0,
+        gzip_enabled: bool = True,
+    ):
+        self.ads = ads
+        self.days = days
+        self.seed = seed
+        self.max_page_size = max_page_size
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.latency_per_row_us = latency_per_row_us
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.calls_per_minute = calls_per_minute
+        self.async_seconds = async_seconds
+        self.gzip_enabled = gzip_enabled
+
+
+class FakeGraphState:
+    """Estado compartilhado entre as threads do servidor (dados, jobs e uso)."""
+
+    def __init__(self, config: FakeGraphConfig):
+        self.config = config
+        self.lock = threading.Lock()
+        self.rng = random.Random(config.seed)
+        self.datasets: dict[str, list[dict]] = {}
+        self.entity_sets: dict[str, dict[str, dict]] = {}
+        self.entity_index: dict[str, dict] = {}
+        self.jobs: dict[str, dict] = {}
+        self.calls: dict[str, deque] = {}
+        self.stats = {"requests": 0, "throttled": 0, "errors_5xx": 0, "rows_served": 0}
+
+    def dataset(self, account_id: str) -> list[dict]:
+        """Linhas sintéticas da conta (geradas uma vez e mantidas em memória)."""
+        with self.lock:
+            if account_id not in self.datasets:
+                cfg = self.config
+                end_date = date.today() - timedelta(days=1)
+                self.datasets[account_id] = list(
+                    iter_account_insights(
+                        account_id,
+                        f"Conta Fake {account_id[-4:]}",
+                        cfg.ads,
+                        cfg.days,
+                        end_date,
+                        cfg.seed,
+                    )
+                )
+            return self.datasets[account_id]
+
+    def entities(self, account_id: str) -> dict[str, dict]:
+        """Campanhas e anúncios da conta (derivados do dataset), por id."""
+        dataset = self.dataset(account_id)
+        with self.lock:
+            if account_id not in self.entity_sets:
+                criado = f"{date.today() - timedelta(days=self.config.days)}T08:00:00+0000"
+                entidades = {}
+                for row in dataset:
+                    if row["campaign_id"] not in entidades:
+                        objetivo = row["campaign_name"].split("]")[0].strip("[")
+                        entidades[row["campaign_id"]] = {
+                            "id": row["campaign_id"],
+                            "name": row["campaign_name"],
+                            "objective": f"OUTCOME_{objetivo}",
+                            "account_id": account_id,
+                            "updated_time": criado,
+                            "_edge": "campaigns",
+                        }
+                    if row["ad_id"] not in entidades:
+                        entidades[row["ad_id"]] = {
+                            "id": row["ad_id"],
+                            "name": row["ad_name"],
+                            "campaign_id": row["campaign_id"],
+                            "account_id": account_id,
+                            "effective_status": "ACTIVE",
+                            "creative": {
+                                "url_tags": f"utm_source=meta&utm_campaign={row['campaign_id']}",
+                                "website_url": "https://vetorial.example/landing",
+                            },
+                            "tracking_specs": [{"action.type": ["offsite_conversion"]}],
+                            "updated_time": criado,
+                            "_edge": "ads",
+                        }
+                self.entity_sets[account_id] = entidades
+                self.entity_index.update(entidades)
+            return self.entity_sets[account_id]
+
+    def usage_pct(self, account_id: str) -> float:
+        """Registra uma chamada e devolve o uso (%) na janela de 60s da conta."""
+        agora = time.monotonic()
+        with self.lock:
+            janela = self.calls.setdefault(account_id, deque())
+            janela.append(agora)
+            while janela and agora - janela[0] > 60:
+                janela.popleft()
+            return len(janela) / self.config.calls_per_minute * 100
+
+
+def _cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(str(offset).encode()).decode()
+
+
+def _offset(cursor: str | None) -> int:
+    if not cursor:
+        return 0
+    return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+
+
+def _time_range(rows: list[dict], params: dict) -> list[dict]:
+    """Aplica o time_range ({"since": ..., "until": ...} em JSON), se enviado."""
+    if not params.get("time_range"):
+        return rows
+    janela = json.loads(params["time_range"])
+    return [r for r in rows if janela["since"] <= r["date_start"] <= janela["until"]]
+
+
+# Campos de identidade mantidos em cada level (os demais somem na agregação)
+LEVEL_FIELDS = {
+    "ad": ["ad_id", "ad_name", "campaign_id", "campaign_name"],
+    "campaign": ["campaign_id", "campaign_name"],
+    "account": [],
+}
+BREAKDOWNS = ["publisher_platform", "platform_position"]
+ACTION_LIST_FIELDS = ["actions", "video_p50_watched_actions", "video_p75_watched_actions"]
+
+
+def _list_param(value: str | None) -> list[str]:
+    """Lê um parâmetro de lista (o SDK manda JSON; curl costuma mandar CSV)."""
+    if not value:
+        return []
+    if value.startswith("["):
+        return json.loads(value)
+    return value.split(",")
+
+
+def _top_fields(value: str | None) -> list[str]:
+    """Campos de primeiro nível de um `fields` (ignora o aninhamento: a{b,c} → a)."""
+    partes = re.split(r",(?![^{]*\})", value or "")
+    return [re.split(r"[{\s]", p.strip())[0] for p in partes if p.strip()]
+
+
+def _sum_actions(total: dict, actions: list[dict]) -> None:
+    for action in actions:
+        total[action["action_type"]] = total.get(action["action_type"], 0) + int(action["value"])
+
+
+def _aggregate(rows: list[dict], params: dict) -> list[dict]:
+    """Agrega as linhas granulares no level/breakdowns pedidos (como a API faz).
+
+    As linhas sintéticas são anúncio × dia × posicionamento; sem breakdowns ou
+    com level=campaign/account, a API devolve menos linhas com as métricas somadas.
+    """
+    level = params.get("level", "ad")
+    breakdowns = [b for b in _list_param(params.get("breakdowns")) if b in BREAKDOWNS]
+    if level == "ad" and breakdowns == BREAKDOWNS:
+        return rows
+
+    identidade = LEVEL_FIELDS.get(level, LEVEL_FIELDS["ad"])
+    grupos: dict[tuple, dict] = {}
+    for row in rows:
+        chave = (row["date_start"], *(row.get(c) for c in identidade + breakdowns))
+        grupo = grupos.get(chave)
+        if grupo is None:
+            grupo = grupos[chave] = {
+                "base": {
+                    c: row[c]
+                    for c in ["account_id", "account_name", "date_start", "date_stop"]
+                    + identidade
+                    + breakdowns
+                },
+                "spend": 0.0,
+                "impressions": 0,
+                "inline_link_clicks": None,
+                "actions": {},
+                "video_p50_watched_actions": {},
+                "video_p75_watched_actions": {},
+            }
+        grupo["spend"] += float(row["spend"])
+        grupo["impressions"] += int(row["impressions"])
+        if "inline_link_clicks" in row:
+            grupo["inline_link_clicks"] = (grupo["inline_link_clicks"] or 0) + int(
+                row["inline_link_clicks"]
+            )
+        for campo in ACTION_LIST_FIELDS:
+            _sum_actions(grupo[campo], row.get(campo, []))
+
+    saida = []
+    for grupo in grupos.values():
+        linha = {
+            **grupo["base"],
+            "spend": f"{grupo['spend']:.2f}",
+            "impressions": str(grupo["impressions"]),
+        }
+        if grupo["inline_link_clicks"] is not None:
+            linha["inline_link_clicks"] = str(grupo["inline_link_clicks"])
+        for campo in ACTION_LIST_FIELDS:
+            if grupo[campo]:
+                linha[campo] = [
+                    {"action_type": t, "value": str(v)} for t, v in grupo[campo].items()
+                ]
+        saida.append(linha)
+    return saida
+
+
+def _filter_actions(rows: list[dict], params: dict) -> list[dict]:
+    """Aplica um `filtering` de action_type (IN) às listas de actions das linhas.
+
+    Só as entradas das listas são filtradas; a linha continua mesmo se a lista
+    ficar vazia (aí o campo some, como a API faz com campos zerados).
+    """
+    filtros = json.loads(params.get("filtering") or "[]")
+    tipos = set()
+    for filtro in filtros:
+        if filtro.get("field") == "action_type" and filtro.get("operator") == "IN":
+            tipos.update(filtro.get("value", []))
+    if not tipos:
+        return rows
+
+    saida = []
+    for row in rows:
+        row = dict(row)
+        for campo in ACTION_LIST_FIELDS:
+            if campo in row:
+                mantidas = [a for a in row[campo] if a["action_type"] in tipos]
+                if mantidas:
+                    row[campo] = mantidas
+                else:
+                    del row[campo]
+        saida.append(row)
+    return saida
+
+
+class FakeGraphHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "FakeGraphAPI/1.0"
+    # Cabeçalho e corpo saem em writes separados: sem TCP_NODELAY, conexões
+    # keep-alive esperam o ACK atrasado do cliente (~40ms) a cada resposta
+    disable_nagle_algorithm = True
+
+    # ------------------------------------------------------------------
+    # Infra de resposta
+    # ------------------------------------------------------------------
+    @property
+    def state(self) -> FakeGraphState:
+        return self.server.state
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _params(self) -> dict[str, str]:
+        query = parse_qs(urlparse(self.path).query)
+        if self.command == "POST":
+            length = int(self.headers.get("Content-Length") or 0)
+            query.update(parse_qs(self.rfile.read(length).decode()))
+        return {k: v[-1] for k, v in query.items()}
+
+    def _send(self, status: int, payload: dict, headers: dict | None = None) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        if self.state.config.gzip_enabled and "gzip" in self.headers.get(
+            "Accept-Encoding", ""
+        ):
+            body = gzip.compress(body, compresslevel=5)
+            self.send_header("Content-Encoding", "gzip")
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, code: int, message: str, headers=None, **extra):
+        erro = {
+            "message": message,
+            "type": "OAuthException",
+            "code": code,
+            "fbtrace_id": uuid.uuid4().hex[:11],
+            **extra,
+        }
+        self._send(status, {"error": erro}, headers)
+
+    def _usage_headers(self, account_id: str, pct: float) -> dict[str, str]:
+        pct = round(min(pct, 100.0), 1)
+        regain = 0 if pct < 100 else 1
+        buc = {
+            account_id: [
+                {
+                    "type": "ads_insights",
+                    "call_count": pct,
+                    "total_cputime": round(pct * 0.6, 1),
+                    "total_time": round(pct * 0.7, 1),
+                    "estimated_time_to_regain_access": regain,
+                }
+            ]
+        }
+        return {
+            "x-business-use-case-usage": json.dumps(buc),
+            "x-app-usage": json.dumps(
+                {"call_count": pct, "total_cputime": pct * 0.6, "total_time": pct * 0.7}
+            ),
+            "x-fb-ads-insights-throttle": json.dumps(
+                {"app_id_util_pct": pct, "acc_id_util_pct": pct}
+            ),
+        }
+
+    def _simulate(self, account_id: str) -> dict[str, str] | None:
+        """Aplica latência, falhas injetadas e orçamento de chamadas.
+
+        Returns:
+            Headers de uso, ou None se já respondeu com erro.
+        """
+        cfg = self.state.config
+        state = self.state
+        with state.lock:
+            state.stats["requests"] += 1
+            sorteio = state.rng.random()
+            atraso = cfg.latency_ms + state.rng.uniform(-cfg.jitter_ms, cfg.jitter_ms)
+        if atraso > 0:
+            time.sleep(atraso / 1000)
+
+        pct = state.usage_pct(account_id)
+        headers = self._usage_headers(account_id, pct)
+
+        if sorteio < cfg.error_rate:
+            with state.lock:
+                state.stats["errors_5xx"] += 1
+            self._error(
+                500, 2, "Service temporarily unavailable", headers, is_transient=True
+            )
+            return None
+        if pct > 100:
+            with state.lock:
+                state.stats["throttled"] += 1
+            self._error(
+                400,
+                80000,
+                "There have been too many calls from this ad-account.",
+                headers,
+                error_subcode=2446079,
+                is_transient=True,
+            )
+            return None
+        if sorteio < cfg.error_rate + cfg.throttle_rate:
+            with state.lock:
+                state.stats["throttled"] += 1
+            self._error(
+                400, 17, "User request limit reached", headers, is_transient=True
+            )
+            return None
+        return headers
+
+    # ------------------------------------------------------------------
+    # Roteamento
+    # ------------------------------------------------------------------
+    def _route(self) -> list[str]:
+        path = VERSION_PREFIX.sub("", urlparse(self.path).path)
+        return [p for p in path.split("/") if p]
+
+    def do_GET(self):
+        parts = self._route()
+        params = self._params()
+
+        if parts == ["me", "accounts"]:
+            return self._me_accounts()
+        if len(parts) == 1 and parts[0].startswith("act_"):
+            return self._account(parts[0])
+        if len(parts) == 2 and parts[1] == "insights":
+            if parts[0].startswith("act_"):
+                return self._insights(parts[0], params)
+            if parts[0] in self.state.jobs:
+                return self._job_insights(parts[0], params)
+            return self._ig_insights(parts[0], params)
+        if len(parts) == 1 and parts[0] in self.state.jobs:
+            return self._job_status(parts[0])
+        if len(parts) == 2 and parts[0].startswith("act_") and parts[1] in ("ads", "campaigns"):
+            return self._edge(parts[0], parts[1], params)
+        if not parts and params.get("ids"):
+            return self._by_ids(params)
+        self._error(404, 803, f"Unknown path {self.path}")
+
+    def do_POST(self):
+        parts = self._route()
+        params = self._params()
+        if len(parts) == 2 and parts[0].startswith("act_") and parts[1] == "insights":
+            return self._create_job(parts[0], params)
+        if len(parts) == 1 and parts[0] in self.state.entity_index:
+            return self._update_entity(parts[0], params)
+        self._error(404, 803, f"Unknown path {self.path}")
+
+    # ------------------------------------------------------------------
+    # Endpoints
+    # ------------------------------------------------------------------
+    def _page(self, rows: list[dict], params: dict, usage: dict) -> None:
+        """Responde uma página com cursores before/after e link next."""
+        cfg = self.state.config
+        limit = min(int(params.get("limit", 25)), cfg.max_page_size)
+        inicio = _offset(params.get("after"))
+        pagina = rows[inicio : inicio + limit]
+
+        fields = params.get("fields")
+        if fields:
+            keep = set(_list_param(fields)) | {"date_start", "date_stop", *BREAKDOWNS}
+            pagina = [{k: v for k, v in r.items() if k in keep} for r in pagina]
+        pagina = _filter_actions(pagina, params)
+
+        if cfg.latency_per_row_us:
+            time.sleep(len(pagina) * cfg.latency_per_row_us / 1_000_000)
+        with self.state.lock:
+            self.state.stats["rows_served"] += len(pagina)
+
+        paging = {"cursors": {"before": _cursor(inicio), "after": _cursor(inicio + len(pagina))}}
+        if inicio + len(pagina) < len(rows):
+            proximo = {**params, "after": _cursor(inicio + len(pagina))}
+            base = f"http://{self.headers.get('Host')}{urlparse(self.path).path}"
+            paging["next"] = f"{base}?{urlencode(proximo)}"
+        self._send(200, {"data": pagina, "paging": paging}, usage)
+
+    def _insights(self, act_id: str, params: dict) -> None:
+        usage = self._simulate(act_id)
+        if usage is None:
+            return
+        rows = self.state.dataset(act_id.removeprefix("act_"))
+        self._page(_aggregate(_time_range(rows, params), params), params, usage)
+
+    def _create_job(self, act_id: str, params: dict) -> None:
+        usage = self._simulate(act_id)
+        if usage is None:
+            return
+        job_id = str(random.randrange(10**15, 10**16))
+        with self.state.lock:
+            self.state.jobs[job_id] = {
+                "account_id": act_id,
+                "created": time.monotonic(),
+                "params": params,
+            }
+        self._send(200, {"report_run_id": job_id}, usage)
+
+    def _job_progress(self, job_id: str) -> int:
+        job = self.state.jobs[job_id]
+        duracao = self.state.config.async_seconds
+        if duracao <= 0:
+            return 100
+        return min(100, int((time.monotonic() - job["created"]) / duracao * 100))
+
+    def _job_status(self, job_id: str) -> None:
+        job = self.state.jobs[job_id]
+        usage = self._simulate(job["account_id"])
+        if usage is None:
+            return
+        progresso = self._job_progress(job_id)
+        self._send(
+            200,
+            {
+                "id": job_id,
+                "account_id": job["account_id"].removeprefix("act_"),
+                "async_status": "Job Completed" if progresso >= 100 else "Job Running",
+                "async_percent_completion": progresso,
+            },
+            usage,
+        )
+
+    def _job_insights(self, job_id: str, params: dict) -> None:
+        job = self.state.jobs[job_id]
+        usage = self._simulate(job["account_id"])
+        if usage is None:
+            return
+        if self._job_progress(job_id) < 100:
+            return self._error(400, 2601, "Report is not ready yet", usage)
+        rows = self.state.dataset(job["account_id"].removeprefix("act_"))
+        params = {**job["params"], **params}
+        self._page(_aggregate(_time_range(rows, params), params), params, usage)
+
+    def _account(self, act_id: str) -> None:
+        usage = self._simulate(act_id)
+        if usage is None:
+            return
+        account_id = act_id.removeprefix("act_")
+        self._send(
+            200,
+            {
+                "id": act_id,
+                "account_id": account_id,
+                "name": f"Conta Fake {account_id[-4:]}",
+                "currency": "BRL",
+            },
+            usage,
+        )
+
+    def _edge(self, act_id: str, edge: str, params: dict) -> None:
+        usage = self._simulate(act_id)
+        if usage is None:
+            return
+        status = set(_list_param(params.get("effective_status")))
+        rows = [
+            e
+            for e in self.state.entities(act_id.removeprefix("act_")).values()
+            if e["_edge"] == edge and (not status or e.get("effective_status") in status)
+        ]
+        self._page(rows, params, usage)
+
+    def _by_ids(self, params: dict) -> None:
+        usage = self._simulate("ids")
+        if usage is None:
+            return
+        campos = set(_top_fields(params.get("fields"))) | {"id"}
+        resultado = {}
+        for entity_id in params["ids"].split(","):
+            if entity_id.startswith("act_"):
+                account_id = entity_id.removeprefix("act_")
+                entidade = {
+                    "id": entity_id,
+                    "account_id": account_id,
+                    "name": f"Conta Fake {account_id[-4:]}",
+                    "currency": "BRL",
+                    "timezone_name": "America/Sao_Paulo",
+                }
+            else:
+                entidade = self.state.entity_index.get(entity_id)
+            if entidade:
+                resultado[entity_id] = {k: v for k, v in entidade.items() if k in campos}
+        self._send(200, resultado, usage)
+
+    def _update_entity(self, entity_id: str, params: dict) -> None:
+        entidade = self.state.entity_index[entity_id]
+        with self.state.lock:
+            if params.get("name"):
+                entidade["name"] = params["name"]
+            entidade["updated_time"] = datetime.now().strftime("%Y-%m-%dT%H:%M:%S+0000")
+        self._send(200, {"success": True})
+
+    def _ig_insights(self, ig_id: str, params: dict) -> None:
+        usage = self._simulate(ig_id)
+        if usage is None:
+            return
+        rng = random.Random(f"{self.state.config.seed}:{ig_id}:{params.get('since')}")
+        seguiram, deixaram = rng.randint(0, 300), rng.randint(0, 80)
+        self._send(
+            200,
+            {
+                "data": [
+                    {
+                        "name": "follows_and_unfollows",
+                        "period": "day",
+                        "total_value": {
+                            "value": seguiram - deixaram,
+                            "breakdowns": [
+                                {
+                                    "dimension_keys": ["follow_type"],
+                                    "results": [
+                                        {"dimension_values": ["FOLLOWER"], "value": seguiram},
+                                        {"dimension_values": ["NON_FOLLOWER"], "value": deixaram},
+                                    ],
+                                }
+                            ],
+                        },
+                        "id": f"{ig_id}/insights/follows_and_unfollows/day",
+                    }
+                ]
+            },
+            usage,
+        )
+
+    def _me_accounts(self) -> None:
+        usage = self._simulate("me")
+        if usage is None:
+            return
+        pages = [
+            {
+                "id": str(1000 + i),
+                "name": f"Página Fake {i + 1}",
+                "instagram_business_account": {"id": str(17841400000000 + i)},
+            }
+            for i in range(3)
+        ]
+        self._send(200, {"data": pages, "paging": {"cursors": {}}}, usage)
+
+
+def start_server(
+    port: int = 0, config: FakeGraphConfig | None = None, verbose: bool = False
+) -> ThreadingHTTPServer:
+    """Sobe o servidor em uma thread daemon e devolve a instância.
+
+    Com port=0 o SO escolhe uma porta livre (server.server_address[1]).
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeGraphHandler)
+    server.daemon_threads = True
+    server.state = FakeGraphState(config or FakeGraphConfig())
+    server.verbose = verbose
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ads", type=int, default=20, help="Anúncios por conta")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--max-page-size", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--latency-per-row-us", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--calls-per-minute", type=int, default=200)
+    parser.add_argument("--async-seconds", type=float, default=2.0)
+    parser.add_argument("--no-gzip", action="store_true")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    config = FakeGraphConfig(
+        ads=args.ads,
+        days=args.days,
+        seed=args.seed,
+        max_page_size=args.max_page_size,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        latency_per_row_us=args.latency_per_row_us,
+        throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate,
+        calls_per_minute=args.calls_per_minute,
+        async_seconds=args.async_seconds,
+        gzip_enabled=not args.no_gzip,
+    )
+    server = start_server(args.port, config, args.verbose)
+    print(f"🧪 Fake Graph API em http://127.0.0.1:{server.server_address[1]}")
+    print(f"   export META_GRAPH_URL=http://127.0.0.1:{server.server_address[1]}")
+    try:
+        while True:
+            time.sleep(30)
+            print(f"   {datetime.now():%H:%M:%S} {server.state.stats}", file=sys.stderr)
+    except KeyboardInterrupt:
+        server.shutdown()
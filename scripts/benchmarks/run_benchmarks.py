@@ -0,0 +1,390 @@
+"""Suíte de benchmarks do cleaner e do loader com dados sintéticos.
+
+Cenários:
+  - transform             DataCleaner.transform() no payload bruto
+  - extract_action_value  soma de actions linha a linha (lista de leads)
+  - map_actions           todas as colunas de actions numa passada (índice compilado)
+  - hash                  geração do hash_id (DataCleaner.build_hash_ids)
+  - upsert                PostgresLoader.upsert_data() no Postgres do .env
+  - pipeline              transform + upsert (vazão ponta a ponta pós-extração)
+  - rollup_refresh        refresh_rollups() de todas as contas/datas carregadas
+  - kpi_fato              KPIs por conta/mês agregando a tabela fato (como antes)
+  - kpi_rollup            os mesmos KPIs lendo rollup_conta_dia
+
+Cada cenário roda para cada tamanho (padrão 1k/10k/100k/1M linhas) e reporta
+tempo, linhas/s e pico de memória (tracemalloc, numa passada separada para
+não distorcer o tempo). Os cenários com banco são pulados se o Postgres não
+estiver acessível.
+
+Também mede o tempo de import (python -X importtime, em subprocesso limpo)
+dos pontos de entrada, com os módulos mais pesados de cada um.
+
+Os resultados vão para data/benchmarks/<data>_<commit>.json; use --compare
+com um JSON anterior para ver a variação entre commits.
+
+Uso:
+    python scripts/benchmarks/run_benchmarks.py --sizes 1000,10000 --only transform,hash
+    python scripts/benchmarks/run_benchmarks.py --compare data/benchmarks/antes.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from src.transformation.cleaner import DataCleaner
+from synthetic_insights import generate_rows
+
+load_dotenv()
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+RESULTS_DIR = os.path.join(ROOT_DIR, "data", "benchmarks")
+DEFAULT_SIZES = "1000,10000,100000,1000000"
+
+LEAD_TYPES = ["lead", "onsite_conversion.lead_grouped", "onsite_conversion.lead"]
+
+# Pontos de entrada cujo tempo de startup importa (processos curtos)
+IMPORT_TARGETS = [
+    "main",
+    "src.pipeline",
+    "src.ingestion.extractor",
+    "src.load.postgres_loader",
+    "scripts.diagnostics.test_db",
+    "scripts.diagnostics.inspect_api",
+]
+
+
+# ---------------------------------------------------------------------------
+# Cenários: cada setup prepara as entradas (fora da medição) e devolve a
+# função medida.
+# ---------------------------------------------------------------------------
+def setup_transform(raw, loader):
+    cleaner = DataCleaner()
+    return lambda: cleaner.transform(raw)
+
+
+def setup_extract_action_value(raw, loader):
+    cleaner = DataCleaner()
+    actions = [row.get("actions", []) for row in raw]
+    return lambda: [cleaner.extract_action_value(a, LEAD_TYPES) for a in actions]
+
+
+def setup_map_actions(raw, loader):
+    cleaner = DataCleaner()
+    df = pd.DataFrame(raw)
+    return lambda: cleaner.map_actions(df)
+
+
+def setup_hash(raw, loader):
+    cleaner = DataCleaner()
+    clean_df = cleaner.transform(raw).drop(columns="hash_id")
+    return lambda: cleaner.build_hash_ids(clean_df)
+
+
+def setup_upsert(raw, loader):
+    clean_df = DataCleaner().transform(raw)
+    return lambda: loader.upsert_data(clean_df, raw)
+
+
+def setup_pipeline(raw, loader):
+    cleaner = DataCleaner()
+    return lambda: loader.upsert_data(cleaner.transform(raw), raw)
+
+
+# KPIs por conta/mês, como um dashboard calcularia
+KPI_QUERY = (
+    "SELECT account_id, date_trunc('month', data_registro) AS mes, "
+    "SUM(valor_gasto) AS valor_gasto, SUM(impressoes) AS impressoes, "
+    "SUM(clique_link) AS clique_link, SUM(lead) AS lead, "
+    "SUM(seguidores_instagram) AS seguidores_instagram "
+    "FROM {table} GROUP BY 1, 2"
+)
+
+
+def bench_rollups() -> dict:
+    """ROLLUPS apontados para tabelas descartáveis ao lado da tabela de bench."""
+    from bench_upsert_planning import BENCH_TABLE
+    from src.analysis.rollups import ROLLUPS
+
+    return {
+        nome: {**spec, "table": f"{BENCH_TABLE}_{spec['table']}"}
+        for nome, spec in ROLLUPS.items()
+    }
+
+
+def _load_and_refresh(raw, loader, refresh: bool = True) -> dict:
+    """Recarrega a tabela de bench só com `raw` (e, opcional, os rollups)."""
+    from src.analysis.rollups import refresh_rollups, source_ranges
+
+    with loader.engine.begin() as conn:
+        conn.exec_driver_sql(f"TRUNCATE {loader.table}")
+    loader.upsert_data(DataCleaner().transform(raw), raw)
+    fatias = source_ranges(loader.engine, source=loader.table)
+    if refresh:
+        refresh_rollups(loader.engine, fatias, bench_rollups(), loader.table)
+    return fatias
+
+
+def setup_rollup_refresh(raw, loader):
+    from src.analysis.rollups import refresh_rollups
+
+    fatias = _load_and_refresh(raw, loader, refresh=False)
+    return lambda: refresh_rollups(loader.engine, fatias, bench_rollups(), loader.table)
+
+
+def _kpi_reader(loader, table: str):
+    from src.analysis.kpis import compute_kpis
+
+    return lambda: compute_kpis(pd.read_sql(KPI_QUERY.format(table=table), loader.engine))
+
+
+def setup_kpi_fato(raw, loader):
+    _load_and_refresh(raw, loader, refresh=False)
+    return _kpi_reader(loader, loader.table)
+
+
+def setup_kpi_rollup(raw, loader):
+    _load_and_refresh(raw, loader)
+    return _kpi_reader(loader, bench_rollups()["conta_dia"]["table"])
+
+
+BENCHMARKS = {
+    "transform": (setup_transform, False),
+    "extract_action_value": (setup_extract_action_value, False),
+    "map_actions": (setup_map_actions, False),
+    "hash": (setup_hash, False),
+    "upsert": (setup_upsert, True),
+    "pipeline": (setup_pipeline, True),
+    "rollup_refresh": (setup_rollup_refresh, True),
+    "kpi_fato": (setup_kpi_fato, True),
+    "kpi_rollup": (setup_kpi_rollup, True),
+}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecido"
+
+
+def connect_loader():
+    """Abre o loader numa tabela descartável; None se o banco não responder."""
+    from bench_upsert_planning import BENCH_TABLE, create_bench_table
+    from src.load.postgres_loader import PostgresLoader
+
+    try:
+        loader = PostgresLoader(table=BENCH_TABLE)
+        create_bench_table(loader)
+        return loader
+    except Exception as e:
+        print(f"⚠️ [Bench] Postgres indisponível, cenários de banco pulados: {e}")
+        return None
+
+
+def profile_import(module: str, top: int = 5) -> dict:
+    """Tempo de import de um módulo num interpretador novo (-X importtime).
+
+    Returns:
+        Dict com o tempo cumulativo em ms e os `top` imports diretos mais caros.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+    )
+    # Cada import aparece depois dos seus filhos; os filhos diretos do módulo
+    # são as linhas de profundidade 1 desde o último import de topo anterior.
+    total_us, filhos, pendentes = None, [], []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        profundidade = (len(name) - len(name.lstrip())) // 2
+        if profundidade == 1:
+            pendentes.append((name.strip(), int(cumulative)))
+        elif profundidade == 0:
+            if name.strip() == module:
+                total_us, filhos = int(cumulative), pendentes
+            pendentes = []
+
+    filhos.sort(key=lambda item: item[1], reverse=True)
+    return {
+        "module": module,
+        "import_ms": round(total_us / 1000, 1) if total_us is not None else None,
+        "heaviest": [{"module": n, "ms": round(us / 1000, 1)} for n, us in filhos[:top]],
+        "error": proc.stderr.strip().splitlines()[-1] if proc.returncode else None,
+    }
+
+
+def profile_imports() -> list[dict]:
+    print("\n📦 Tempo de import (interpretador limpo):")
+    results = []
+    for module in IMPORT_TARGETS:
+        result = profile_import(module)
+        results.append(result)
+        if result["import_ms"] is None:
+            print(f"   {module:<34} falhou: {result['error']}")
+            continue
+        pesados = ", ".join(f"{h['module']} {h['ms']:.0f}ms" for h in result["heaviest"][:3])
+        print(f"   {module:<34} {result['import_ms']:>8.1f} ms | {pesados}")
+    return results
+
+
+def measure(fn, repeat: int) -> tuple[float, float]:
+    """Retorna (melhor tempo em s, pico de memória em MB)."""
+    tempos = []
+    for _ in range(repeat):
+        gc.collect()
+        inicio = time.perf_counter()
+        fn()
+        tempos.append(time.perf_counter() - inicio)
+
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(tempos), pico / (1024 * 1024)
+
+
+def run(
+    sizes: list[int], only: list[str], repeat: int, seed: int, imports: bool = True
+) -> dict:
+    import_results = profile_imports() if imports else []
+
+    loader = None
+    if any(BENCHMARKS[name][1] for name in only):
+        loader = connect_loader()
+
+    results = []
+    for size in sizes:
+        print(f"\n🧪 Gerando {size} linhas sintéticas (seed={seed})...")
+        raw = generate_rows(size, seed)
+
+        for name in only:
+            setup, needs_db = BENCHMARKS[name]
+            if needs_db and loader is None:
+                continue
+
+            fn = setup(raw, loader)
+            segundos, memoria = measure(fn, repeat)
+            result = {
+                "benchmark": name,
+                "rows": size,
+                "seconds": round(segundos, 4),
+                "rows_per_sec": round(size / segundos, 1) if segundos else 0.0,
+                "peak_mem_mb": round(memoria, 1),
+            }
+            results.append(result)
+            print(
+                f"   {name:<22} {size:>8} linhas | {segundos:>8.3f}s"
+                f" | {result['rows_per_sec']:>12,.0f} linhas/s | {memoria:>8.1f} MB"
+            )
+
+        del raw
+        gc.collect()
+
+    if loader is not None:
+        with loader.engine.begin() as conn:
+            conn.exec_driver_sql(f"DROP TABLE IF EXISTS {loader.table}")
+            for spec in bench_rollups().values():
+                conn.exec_driver_sql(f"DROP TABLE IF EXISTS {spec['table']}")
+
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "seed": seed,
+        "repeat": repeat,
+        "results": results,
+        "imports": import_results,
+    }
+
+
+def save(report: dict) -> str:
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = os.path.join(RESULTS_DIR, f"{stamp}_{report['commit']}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def compare(report: dict, baseline_path: str) -> None:
+    """Imprime a variação de tempo e memória contra um JSON anterior."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    anteriores = {(r["benchmark"], r["rows"]): r for r in baseline["results"]}
+    print(f"\n📊 Comparação com {baseline['commit']} ({baseline['timestamp']}):")
+    for r in report["results"]:
+        antes = anteriores.get((r["benchmark"], r["rows"]))
+        if not antes:
+            continue
+        tempo = (r["seconds"] / antes["seconds"] - 1) * 100 if antes["seconds"] else 0
+        memoria = (
+            (r["peak_mem_mb"] / antes["peak_mem_mb"] - 1) * 100
+            if antes["peak_mem_mb"]
+            else 0
+        )
+        print(
+            f"   {r['benchmark']:<22} {r['rows']:>8} linhas | "
+            f"tempo {tempo:+7.1f}% | memória {memoria:+7.1f}%"
+        )
+
+    imports_antes = {r["module"]: r for r in baseline.get("imports", [])}
+    for r in report.get("imports", []):
+        antes = imports_antes.get(r["module"])
+        if not antes or not antes["import_ms"] or r["import_ms"] is None:
+            continue
+        delta = (r["import_ms"] / antes["import_ms"] - 1) * 100
+        print(
+            f"   import {r['module']:<34} {antes['import_ms']:>7.1f} → "
+            f"{r['import_ms']:>7.1f} ms ({delta:+.1f}%)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES)
+    parser.add_argument("--only", default=",".join(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--compare", help="JSON de uma execução anterior")
+    parser.add_argument(
+        "--no-imports", action="store_true", help="Pula o perfil de tempo de import"
+    )
+    args = parser.parse_args()
+
+    only = [name.strip() for name in args.only.split(",") if name.strip()]
+    desconhecidos = set(only) - set(BENCHMARKS)
+    if desconhecidos:
+        parser.error(f"Benchmarks desconhecidos: {desconhecidos}")
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    report = run(sizes, only, args.repeat, args.seed, imports=not args.no_imports)
+    path = save(report)
+    print(f"\n💾 Resultados salvos em {path}")
+
+    if args.compare:
+        compare(report, args.compare)
@@ -0,0 +1,319 @@
+"""Gerador determinístico de payloads sintéticos no formato do get_insights.
+
+Produz linhas iguais às que MetaExtractor.get_ad_insights() devolve
+(level=ad, time_increment=1, breakdowns publisher_platform/platform_position,
+action_breakdowns=action_type), em escala configurável:
+
+    contas × anúncios × dias × posicionamentos
+
+Características copiadas da API real:
+  - valores numéricos chegam como string ("45.20", "1200")
+  - campos ausentes quando zerados (actions, inline_link_clicks, vídeo)
+  - dezenas de action_types, a maioria descartada pelo DataCleaner
+  - listas video_p50/p75_watched_actions só em anúncios de vídeo
+
+Uso:
+    # Estatísticas em memória
+    python scripts/benchmarks/synthetic_insights.py --accounts 3 --ads 50 --days 30
+
+    # Grava um .jsonl por conta em data/raw/synthetic
+    python scripts/benchmarks/synthetic_insights.py --rows 100000 --out data/raw/synthetic
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from itertools import islice
+
+# Posicionamentos reais por plataforma (publisher_platform → platform_position)
+PLACEMENTS = {
+    "facebook": [
+        "feed",
+        "video_feeds",
+        "marketplace",
+        "facebook_stories",
+        "facebook_reels",
+        "right_hand_column",
+        "search",
+        "instream_video",
+    ],
+    "instagram": [
+        "feed",
+        "instagram_stories",
+        "instagram_reels",
+        "instagram_explore",
+        "instagram_profile_feed",
+    ],
+    "audience_network": ["classic", "rewarded_video"],
+    "messenger": ["messenger_inbox", "messenger_stories"],
+}
+
+# Peso de entrega por plataforma (Instagram e Facebook dominam)
+PLATFORM_WEIGHTS = {
+    "facebook": 0.45,
+    "instagram": 0.45,
+    "audience_network": 0.07,
+    "messenger": 0.03,
+}
+
+# (action_type, taxa média por clique). Inclui os tipos usados pelo DataCleaner
+# e o "ruído" que a API devolve junto e é descartado.
+ACTION_RATES = [
+    ("link_click", 1.0),
+    ("landing_page_view", 0.7),
+    ("omni_landing_page_view", 0.7),
+    ("page_engagement", 2.5),
+    ("post_engagement", 2.4),
+    ("post_reaction", 0.6),
+    ("comment", 0.05),
+    ("post", 0.02),
+    ("like", 0.03),
+    ("onsite_conversion.post_save", 0.04),
+    ("video_view", 3.0),
+    ("lead", 0.06),
+    ("onsite_conversion.lead_grouped", 0.06),
+    ("onsite_conversion.lead", 0.02),
+    ("offsite_conversion.fb_pixel_lead", 0.04),
+    ("onsite_web_lead", 0.04),
+    ("offsite_conversion.fb_pixel_view_content", 0.3),
+    ("offsite_conversion.fb_pixel_custom", 0.2),
+    ("omni_view_content", 0.3),
+    ("onsite_conversion.messaging_first_reply", 0.05),
+    ("onsite_conversion.total_messaging_connection", 0.07),
+    ("onsite_conversion.messaging_conversation_started_7d", 0.06),
+    ("onsite_conversion.messaging_welcome_message_view", 0.08),
+    ("onsite_conversion.messaging_user_depth_2_message_send", 0.03),
+    ("onsite_conversion.post_save_follow", 0.02),
+    ("instagram_follower_count_total", 0.01),
+    ("page_like", 0.01),
+    ("photo_view", 0.1),
+]
+
+# Objetivos de campanha definem quais ações aparecem com mais força
+OBJECTIVE_BOOST = {
+    "LEADS": {"lead", "onsite_conversion.lead_grouped", "onsite_conversion.lead"},
+    "MESSAGES": {
+        "onsite_conversion.messaging_first_reply",
+        "onsite_conversion.total_messaging_connection",
+        "onsite_conversion.messaging_conversation_started_7d",
+    },
+    "TRAFFIC": {"link_click", "landing_page_view", "omni_landing_page_view"},
+    "ENGAGEMENT": {"page_engagement", "post_engagement", "post_reaction", "page_like"},
+    "CONVERSIONS": {"offsite_conversion.fb_pixel_lead", "onsite_web_lead"},
+}
+
+MISSING_INLINE_CLICKS_RATE = 0.03
+
+
+def _account_ids(accounts: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    return [str(rng.randrange(10**14, 10**15)) for _ in range(accounts)]
+
+
+def _build_ads(rng: random.Random, account_id: str, ads: int) -> list[dict]:
+    """Cria os anúncios da conta (campanha, objetivo, vídeo, posicionamentos)."""
+    campanhas = max(1, ads // 8)
+    catalogo = []
+    for c in range(campanhas):
+        objetivo = rng.choice(list(OBJECTIVE_BOOST))
+        catalogo.append(
+            {
+                "campaign_id": f"{account_id[:6]}{c:06d}",
+                "campaign_name": f"[{objetivo}] Campanha {c + 1:03d}",
+                "objective": objetivo,
+            }
+        )
+
+    anuncios = []
+    for a in range(ads):
+        campanha = catalogo[a % campanhas]
+        placements = []
+        for platform, positions in PLACEMENTS.items():
+            if rng.random() < PLATFORM_WEIGHTS[platform] * 2:
+                k = rng.randint(1, len(positions))
+                placements.extend((platform, p) for p in rng.sample(positions, k))
+        if not placements:
+            placements = [("instagram", "feed")]
+        anuncios.append(
+            {
+                **campanha,
+                "ad_id": f"{account_id[:8]}{a:07d}",
+                "ad_name": f"Criativo_{a + 1:04d}_{rng.choice(['Video', 'Imagem', 'Carrossel'])}",
+                "video": rng.random() < 0.4,
+                "placements": placements,
+                "budget": rng.lognormvariate(3.0, 1.0),
+                "cpm": rng.uniform(8, 45),
+                "ctr": rng.uniform(0.004, 0.03),
+            }
+        )
+    return anuncios
+
+
+def _actions(rng: random.Random, clicks: int, ad: dict) -> list[dict]:
+    boost = OBJECTIVE_BOOST[ad["objective"]]
+    actions = []
+    for action_type, rate in ACTION_RATES:
+        if action_type == "video_view" and not ad["video"]:
+            continue
+        media = clicks * rate * (3.0 if action_type in boost else 1.0)
+        value = int(rng.expovariate(1 / media)) if media > 0 else 0
+        if value > 0:
+            actions.append({"action_type": action_type, "value": str(value)})
+    return actions
+
+
+def iter_account_insights(
+    account_id: str,
+    account_name: str,
+    ads: int,
+    days: int,
+    end_date: date,
+    seed: int,
+):
+    """Gera as linhas de uma conta (ordem: dia → anúncio → posicionamento).
+
+    O seed é derivado do account_id, então cada conta é reprodutível mesmo
+    gerada isoladamente ou em outra ordem.
+    """
+    rng = random.Random(f"{seed}:{account_id}")
+    anuncios = _build_ads(rng, account_id, ads)
+
+    for d in range(days):
+        dia = (end_date - timedelta(days=days - 1 - d)).isoformat()
+        for ad in anuncios:
+            # Anúncios pausados em alguns dias não aparecem no payload
+            if rng.random() < 0.15:
+                continue
+            for platform, position in ad["placements"]:
+                peso = PLATFORM_WEIGHTS[platform] / len(PLACEMENTS[platform])
+                spend = ad["budget"] * peso * rng.uniform(0.3, 1.7)
+                impressions = int(spend / ad["cpm"] * 1000)
+                if impressions == 0:
+                    continue
+                clicks = int(impressions * ad["ctr"] * rng.uniform(0.5, 1.5))
+
+                row = {
+                    "ad_id": ad["ad_id"],
+                    "ad_name": ad["ad_name"],
+                    "campaign_id": ad["campaign_id"],
+                    "campaign_name": ad["campaign_name"],
+                    "spend": f"{spend:.2f}",
+                    "impressions": str(impressions),
+                    "date_start": dia,
+                    "date_stop": dia,
+                    "account_id": account_id,
+                    "account_name": account_name,
+                    "publisher_platform": platform,
+                    "platform_position": position,
+                }
+                if rng.random() >= MISSING_INLINE_CLICKS_RATE:
+                    row["inline_link_clicks"] = str(int(clicks * 0.8))
+
+                actions = _actions(rng, clicks, ad)
+                if actions:
+                    row["actions"] = actions
+
+                if ad["video"]:
+                    views = next(
+                        (int(a["value"]) for a in actions if a["action_type"] == "video_view"),
+                        0,
+                    )
+                    p50 = int(views * rng.uniform(0.2, 0.5))
+                    p75 = int(p50 * rng.uniform(0.4, 0.8))
+                    if p50:
+                        row["video_p50_watched_actions"] = [
+                            {"action_type": "video_view", "value": str(p50)}
+                        ]
+                    if p75:
+                        row["video_p75_watched_actions"] = [
+                            {"action_type": "video_view", "value": str(p75)}
+                        ]
+
+                yield row
+
+
+def generate_insights(
+    accounts: int = 1,
+    ads: int = 20,
+    days: int = 30,
+    seed: int = 42,
+    end_date: date | None = None,
+):
+    """Gera (account_id, linha) para todas as contas, de forma preguiçosa."""
+    end_date = end_date or date(2026, 2, 13)
+    for idx, account_id in enumerate(_account_ids(accounts, seed)):
+        nome = f"Cliente Sintético {idx + 1:03d}"
+        for row in iter_account_insights(account_id, nome, ads, days, end_date, seed):
+            yield account_id, row
+
+
+def generate_rows(rows: int, seed: int = 42, days: int = 30) -> list[dict]:
+    """Atalho para benchmarks: devolve exatamente `rows` linhas em memória."""
+    # ~5 posicionamentos por anúncio e ~85% dos dias ativos → 4 linhas/anúncio/dia
+    ads_total = max(1, rows // (days * 4) + 1)
+    accounts = max(1, ads_total // 200)
+    ads = ads_total // accounts + 1
+    stream = generate_insights(accounts, ads, days, seed)
+    data = [row for _, row in islice(stream, rows)]
+    while len(data) < rows:
+        # Escala baixa demais para o alvo: completa com mais contas
+        accounts += 1
+        stream = generate_insights(accounts, ads, days, seed)
+        data = [row for _, row in islice(stream, rows)]
+    return data
+
+
+def write_raw(stream, out_dir: str) -> dict[str, int]:
+    """Grava um arquivo .jsonl por conta em out_dir (uma linha JSON por insight)."""
+    os.makedirs(out_dir, exist_ok=True)
+    handles, counts = {}, {}
+    try:
+        for account_id, row in stream:
+            if account_id not in handles:
+                path = os.path.join(out_dir, f"act_{account_id}.jsonl")
+                handles[account_id] = open(path, "w", encoding="utf-8")
+                counts[account_id] = 0
+            handles[account_id].write(json.dumps(row) + "\n")
+            counts[account_id] += 1
+    finally:
+        for handle in handles.values():
+            handle.close()
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--accounts", type=int, default=1)
+    parser.add_argument("--ads", type=int, default=20)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--rows", type=int, help="Gera exatamente N linhas (ignora accounts/ads)"
+    )
+    parser.add_argument("--out", help="Diretório de saída (ex: data/raw/synthetic)")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    if args.rows:
+        data = generate_rows(args.rows, args.seed, args.days)
+        stream = ((row["account_id"], row) for row in data)
+    else:
+        stream = generate_insights(args.accounts, args.ads, args.days, args.seed)
+
+    if args.out:
+        counts = write_raw(stream, args.out)
+        total = sum(counts.values())
+        print(f"💾 {total} linhas gravadas em {args.out} ({len(counts)} contas)")
+    else:
+        rows = [row for _, row in stream]
+        total = len(rows)
+        tamanho = sum(len(json.dumps(r)) for r in rows)
+        tipos = {a["action_type"] for r in rows for a in r.get("actions", [])}
+        print(f"🧪 {total} linhas | {tamanho / 1024 / 1024:.1f} MB em JSON")
+        print(f"   {len(tipos)} action_types distintos")
+
+    print(f"⏱️ Gerado em {time.perf_counter() - inicio:.2f}s", file=sys.stderr)
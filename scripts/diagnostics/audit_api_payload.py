@@ -1,8 +1,12 @@
 import os
+import sys
 import json
 from dotenv import load_dotenv
-from facebook_business.api import FacebookAdsApi
-from facebook_business.adobjects.adaccount import AdAccount
+
+# Permite importar módulos do projeto a partir de scripts/diagnostics
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from src.utils.graph_api import init_facebook_api
 
 load_dotenv()
 
@@ -10,7 +14,9 @@ load_dotenv()
 def audit_ads_data(account_id):
     # Inicializa a API
     token = os.getenv("META_ACCESS_TOKEN")
-    FacebookAdsApi.init(access_token=token)
+    init_facebook_api(token)
+    from facebook_business.adobjects.adaccount import AdAccount
+
     account = AdAccount(account_id)
 
     print(f"\n{'=' * 60}")
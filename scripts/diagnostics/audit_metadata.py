@@ -1,18 +1,22 @@
 import os
+import sys
 import json
 from dotenv import load_dotenv
-from facebook_business.api import FacebookAdsApi
-from facebook_business.adobjects.adaccount import AdAccount
-from facebook_business.adobjects.ad import Ad
+
+# Permite importar módulos do projeto a partir de scripts/diagnostics
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from src.ingestion.metadata_cache import MetadataCache
+from src.load.postgres_loader import PostgresLoader
 
 load_dotenv()
 
 
 def audit_metadata(account_id):
-    # Inicializa API
+    # Atributos vêm do cache (etl_metadata_cache): a API só é chamada para
+    # o que mudou desde a última auditoria
     token = os.getenv("META_ACCESS_TOKEN")
-    FacebookAdsApi.init(access_token=token)
-    account = AdAccount(account_id)
+    cache = MetadataCache(PostgresLoader().engine, token)
 
     print(f"\n{'=' * 60}")
     print(f"🕵️‍♂️ AUDITORIA DE CONFIGURAÇÕES - CONTA: {account_id}")
@@ -22,9 +26,8 @@ def audit_metadata(account_id):
         # 1. CHECAGEM DA JANELA DE ATRIBUIÇÃO (O motivo nº 1 de divergência)
         # O Gerenciador geralmente usa "7 dias clique / 1 dia visualização".
         # Vamos ver o que a API está usando por padrão.
-        account_details = account.api_get(
-            fields=["name", "attribution_spec", "currency"]
-        )
+        contas = cache.get_accounts([account_id], ["name", "attribution_spec", "currency"])
+        account_details = next(iter(contas.values()), {})
 
         print(f"\n⚙️  CONFIGURAÇÃO DA CONTA:")
         print(f"   Nome: {account_details.get('name')}")
@@ -44,22 +47,21 @@ def audit_metadata(account_id):
         # Vamos pegar os últimos 5 anúncios para ver se eles têm UTMs configuradas
         print(f"\n🔗 RASTREAMENTO DE URL (Amostra de 5 Anúncios Recentes):")
 
-        ads = account.get_ads(
-            fields=["name", "creative{url_tags, website_url}", "tracking_specs"],
-            params={
-                "limit": 5,
-                "effective_status": ["ACTIVE"],
-            },  # Pega só ativos se possível
+        ads = cache.get_ads(
+            account_id,
+            ["name", "creative{url_tags, website_url}", "tracking_specs"],
+            params={"effective_status": ["ACTIVE"]},  # Pega só ativos se possível
+            max_items=5,
         )
 
         if not ads:
             # Se não tiver ativos, pega qualquer um
-            ads = account.get_ads(
-                fields=["name", "creative{url_tags, website_url}"], params={"limit": 5}
+            ads = cache.get_ads(
+                account_id, ["name", "creative{url_tags, website_url}"], max_items=5
             )
 
-        for ad in ads:
-            print(f"\n   🔸 Anúncio: {ad['name']}")
+        for ad in ads.values():
+            print(f"\n   🔸 Anúncio: {ad.get('name')}")
             creative = ad.get("creative", {})
 
             # Verifica UTMs (url_tags)
@@ -76,6 +78,8 @@ def audit_metadata(account_id):
             else:
                 print(f"      ⚠️ Sem URL de site explícita")
 
+        print(f"\n🗄️  Metadados: {cache.summary()}")
+
     except Exception as e:
         print(f"❌ Erro na auditoria: {e}")
 
@@ -1,14 +1,20 @@
 import os
+import sys
 import json
 from dotenv import load_dotenv
-from facebook_business.api import FacebookAdsApi
-from facebook_business.adobjects.adaccount import AdAccount
+
+# Permite importar módulos do projeto a partir de scripts/diagnostics
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from src.utils.graph_api import init_facebook_api
 
 load_dotenv()
 
 
 def deep_scan(account_id):
-    FacebookAdsApi.init(access_token=os.getenv("META_ACCESS_TOKEN"))
+    init_facebook_api(os.getenv("META_ACCESS_TOKEN"))
+    from facebook_business.adobjects.adaccount import AdAccount
+
     account = AdAccount(account_id)
 
     print(f"🔎 Iniciando Varredura Profunda na conta: {account_id}")
@@ -1,8 +1,12 @@
 import os
+import sys
 import time
 from dotenv import load_dotenv
-from facebook_business.api import FacebookAdsApi
-from facebook_business.adobjects.adaccount import AdAccount
+
+# Permite importar módulos do projeto a partir de scripts/diagnostics
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from src.utils.graph_api import init_facebook_api
 
 load_dotenv()
 
@@ -13,6 +17,8 @@ def run_inspection(account_id):
     print(f"🚀 PROCESSANDO: {account_id}")
     print(f"{'=' * 60}")
 
+    from facebook_business.adobjects.adaccount import AdAccount
+
     account = AdAccount(account_id)
 
     try:
@@ -61,7 +67,7 @@ def main():
         print("❌ Erro: Verifique TOKEN e IDS no .env")
         return
 
-    FacebookAdsApi.init(access_token=token)
+    init_facebook_api(token)
     account_ids = [id.strip() for id in ids_string.split(",")]
 
     for idx, acc_id in enumerate(account_ids):
@@ -4,6 +4,7 @@ Roda sem acessar API ou banco. Valida que o cleaner:
   - Não crasheia com dados incompletos
   - Gera todas as colunas esperadas pelo postgres_loader
   - Nomeia seguidores como 'seguidores_instagram'
+E os cálculos de src/analysis (KPIs e detecção de anomalias).
 """
 
 import sys
@@ -37,6 +38,7 @@ if __name__ == "__main__":
             ],
             "publisher_platform": "instagram",
             "platform_position": "reels",
+            "campaign_id": "120210000000001",
             "campaign_name": "Lancamento_Sarah_Fev",
             "ad_name": "Criativo_01_Video",
             "video_p50_watched_actions": [
@@ -98,4 +100,210 @@ if __name__ == "__main__":
     )
     assert resultado["lead"].iloc[0] == 6, "FALHA: lead total deveria ser 6 (2+1+3)"
 
+    # Payload sem inline_link_clicks nem actions em nenhuma linha (conta sem cliques)
+    sem_cliques = [
+        {k: v for k, v in mock_data[0].items() if k not in ("inline_link_clicks", "actions")}
+    ]
+    resultado = cleaner.transform(sem_cliques)
+    assert resultado["clique_link"].iloc[0] == 0, "FALHA: clique_link sem campos deveria ser 0"
+    assert resultado["lead"].iloc[0] == 0, "FALHA: lead sem actions deveria ser 0"
+    # Payload gravado antes do campaign_id (replay): campanha sem ID, sem KeyError
+    sem_campanha = [{k: v for k, v in mock_data[0].items() if k != "campaign_id"}]
+    assert cleaner.transform(sem_campanha)["id_campanha"].isna().all(), (
+        "FALHA: id_campanha sem campaign_id deveria ser nulo"
+    )
+
+    # KPIs e anomalias (src/analysis) sobre um histórico sintético de rollup
+    from datetime import date, datetime, timedelta
+
+    import pandas as pd
+
+    from src.analysis.anomalies import detect_anomalies
+    from src.analysis.kpis import compute_kpis
+
+    dia = date(2026, 2, 15)
+    historico = pd.DataFrame(
+        [
+            {
+                "account_id": "123",
+                "data_registro": dia - timedelta(days=d),
+                "nome_conta": "Conta Teste",
+                "valor_gasto": 300.0 if d == 0 else 100.0 + d,
+                "lead": 0 if d == 0 else 6,
+            }
+            for d in range(15)
+        ]
+    )
+    anomalias = detect_anomalies(historico, ["account_id"], dia)
+    assert set(anomalias["tipo"]) == {"gasto_alto", "leads_zerados"}, (
+        f"FALHA: anomalias esperadas gasto_alto e leads_zerados, veio {list(anomalias['tipo'])}"
+    )
+    # Campanha sem nome (NULL no rollup) também é avaliada
+    sem_nome = detect_anomalies(historico.assign(campanha=None), ["account_id", "campanha"], dia)
+    assert list(sem_nome["campanha"]) == ["", ""], (
+        "FALHA: campanha sem nome deveria ser avaliada com chave vazia"
+    )
+    kpis = compute_kpis(historico.copy())
+    assert kpis["cpl"].iloc[1] == round(101 / 6, 4), "FALHA: cpl deveria ser gasto / lead"
+    assert pd.isna(kpis["cpl"].iloc[0]), "FALHA: cpl sem lead deveria ser nulo"
+    print("   ✅ KPIs e anomalias OK.")
+
+    # Conta processada em blocos (src.utils.memory): a atividade somada bloco
+    # a bloco tem de bater com a da conta inteira
+    from src.scheduling.adaptive import (
+        DORMENTE_APOS_DIAS,
+        classify,
+        merge_activity,
+        summarize_activity,
+    )
+
+    conta = historico.assign(data_registro=dia, impressoes=1000)
+    blocos = None
+    for inicio in range(0, len(conta), 4):
+        blocos = merge_activity(blocos, summarize_activity(conta.iloc[inicio : inicio + 4], dia))
+    assert blocos == summarize_activity(conta, dia), (
+        "FALHA: atividade em blocos deveria ser igual à da conta inteira"
+    )
+    print("   ✅ Atividade em blocos OK.")
+
+    # Conta pausada: a janela last_30d anda um dia sem entrega nova e nada muda
+    def janela_30d(hoje, pausa):
+        return pd.DataFrame(
+            [
+                {"data_registro": d, "valor_gasto": 50.0, "impressoes": 900}
+                for d in (hoje - timedelta(days=n) for n in range(1, 31))
+                if d <= hoje - timedelta(days=pausa)
+            ]
+        )
+
+    agora = datetime(2026, 2, 15, 12)
+    for pausa in (2, 10):
+        antes = summarize_activity(janela_30d(dia, pausa), dia)
+        amanha = dia + timedelta(days=1)
+        depois = summarize_activity(janela_30d(amanha, pausa + 1), amanha)
+        estado = classify(
+            {"estado": "dormente", "assinatura": antes["assinatura"], "ultima_mudanca": agora},
+            depois,
+            agora + timedelta(days=DORMENTE_APOS_DIAS),
+        )
+        assert depois["assinatura"] == antes["assinatura"] and estado["ultima_mudanca"] == agora, (
+            f"FALHA: conta pausada há {pausa} dias não deveria mudar com a janela andando"
+        )
+    assert estado["estado"] == "dormente", "FALHA: conta pausada deveria continuar dormente"
+    print("   ✅ Janela andando sem atividade OK.")
+
+    # Digest de alertas do ciclo: semelhantes agrupados, mais grave primeiro
+    from src.notification.discord_alert import coalesce
+
+    texto, nivel = coalesce(
+        [("warning", "**Anomalias em 15/02/2026** (1)")]
+        + [("error", f"❌ Erro na conta act_{i}: timeout") for i in range(3)]
+    )
+    assert nivel == "error", "FALHA: digest deveria ter o nível mais grave"
+    assert texto.count("Erro na conta") == 1 and "+2 semelhante(s)" in texto, (
+        "FALHA: erros semelhantes deveriam virar uma linha só"
+    )
+    assert texto.index("Erro na conta") < texto.index("Anomalias"), (
+        "FALHA: erros deveriam vir antes das anomalias"
+    )
+    print("   ✅ Digest de alertas OK.")
+
+    # Erro da API no meio da extração: a conta falha e a agenda mantém o
+    # estado anterior, com o intervalo curto (não vira dormente)
+    from datetime import datetime
+
+    from facebook_business.adobjects.adaccount import AdAccount
+    from facebook_business.exceptions import FacebookRequestError
+
+    from src.pipeline import _process_ads_account
+    from src.scheduling.adaptive import INTERVALO_ATIVA_MIN, AdaptiveScheduler
+    from src.utils.instrumentation import RunRecord
+
+    def get_insights_com_erro(self, *args, **kwargs):
+        raise FacebookRequestError(
+            "Call was not successful",
+            {"method": "GET", "path": "/insights", "params": {}},
+            400,
+            {},
+            '{"error": {"message": "User request limit reached", "code": 17}}',
+        )
+
+    AdAccount.get_insights = get_insights_com_erro
+    record, erros = RunRecord(), []
+    assert _process_ads_account("act_1", None, None, record, erros) == 0
+    conta = record.account("act_1")
+    assert conta["status"] == "erro" and conta["erros_api"] == {"17": 1}, (
+        f"FALHA: erro da API deveria falhar a conta, veio {conta['status']} {conta['erros_api']}"
+    )
+
+    class AgendaFake:
+        def __init__(self, agenda):
+            self.agenda, self.salvas = agenda, []
+
+        def load_account_schedule(self):
+            return self.agenda
+
+        def save_account_schedule(self, rows):
+            self.salvas = rows
+
+    agora = datetime(2026, 2, 15, 12)
+    agenda = AgendaFake(
+        {
+            "act_1": {
+                "estado": "ativa",
+                "gasto_recente": 500.0,
+                "assinatura": "00000000000000ab",
+                "ultima_mudanca": agora - timedelta(hours=1),
+                "proxima_execucao": agora,
+            }
+        }
+    )
+    (linha,) = AdaptiveScheduler(agenda).update(record, agora)
+    assert linha["estado"] == "ativa" and linha["intervalo_min"] == INTERVALO_ATIVA_MIN, (
+        f"FALHA: conta com erro da API deveria continuar ativa, veio {linha['estado']}"
+    )
+    assert linha["ultimo_status"] == "erro", "FALHA: agenda deveria registrar o erro"
+    print("   ✅ Erro da API mantém a agenda OK.")
+
+    # CLI: --profile granular chega aos modos fila e agenda (assinaturas reais,
+    # sem banco nem API)
+    import inspect
+
+    import main as cli
+    import src.pipeline as pipeline
+
+    chamadas = []
+
+    def fake(real):
+        def rodar(*args, **kwargs):
+            chamadas.append(inspect.signature(real).bind(*args, **kwargs).arguments)
+            return RunRecord()
+
+        return rodar
+
+    reais = pipeline.run_queue_worker, pipeline.run_due_accounts
+    pipeline.run_queue_worker, pipeline.run_due_accounts = map(fake, reais)
+    try:
+        for modo in ("--queue", "--due-only"):
+            codigo = cli.main(["run-once", modo, "--profile", "granular", "--accounts", "act_1"])
+            assert codigo == cli.EXIT_OK, f"FALHA: run-once {modo} --profile granular"
+    finally:
+        pipeline.run_queue_worker, pipeline.run_due_accounts = reais
+    assert [c["profile"] for c in chamadas] == ["granular", "granular"], (
+        "FALHA: --profile deveria chegar à fila e à agenda"
+    )
+    print("   ✅ CLI fila/agenda com --profile OK.")
+
+    # Retry HTTP: o sleep de backoff entra na espera de throttling da thread
+    from urllib3.util.retry import RequestHistory
+
+    from src.utils.http import MeteredRetry, backoff_wait_s
+
+    antes = backoff_wait_s()
+    falhas_503 = (RequestHistory("GET", "/", None, 503, None),) * 2
+    MeteredRetry(total=3, backoff_factor=0.05, history=falhas_503).sleep()
+    espera = backoff_wait_s() - antes
+    assert 0.09 <= espera < 1, f"FALHA: backoff de 0,1 s medido como {espera:.3f} s"
+    print("   ✅ Espera de backoff medida OK.")
+
     print("\n✅ TODOS OS TESTES PASSARAM!")
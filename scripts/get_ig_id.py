@@ -1,7 +1,12 @@
 import os
-import requests
+import sys
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.utils.graph_api import GRAPH_API_VERSION, graph_url
+from src.utils.http import get_session
+
 load_dotenv()
 
 
@@ -11,13 +16,13 @@ def find_instagram_id():
         print("❌ Token não encontrado no .env")
         return
 
-    url = "https://graph.facebook.com/v25.0/me/accounts"
+    url = f"{graph_url()}/{GRAPH_API_VERSION}/me/accounts"
     params = {"access_token": token, "fields": "name,instagram_business_account"}
 
     print("🔍 Verificando permissões do Token e buscando ID do Instagram...")
 
     try:
-        response = requests.get(url, params=params)
+        response = get_session().get(url, params=params)
         data = response.json()
 
         if "error" in data:
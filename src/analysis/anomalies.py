@@ -0,0 +1,274 @@
+import os
+from datetime import date, timedelta
+
+from sqlalchemy import text
+
+from src.analysis.rollups import ROLLUPS
+
+# Dias de histórico da linha de base (sem contar o dia avaliado)
+JANELA_DIAS = int(os.getenv("ETL_ANOMALY_WINDOW_DAYS", "14"))
+# Gasto do dia acima de RAZAO × mediana (ou abaixo de mediana / RAZAO)...
+RAZAO_GASTO = float(os.getenv("ETL_ANOMALY_SPEND_RATIO", "2.0"))
+# ...e a mais de Z_MINIMO desvios robustos (MAD) da mediana
+Z_MINIMO = float(os.getenv("ETL_ANOMALY_Z", "3.0"))
+# Linha de base mínima para valer alerta: contas/campanhas pequenas oscilam demais
+GASTO_MINIMO = float(os.getenv("ETL_ANOMALY_MIN_SPEND", "50"))
+LEADS_MINIMO = float(os.getenv("ETL_ANOMALY_MIN_LEADS", "5"))
+# Máximo de anomalias listadas no alerta (o resto vai só para a tabela)
+LIMITE_DIGEST = 20
+
+# Níveis avaliados: rollup de origem e colunas que identificam a série
+NIVEIS = {
+    "conta": {"rollup": "conta_dia", "keys": ["account_id"]},
+    "campanha": {"rollup": "campanha_dia", "keys": ["account_id", "campanha"]},
+}
+
+TIPOS = {
+    "gasto_alto": "💸 gasto acima do normal",
+    "gasto_baixo": "📉 gasto abaixo do normal",
+    "leads_zerados": "🚫 leads zerados",
+}
+
+# Histórico de anomalias: a mesma anomalia (série, dia, tipo) só alerta uma vez,
+# mesmo com vários ciclos por dia
+ANOMALIAS_DDL = """
+    CREATE TABLE IF NOT EXISTS etl_anomalias (
+        account_id TEXT NOT NULL,
+        nivel TEXT NOT NULL,
+        chave TEXT NOT NULL,
+        data_registro DATE NOT NULL,
+        tipo TEXT NOT NULL,
+        nome_conta TEXT,
+        valor NUMERIC,
+        referencia NUMERIC,
+        z NUMERIC,
+        detectada_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (account_id, nivel, chave, data_registro, tipo)
+    )
+"""
+
+
+def load_history(engine, contas: list[str], dia: date, nivel: str, janela: int = JANELA_DIAS):
+    """Lê do rollup do nível as últimas `janela` + 1 datas das contas.
+
+    Returns:
+        DataFrame com as chaves do nível, data_registro, nome_conta,
+        valor_gasto e lead.
+    """
+    import pandas as pd
+
+    spec = NIVEIS[nivel]
+    cols = ", ".join(spec["keys"])
+    query = text(
+        f"SELECT {cols}, data_registro, nome_conta, valor_gasto, lead "
+        f"FROM {ROLLUPS[spec['rollup']]['table']} "
+        "WHERE account_id = ANY(:contas) AND data_registro BETWEEN :inicio AND :dia"
+    )
+    with engine.connect() as conn:
+        return pd.read_sql(
+            query,
+            conn,
+            params={"contas": contas, "inicio": dia - timedelta(days=janela), "dia": dia},
+        )
+
+
+def detect_anomalies(history, keys: list[str], dia: date, janela: int = JANELA_DIAS):
+    """Compara o dia avaliado com a linha de base de cada série (vetorizado).
+
+    O histórico vira uma matriz série × dia (dias sem linha no rollup = 0,
+    sem gasto), e mediana/MAD saem por linha numa operação só, sem loop por
+    conta ou campanha. O dia avaliado fica fora da própria linha de base.
+
+    Regras:
+        gasto_alto: gasto > RAZAO_GASTO × mediana e z > Z_MINIMO.
+        gasto_baixo: gasto < mediana / RAZAO_GASTO e z < -Z_MINIMO.
+        leads_zerados: houve gasto e zero leads, mas a linha de base tinha
+            média >= LEADS_MINIMO por dia e nenhum dia com gasto sem lead
+            (uma série que já zerava às vezes não é anomalia).
+    Só séries com mediana de gasto >= GASTO_MINIMO e gasto em pelo menos
+    metade dos dias da janela são avaliadas (campanha nova não é anomalia).
+
+    Args:
+        history: Saída de load_history().
+        keys: Colunas que identificam a série (ver NIVEIS).
+        dia: Dia avaliado.
+        janela: Dias de linha de base.
+
+    Returns:
+        DataFrame com keys, nome_conta, tipo, valor, referencia e z.
+    """
+    import numpy as np
+    import pandas as pd
+
+    colunas = [*keys, "nome_conta", "tipo", "valor", "referencia", "z"]
+    if history.empty:
+        return pd.DataFrame(columns=colunas)
+
+    dias = pd.date_range(dia - timedelta(days=janela), dia).date
+    # Chave nula (campanha sem nome) some do groupby/pivot_table: vira ""
+    history = history.assign(
+        data_registro=pd.to_datetime(history["data_registro"]).dt.date,
+        **{k: history[k].fillna("") for k in keys},
+    )
+    nomes = history.groupby(keys)["nome_conta"].last()
+
+    def matriz(coluna: str):
+        return (
+            history.pivot_table(
+                index=keys, columns="data_registro", values=coluna, aggfunc="sum"
+            )
+            .reindex(columns=dias, fill_value=0)
+            .fillna(0)
+            .astype("float64")
+        )
+
+    gasto = matriz("valor_gasto").reindex(nomes.index, fill_value=0)
+    leads = matriz("lead").reindex(nomes.index, fill_value=0)
+    base_gasto, hoje_gasto = gasto.iloc[:, :-1].to_numpy(), gasto.iloc[:, -1].to_numpy()
+    base_leads, hoje_leads = leads.iloc[:, :-1].to_numpy(), leads.iloc[:, -1].to_numpy()
+
+    mediana = np.median(base_gasto, axis=1)
+    mad = np.median(np.abs(base_gasto - mediana[:, None]), axis=1)
+    # 1.4826 × MAD ≈ desvio-padrão numa normal; o piso evita z infinito em série constante
+    escala = np.maximum(1.4826 * mad, np.maximum(0.1 * mediana, 1.0))
+    z = (hoje_gasto - mediana) / escala
+
+    elegivel = (mediana >= GASTO_MINIMO) & ((base_gasto > 0).sum(axis=1) >= janela / 2)
+    media_leads = base_leads.mean(axis=1)
+    sempre_teve_lead = ((base_leads == 0) & (base_gasto > 0)).sum(axis=1) == 0
+
+    regras = {
+        "gasto_alto": (
+            elegivel & (hoje_gasto > RAZAO_GASTO * mediana) & (z > Z_MINIMO),
+            hoje_gasto,
+            mediana,
+        ),
+        "gasto_baixo": (
+            elegivel & (hoje_gasto < mediana / RAZAO_GASTO) & (z < -Z_MINIMO),
+            hoje_gasto,
+            mediana,
+        ),
+        "leads_zerados": (
+            elegivel
+            & (hoje_gasto > 0)
+            & (hoje_leads == 0)
+            & (media_leads >= LEADS_MINIMO)
+            & sempre_teve_lead,
+            hoje_leads,
+            media_leads,
+        ),
+    }
+    partes = []
+    for tipo, (mascara, valor, referencia) in regras.items():
+        if not mascara.any():
+            continue
+        parte = nomes.index[mascara].to_frame(index=False)
+        parte["nome_conta"] = nomes.to_numpy()[mascara]
+        parte["tipo"] = tipo
+        parte["valor"] = np.round(valor[mascara], 2)
+        parte["referencia"] = np.round(referencia[mascara], 2)
+        parte["z"] = np.round(z[mascara], 2)
+        partes.append(parte)
+    if not partes:
+        return pd.DataFrame(columns=colunas)
+    return pd.concat(partes, ignore_index=True)[colunas]
+
+
+def save_new(engine, anomalias, nivel: str, dia: date):
+    """Grava as anomalias em etl_anomalias e devolve só as inéditas.
+
+    Returns:
+        Subconjunto de `anomalias` que ainda não estava na tabela.
+    """
+    if anomalias.empty:
+        return anomalias
+
+    chave = anomalias["campanha"] if "campanha" in anomalias else [""] * len(anomalias)
+    params = {
+        "contas": anomalias["account_id"].tolist(),
+        "chaves": list(chave),
+        "tipos": anomalias["tipo"].tolist(),
+        "nomes": anomalias["nome_conta"].tolist(),
+        "valores": anomalias["valor"].astype(float).tolist(),
+        "referencias": anomalias["referencia"].astype(float).tolist(),
+        "zs": anomalias["z"].astype(float).tolist(),
+        "nivel": nivel,
+        "dia": dia,
+    }
+    insert_sql = text(
+        "INSERT INTO etl_anomalias (account_id, nivel, chave, data_registro, tipo, "
+        "nome_conta, valor, referencia, z) "
+        "SELECT t.account_id, :nivel, t.chave, :dia, t.tipo, t.nome_conta, "
+        "t.valor, t.referencia, t.z "
+        "FROM unnest(CAST(:contas AS TEXT[]), CAST(:chaves AS TEXT[]), "
+        "CAST(:tipos AS TEXT[]), CAST(:nomes AS TEXT[]), CAST(:valores AS NUMERIC[]), "
+        "CAST(:referencias AS NUMERIC[]), CAST(:zs AS NUMERIC[])) "
+        "AS t(account_id, chave, tipo, nome_conta, valor, referencia, z) "
+        "ON CONFLICT DO NOTHING RETURNING account_id, chave, tipo"
+    )
+    with engine.begin() as conn:
+        conn.execute(text(ANOMALIAS_DDL))
+        novas = {tuple(row) for row in conn.execute(insert_sql, params)}
+    inedita = [
+        (conta, c, tipo) in novas
+        for conta, c, tipo in zip(params["contas"], params["chaves"], params["tipos"])
+    ]
+    return anomalias[inedita]
+
+
+def format_digest(anomalias: list[tuple[str, object]], dia: date) -> str:
+    """Monta a mensagem única do Discord com as anomalias do ciclo.
+
+    Args:
+        anomalias: [(nivel, DataFrame de detect_anomalies)].
+        dia: Dia avaliado.
+    """
+    linhas = []
+    for nivel, df in anomalias:
+        for row in df.itertuples(index=False):
+            serie = f"{row.nome_conta or row.account_id}"
+            if nivel == "campanha":
+                serie += f" › {row.campanha or '(sem nome)'}"
+            if row.tipo == "leads_zerados":
+                detalhe = f"0 leads (média {row.referencia:g}/dia)"
+            else:
+                detalhe = f"R$ {row.valor:,.2f} (mediana R$ {row.referencia:,.2f}, z={row.z:+.1f})"
+            linhas.append(f"• {TIPOS[row.tipo]} | {serie}: {detalhe}")
+
+    total = len(linhas)
+    corpo = "\n".join(linhas[:LIMITE_DIGEST])
+    if total > LIMITE_DIGEST:
+        corpo += f"\n… e mais {total - LIMITE_DIGEST} (ver tabela etl_anomalias)"
+    return f"**Anomalias em {dia:%d/%m/%Y}** ({total})\n{corpo}"
+
+
+def check_anomalies(engine, contas: list[str], dia: date | None = None, alert=None) -> int:
+    """Detecta anomalias do dia nas contas e envia um único alerta com as anomalias inéditas.
+
+    Lê os rollups (não a tabela fato), então roda em segundos mesmo com
+    centenas de contas. Chamar depois de refresh_rollups().
+
+    Args:
+        engine: Engine SQLAlchemy do Postgres.
+        contas: account_id (formato da tabela fato) a avaliar.
+        dia: Dia avaliado (padrão: ontem, o último dia completo).
+        alert: DiscordAlert (None = só grava e imprime).
+
+    Returns:
+        Quantidade de anomalias inéditas.
+    """
+    dia = dia or date.today() - timedelta(days=1)
+    por_nivel = []
+    for nivel, spec in NIVEIS.items():
+        history = load_history(engine, contas, dia, nivel)
+        novas = save_new(engine, detect_anomalies(history, spec["keys"], dia), nivel, dia)
+        if not novas.empty:
+            por_nivel.append((nivel, novas))
+
+    total = sum(len(df) for _, df in por_nivel)
+    if total:
+        mensagem = format_digest(por_nivel, dia)
+        print(f"\n🔔 {mensagem}")
+        if alert is not None:
+            alert.send(mensagem, level="warning")
+    return total
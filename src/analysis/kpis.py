@@ -0,0 +1,49 @@
+# KPIs derivados: (coluna, numerador, denominador, fator). Definidos uma vez
+# e usados tanto no SQL dos rollups quanto em compute_kpis() (pandas).
+# Denominador zero vira NULL/NaN (sem lead não existe custo por lead).
+KPIS = [
+    ("cpl", "valor_gasto", "lead", 1),
+    ("ctr", "clique_link", "impressoes", 100),  # em %
+    ("cpm", "valor_gasto", "impressoes", 1000),
+    ("custo_por_seguidor", "valor_gasto", "seguidores_instagram", 1),
+]
+
+KPI_COLUMNS = [nome for nome, _, _, _ in KPIS]
+
+# Casas decimais gravadas nos rollups
+KPI_SCALE = 4
+
+
+def kpi_sql(numerador: str, denominador: str, fator: int, alias: str = "f") -> str:
+    """Expressão SQL do KPI sobre as somas do grupo (para o GROUP BY do rollup)."""
+    escala = f" * {fator}" if fator != 1 else ""
+    # SUM de coluna INTEGER é BIGINT: sem o CAST a divisão seria inteira
+    return (
+        f"ROUND(CAST(SUM({alias}.{numerador}) AS NUMERIC){escala} / "
+        f"NULLIF(SUM({alias}.{denominador}), 0), {KPI_SCALE})"
+    )
+
+
+def compute_kpis(df):
+    """Calcula os KPIs (vetorizado) num DataFrame com as métricas somadas.
+
+    KPIs não são aditivos: quem agrega rollups (ex: conta_dia → mês) deve
+    somar as métricas primeiro e chamar isto no resultado, e não tirar a
+    média dos KPIs diários.
+
+    Args:
+        df: DataFrame com as colunas de numerador/denominador de KPIS.
+
+    Returns:
+        O mesmo DataFrame, com as colunas de KPI_COLUMNS cujas métricas
+        estão presentes (NaN onde o denominador é zero).
+    """
+    import pandas as pd
+
+    for nome, numerador, denominador, fator in KPIS:
+        if numerador not in df or denominador not in df:
+            continue
+        num = pd.to_numeric(df[numerador], errors="coerce").astype("float64")
+        den = pd.to_numeric(df[denominador], errors="coerce").astype("float64")
+        df[nome] = (num * fator / den.where(den != 0)).round(KPI_SCALE)
+    return df
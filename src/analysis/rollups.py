@@ -0,0 +1,222 @@
+from sqlalchemy import text
+
+from src.analysis.kpis import KPI_COLUMNS, KPIS, kpi_sql
+from src.load.postgres_loader import ensure_dimensions, view_name
+
+
+# Tabela fato de onde saem os rollups (perfil granular)
+SOURCE_TABLE = "insights_meta_ads"
+
+# Métricas somadas em todos os rollups (mesmos tipos da tabela fato)
+ROLLUP_METRICS = [
+    ("valor_gasto", "NUMERIC"),
+    ("impressoes", "BIGINT"),
+    ("clique_link", "BIGINT"),
+    ("lead_formulario", "BIGINT"),
+    ("lead_site", "BIGINT"),
+    ("lead_mensagem", "BIGINT"),
+    ("lead", "BIGINT"),
+    ("seguidores_instagram", "BIGINT"),
+    ("videoview_3s", "BIGINT"),
+    ("videoview_50", "BIGINT"),
+    ("videoview_75", "BIGINT"),
+]
+
+# Rollups mantidos: grão (chave primária) e tabela. account_id e
+# data_registro estão em todos, porque são o recorte do refresh incremental.
+ROLLUPS = {
+    "conta_dia": {
+        "table": "rollup_conta_dia",
+        "dimensions": ["account_id", "data_registro"],
+    },
+    "campanha_dia": {
+        "table": "rollup_campanha_dia",
+        "dimensions": ["account_id", "campanha", "data_registro"],
+    },
+    "plataforma_dia": {
+        "table": "rollup_plataforma_dia",
+        "dimensions": ["account_id", "plataforma", "data_registro"],
+    },
+}
+
+
+# Engines (URL) em que o DDL já rodou neste processo: CREATE INDEX IF NOT
+# EXISTS ainda pega lock na tabela fato, então não roda a cada ciclo
+_prontas: set[str] = set()
+
+
+def _dimension_type(dimension: str) -> str:
+    return "DATE" if dimension == "data_registro" else "TEXT"
+
+
+def build_source_index_ddl(source: str = SOURCE_TABLE) -> str:
+    """Índice da tabela fato que torna o recorte (conta, intervalo de datas) barato."""
+    return (
+        f"CREATE INDEX IF NOT EXISTS idx_{source}_conta_data "
+        f"ON {source} (account_id, data_registro)"
+    )
+
+
+def build_rollup_ddl(spec: dict) -> str:
+    """DDL da tabela de um rollup (chave primária = grão)."""
+    dims = ", ".join(f"{d} {_dimension_type(d)} NOT NULL" for d in spec["dimensions"])
+    metrics = ", ".join(f"{col} {tipo} NOT NULL DEFAULT 0" for col, tipo in ROLLUP_METRICS)
+    kpis = ", ".join(f"{nome} NUMERIC" for nome in KPI_COLUMNS)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {spec['table']} ({dims}, nome_conta TEXT, "
+        f"{metrics}, anuncios INTEGER NOT NULL DEFAULT 0, {kpis}, "
+        "atualizado_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP, "
+        f"PRIMARY KEY ({', '.join(spec['dimensions'])}))"
+    )
+
+
+def build_kpi_migrations(spec: dict) -> list[str]:
+    """ALTERs que adicionam as colunas de KPI a rollups criados antes delas."""
+    return [
+        f"ALTER TABLE {spec['table']} ADD COLUMN IF NOT EXISTS {nome} NUMERIC"
+        for nome in KPI_COLUMNS
+    ]
+
+
+def build_refresh_sql(spec: dict, source: str = SOURCE_TABLE) -> tuple[str, str]:
+    """SQL de DELETE e INSERT ... SELECT ... GROUP BY de um rollup.
+
+    Os dois recebem os arrays :contas, :inicios e :fins (um intervalo de
+    data_registro por conta) e só tocam essas fatias. Reagregar a fatia
+    inteira (em vez de somar deltas) mantém o rollup certo mesmo quando a
+    Meta corrige ou some com linhas de dias passados.
+
+    Os KPIs (kpis.KPIS) saem no mesmo SELECT, sobre as somas do grupo: são
+    recalculados junto com a fatia e nunca ficam defasados das métricas.
+
+    Lê da view da fato (vw_<source>), que traz nome_conta e campanha das
+    tabelas de dimensão.
+
+    Returns:
+        (delete_sql, insert_sql).
+    """
+    fatias = (
+        "unnest(CAST(:contas AS TEXT[]), CAST(:inicios AS DATE[]), "
+        "CAST(:fins AS DATE[])) AS t(account_id, inicio, fim)"
+    )
+    delete_sql = (
+        f"DELETE FROM {spec['table']} r USING {fatias} "
+        "WHERE r.account_id = t.account_id AND r.data_registro BETWEEN t.inicio AND t.fim"
+    )
+
+    dims = spec["dimensions"]
+    # Dimensão de texto nula viraria chave nula: agrupa como ''
+    select_dims = [
+        f"f.{d}" if d == "data_registro" else f"COALESCE(f.{d}, '')" for d in dims
+    ]
+    metrics = [col for col, _ in ROLLUP_METRICS]
+    insert_sql = (
+        f"INSERT INTO {spec['table']} ({', '.join(dims)}, nome_conta, "
+        f"{', '.join(metrics)}, anuncios, {', '.join(KPI_COLUMNS)})\n"
+        f"SELECT {', '.join(select_dims)}, MAX(f.nome_conta), "
+        + ", ".join(f"COALESCE(SUM(f.{m}), 0)" for m in metrics)
+        + ", COUNT(DISTINCT f.id_anuncio), "
+        + ", ".join(kpi_sql(num, den, fator) for _, num, den, fator in KPIS)
+        + "\n"
+        f"FROM {view_name(source)} f JOIN {fatias}\n"
+        "  ON f.account_id = t.account_id AND f.data_registro BETWEEN t.inicio AND t.fim\n"
+        f"GROUP BY {', '.join(select_dims)}"
+    )
+    return delete_sql, insert_sql
+
+
+def _ensure_tables(conn, rollups: dict, source: str) -> None:
+    chave = f"{conn.engine.url}:{source}"
+    if chave in _prontas:
+        return
+    conn.execute(text(build_source_index_ddl(source)))
+    ensure_dimensions(conn, source)
+    for spec in rollups.values():
+        conn.execute(text(build_rollup_ddl(spec)))
+        for alter in build_kpi_migrations(spec):
+            conn.execute(text(alter))
+    _prontas.add(chave)
+
+
+def refresh_rollups(
+    engine,
+    touched: dict[str, tuple],
+    rollups: dict = ROLLUPS,
+    source: str = SOURCE_TABLE,
+) -> dict[str, int]:
+    """Recalcula os rollups só nas fatias (conta, datas) gravadas no ciclo.
+
+    Tudo numa transação: quem lê os rollups nunca vê uma fatia apagada e
+    ainda não reinserida.
+
+    Args:
+        engine: Engine SQLAlchemy do Postgres (ex: PostgresLoader.engine).
+        touched: {account_id: (primeira_data, última_data)}, como em
+            RunRecord.touched (account_id no formato da tabela fato).
+        rollups: Rollups a atualizar (padrão: todos de ROLLUPS).
+        source: Tabela fato.
+
+    Returns:
+        Linhas reinseridas por rollup.
+    """
+    if not touched:
+        return {}
+
+    contas = list(touched)
+    params = {
+        "contas": contas,
+        "inicios": [str(touched[c][0]) for c in contas],
+        "fins": [str(touched[c][1]) for c in contas],
+    }
+    linhas = {}
+    with engine.begin() as conn:
+        # Réplicas do modo fila atualizam em série (e o DDL não corre em paralelo)
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('etl_rollups'))"))
+        _ensure_tables(conn, rollups, source)
+        for nome, spec in rollups.items():
+            delete_sql, insert_sql = build_refresh_sql(spec, source)
+            conn.execute(text(delete_sql), params)
+            linhas[nome] = conn.execute(text(insert_sql), params).rowcount
+    return linhas
+
+
+def source_ranges(
+    engine,
+    accounts: list[str] | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    source: str = SOURCE_TABLE,
+) -> dict[str, tuple]:
+    """Intervalos de data_registro presentes na tabela fato, por conta.
+
+    Usado para reconstruir os rollups de um período inteiro (primeira carga
+    ou depois de mudar ROLLUP_METRICS).
+
+    Args:
+        accounts: Filtra contas (aceita com ou sem o prefixo act_).
+        since: Data inicial (AAAA-MM-DD), inclusiva.
+        until: Data final (AAAA-MM-DD), inclusiva.
+
+    Returns:
+        {account_id: (primeira_data, última_data)}.
+    """
+    filtros, params = [], {}
+    if accounts:
+        filtros.append("account_id = ANY(:contas)")
+        params["contas"] = [str(a).removeprefix("act_") for a in accounts]
+    if since:
+        filtros.append("data_registro >= :since")
+        params["since"] = since
+    if until:
+        filtros.append("data_registro <= :until")
+        params["until"] = until
+    where = f"WHERE {' AND '.join(filtros)}" if filtros else ""
+    with engine.begin() as conn:
+        result = conn.execute(
+            text(
+                f"SELECT account_id, MIN(data_registro), MAX(data_registro) "
+                f"FROM {source} {where} GROUP BY account_id"
+            ),
+            params,
+        )
+        return {row[0]: (row[1], row[2]) for row in result}
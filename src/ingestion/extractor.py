@@ -1,62 +1,188 @@
 import os
-from facebook_business.api import FacebookAdsApi
-from facebook_business.adobjects.adaccount import AdAccount
+
+from src.ingestion.profiles import get_profile
+from src.utils.deadline import Deadline, DeadlineExceeded
+from src.utils.graph_api import graph_url
+from src.utils.http import backoff_wait_s, mount_shared_adapter, wire_bytes
+
+# Filtra na API os action_types que o DataCleaner descarta (payload menor).
+# Opt-in ("1" liga): um filtro de action_type nos insights pode descartar as
+# linhas anúncio × dia sem nenhuma das actions da lista, que ainda têm gasto,
+# impressões e cliques. Só ligar depois de conferir o gasto com e sem filtro
+# contra a API real.
+ACTION_FILTER = os.getenv("META_ACTION_FILTER", "0") == "1"
 
 
 class MetaExtractor:
     """Cliente da Meta Marketing API para extração de insights de anúncios."""
 
     def __init__(self, account_id: str):
+        # O SDK é pesado (centenas de módulos): só carrega quando há extração
+        from facebook_business.api import FacebookAdsApi
+        from facebook_business.session import FacebookSession
+
         self.account_id = account_id
         self.access_token = os.getenv("META_ACCESS_TOKEN")
-        FacebookAdsApi.init(access_token=self.access_token)
 
-    def get_ad_insights(self, date_preset: str = "last_30d") -> list[dict]:
-        """Extrai insights granulares por anúncio com breakdowns de plataforma.
+        # Contadores de uso da API (lidos pelo RunRecord do ciclo)
+        self.api_calls = 0
+        # Bytes na rede (comprimidos) e o mesmo corpo descomprimido (JSON);
+        # respostas sem tamanho na rede entram descomprimidas e são contadas
+        # em responses_without_wire_size
+        self.bytes_downloaded = 0
+        self.bytes_decompressed = 0
+        self.responses_without_wire_size = 0
+        self.api_errors: dict[str, int] = {}
+        # Espera em backoff/Retry-After já acumulada pela thread antes desta conta
+        self._espera_inicial_s = backoff_wait_s()
+
+        session = FacebookSession(access_token=self.access_token)
+        session.GRAPH = graph_url()
+        # Pool compartilhado: a conta seguinte reaproveita a conexão TLS aberta
+        mount_shared_adapter(session.requests)
+        session.requests.hooks["response"].append(self._track_response)
+        self.api = FacebookAdsApi(session)
+
+    @property
+    def backoff_wait_s(self) -> float:
+        """Segundos dormidos em backoff/Retry-After desde que a conta começou."""
+        return backoff_wait_s() - self._espera_inicial_s
+
+    def _track_response(self, response, *args, **kwargs):
+        """Hook do requests: conta cada chamada HTTP e o tamanho do payload."""
+        self.api_calls += 1
+        corpo = len(response.content)
+        self.bytes_decompressed += corpo
+        rede = wire_bytes(response)
+        if rede is None:
+            self.responses_without_wire_size += 1
+            rede = corpo
+        self.bytes_downloaded += rede
+
+    def transfer_summary(self) -> str:
+        """Bytes na rede e descomprimidos, para o log da extração."""
+        resumo = (
+            f"{self.bytes_downloaded / 1024:.0f} KB na rede, "
+            f"{self.bytes_decompressed / 1024:.0f} KB descomprimidos"
+        )
+        if self.responses_without_wire_size:
+            resumo += (
+                f" ({self.responses_without_wire_size} respostas sem tamanho na rede, "
+                "contadas descomprimidas)"
+            )
+        return resumo
+
+    def get_ad_insights(self, **kwargs) -> list[dict]:
+        """Extrai todos os insights da conta numa lista (ver iter_ad_insights).
+
+        Returns:
+            Lista de dicts com os dados brutos (uma linha por combinação de
+            level × dia × breakdowns do perfil).
+        """
+        return [row for chunk in self.iter_ad_insights(**kwargs) for row in chunk]
+
+    def iter_ad_insights(
+        self,
+        date_preset: str = "last_30d",
+        time_range: dict | None = None,
+        deadline: Deadline | None = None,
+        profile: dict | None = None,
+        action_filter: bool = ACTION_FILTER,
+        chunk_rows=None,
+    ):
+        """Extrai insights conforme o perfil (padrão: por anúncio com breakdowns de plataforma).
+
+        Entrega os dados em blocos, à medida que o cursor pagina, para a conta
+        ser transformada e carregada sem o payload inteiro em memória.
 
         Args:
             date_preset: Janela de tempo da API (ex: 'last_30d', 'last_90d').
+            time_range: Janela fixa {'since': 'AAAA-MM-DD', 'until': 'AAAA-MM-DD'}
+                (backfill). Quando informada, substitui o date_preset.
+            deadline: Prazo da conta; checado entre páginas do cursor.
+            profile: Perfil de extração (ver src/ingestion/profiles.py) com
+                level, fields e breakdowns. Padrão: ETL_EXTRACTION_PROFILE.
+            action_filter: Envia `filtering` com os action_types usados pelo
+                DataCleaner, para a API não devolver as dezenas de outros
+                (padrão: META_ACTION_FILTER).
+            chunk_rows: Linhas por bloco, ou função sem argumentos consultada a
+                cada bloco (ex: MemoryBudget.chunk_rows). Padrão: um bloco só.
 
-        Returns:
-            Lista de dicts com os dados brutos de cada anúncio/dia/plataforma.
+        Yields:
+            Listas de dicts com os dados brutos (uma linha por combinação de
+            level × dia × breakdowns do perfil).
+
+        Raises:
+            DeadlineExceeded: Se o prazo acabar antes da última página (os
+                blocos já entregues ficam; a conta é refeita no próximo ciclo).
+            Exception: Erro da API (ex: FacebookRequestError), depois de contado
+                em api_errors. A extração ficou incompleta: quem chama marca a
+                conta como falha (os blocos já entregues continuam válidos).
         """
-        account = AdAccount(self.account_id)
-
-        fields = [
-            "ad_id",
-            "ad_name",
-            "campaign_name",
-            "spend",
-            "impressions",
-            "inline_link_clicks",
-            "actions",
-            "date_start",
-            "account_id",
-            "account_name",
-            "video_p50_watched_actions",
-            "video_p75_watched_actions",
-        ]
+        from facebook_business.adobjects.adaccount import AdAccount
+
+        account = AdAccount(self.account_id, api=self.api)
+        profile = profile or get_profile()
+
+        fields = profile["fields"]
 
         params = {
-            "level": "ad",
+            "level": profile["level"],
             "date_preset": date_preset,
             "time_increment": 1,
             "limit": 500,
-            "breakdowns": ["publisher_platform", "platform_position"],
-            "action_breakdowns": ["action_type"],
+            "action_breakdowns": profile["action_breakdowns"],
         }
+        # Cada breakdown multiplica as linhas: só pede os que o perfil usa
+        if profile["breakdowns"]:
+            params["breakdowns"] = profile["breakdowns"]
+        if action_filter:
+            from src.transformation.action_mapping import used_action_types
+
+            params["filtering"] = [
+                {"field": "action_type", "operator": "IN", "value": used_action_types()}
+            ]
+
+        janela = date_preset
+        if time_range:
+            del params["date_preset"]
+            params["time_range"] = time_range
+            janela = f"{time_range['since']} → {time_range['until']}"
 
         print(
-            f"📥 [Ingestion] Baixando dados da conta {self.account_id} ({date_preset})..."
+            f"📥 [Ingestion] Baixando dados da conta {self.account_id} "
+            f"({janela}, perfil {profile['nome']})..."
         )
 
+        def limite() -> float:
+            if chunk_rows is None:
+                return float("inf")
+            return chunk_rows() if callable(chunk_rows) else chunk_rows
+
         try:
             insights = account.get_insights(fields=fields, params=params)
-            data = [dict(insight) for insight in insights]
-            print(f"✅ [Ingestion] {len(data)} linhas extraídas.")
-            return data
+            data, total = [], 0
+            for insight in insights:
+                data.append(dict(insight))
+                total += 1
+                # O cursor busca páginas sob demanda: checar aqui para antes da próxima
+                if deadline is not None and deadline.expired:
+                    raise DeadlineExceeded(
+                        f"Conta {self.account_id}: prazo estourado após {total} linhas"
+                    )
+                if len(data) >= limite():
+                    yield data
+                    data = []
+            if data:
+                yield data
+            print(f"✅ [Ingestion] {total} linhas extraídas ({self.transfer_summary()}).")
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             print(f"❌ [Ingestion] Erro na conta {self.account_id}: {e}")
+            code = "desconhecido"
             if hasattr(e, "api_error_message"):
                 print(f"   Detalhe API: {e.api_error_message()}")
-            return []
+                code = str(e.api_error_code())
+            self.api_errors[code] = self.api_errors.get(code, 0) + 1
+            raise
@@ -2,7 +2,10 @@ import os
 import requests
 import logging
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta
+
+from src.utils.graph_api import GRAPH_API_VERSION, graph_url
+from src.utils.http import get_session
 
 
 class InstagramProfileExtractor:
@@ -14,11 +17,11 @@ class InstagramProfileExtractor:
     def __init__(self, access_token: str, ig_account_id: str):
         self.access_token = access_token
         self.ig_account_id = ig_account_id
-        self.base_url = "https://graph.facebook.com/v25.0"
+        self.base_url = f"{graph_url()}/{GRAPH_API_VERSION}"
 
-    def get_daily_followers(self) -> pd.DataFrame:
+    def get_daily_followers(self, day: date | None = None) -> pd.DataFrame:
         """
-        Busca a métrica 'follows_and_unfollows' do dia anterior.
+        Busca a métrica 'follows_and_unfollows' do dia anterior (ou de `day`, no backfill).
         Retorna um DataFrame compatível com a tabela 'instagram_crescimento' (Chave Composta).
         """
         if not self.ig_account_id:
@@ -26,8 +29,10 @@ class InstagramProfileExtractor:
             return pd.DataFrame()
 
         # Define o período da busca (D-1 para pegar o dia completo fechado)
-        ontem = datetime.now() - timedelta(days=1)
-        since = int(ontem.replace(hour=0, minute=0, second=0).timestamp())
+        if day is None:
+            day = (datetime.now() - timedelta(days=1)).date()
+        ontem = datetime.combine(day, time.min)
+        since = int(ontem.timestamp())
         until = int(ontem.replace(hour=23, minute=59, second=59).timestamp())
 
         url = f"{self.base_url}/{self.ig_account_id}/insights"
@@ -43,7 +48,7 @@ class InstagramProfileExtractor:
         }
 
         try:
-            response = requests.get(url, params=params)
+            response = get_session().get(url, params=params)
             response.raise_for_status()
             data = response.json()
 
@@ -0,0 +1,259 @@
+import json
+import os
+
+from sqlalchemy import text
+
+from src.utils.graph_api import GRAPH_API_VERSION, graph_url
+from src.utils.http import get_session
+
+
+# Idade máxima de uma entrada: depois disso ela é rebuscada mesmo sem
+# updated_time novo (contas não têm updated_time e dependem só disto)
+METADATA_TTL_H = float(os.getenv("ETL_METADATA_TTL_HOURS", "24"))
+# IDs por chamada ?ids= (limite da Graph API: 50)
+IDS_POR_CHAMADA = 50
+# Itens por página na listagem leve (id, updated_time)
+LISTAGEM_LIMIT = 500
+
+# Tipos de entidade: edge da conta que lista os IDs com updated_time
+# (None = sem listagem nem updated_time; vale só o TTL)
+ENTIDADES = {
+    "conta": {"edge": None},
+    "campanha": {"edge": "campaigns"},
+    "anuncio": {"edge": "ads"},
+}
+
+# Uma linha por entidade × conjunto de campos pedido (quem pede campos
+# diferentes não invalida o cache do outro)
+METADATA_CACHE_DDL = """
+    CREATE TABLE IF NOT EXISTS etl_metadata_cache (
+        tipo TEXT NOT NULL,
+        entity_id TEXT NOT NULL,
+        campos TEXT NOT NULL,
+        account_id TEXT,
+        updated_time TEXT,
+        dados JSONB NOT NULL,
+        buscado_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (tipo, entity_id, campos)
+    )
+"""
+
+
+def fields_key(fields: list[str]) -> str:
+    """Assinatura de um conjunto de campos (ordem e espaços não importam)."""
+    return ",".join(sorted(f.replace(" ", "") for f in fields))
+
+
+def _param(value) -> str:
+    """Parâmetro da Graph API: listas/dicts vão como JSON (ex: effective_status)."""
+    return json.dumps(value) if isinstance(value, (list, dict)) else str(value)
+
+
+class MetadataCache:
+    """Cache de atributos de conta, campanha e anúncio, persistido no Postgres.
+
+    Atributos de entidade (nome, objetivo, criativo, UTMs) quase nunca mudam,
+    mas scripts e enriquecimentos os pediam à API a cada execução. Aqui:
+
+    1. Campanhas e anúncios são listados só com id e updated_time (payload
+       mínimo, uma página para centenas de entidades).
+    2. Do cache (etl_metadata_cache) saem as entradas com o mesmo
+       updated_time e mais novas que o TTL.
+    3. O resto é buscado com os campos pedidos, em lotes de até 50 IDs por
+       chamada (?ids=), e gravado para os próximos ciclos.
+
+    Contas não têm updated_time: valem pelo TTL (ETL_METADATA_TTL_HOURS).
+    Erros HTTP sobem (requests.HTTPError) para quem chamou.
+    """
+
+    def __init__(
+        self,
+        engine,
+        access_token: str | None = None,
+        ttl_hours: float = METADATA_TTL_H,
+    ):
+        self.engine = engine
+        self.access_token = access_token or os.getenv("META_ACCESS_TOKEN")
+        self.ttl_s = ttl_hours * 3600
+        self.base_url = f"{graph_url()}/{GRAPH_API_VERSION}"
+
+        # Contadores da instância (ver summary)
+        self.api_calls = 0
+        self.hits = 0
+        self.misses = 0
+        self._pronta = False
+
+    def get_accounts(self, account_ids: list[str], fields: list[str]) -> dict[str, dict]:
+        """Atributos das contas (act_...), pelo TTL."""
+        ids = [a if a.startswith("act_") else f"act_{a}" for a in account_ids]
+        return self._resolve("conta", dict.fromkeys(ids), fields)
+
+    def get_campaigns(self, account_id: str, fields: list[str], **kwargs) -> dict[str, dict]:
+        """Atributos das campanhas da conta (ver get_entities)."""
+        return self.get_entities("campanha", account_id, fields, **kwargs)
+
+    def get_ads(self, account_id: str, fields: list[str], **kwargs) -> dict[str, dict]:
+        """Atributos dos anúncios da conta (ver get_entities)."""
+        return self.get_entities("anuncio", account_id, fields, **kwargs)
+
+    def get_entities(
+        self,
+        tipo: str,
+        account_id: str,
+        fields: list[str],
+        params: dict | None = None,
+        max_items: int | None = None,
+    ) -> dict[str, dict]:
+        """Atributos das entidades `tipo` da conta, buscando só as que mudaram.
+
+        Args:
+            tipo: 'campanha' ou 'anuncio' (ver ENTIDADES).
+            account_id: Conta (com ou sem act_).
+            fields: Campos da Graph API (aceita sintaxe aninhada, ex:
+                "creative{url_tags,website_url}").
+            params: Filtros da listagem (ex: {"effective_status": ["ACTIVE"]}).
+            max_items: Para a listagem depois de N entidades.
+
+        Returns:
+            {entity_id: dict da API}, na ordem da listagem.
+        """
+        account_id = account_id if account_id.startswith("act_") else f"act_{account_id}"
+        versoes = self._list_versions(tipo, account_id, params or {}, max_items)
+        return self._resolve(tipo, versoes, fields, account_id.removeprefix("act_"))
+
+    def summary(self) -> str:
+        return (
+            f"{self.hits + self.misses} entidades: {self.hits} do cache, "
+            f"{self.misses} buscadas ({self.api_calls} chamadas à API)"
+        )
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+    def _get(self, url: str, params: dict | None = None) -> dict:
+        self.api_calls += 1
+        response = get_session().get(url, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    def _list_versions(
+        self, tipo: str, account_id: str, params: dict, max_items: int | None
+    ) -> dict[str, str | None]:
+        """{id: updated_time} das entidades da conta (listagem paginada leve)."""
+        edge = ENTIDADES[tipo]["edge"]
+        query = {
+            **{k: _param(v) for k, v in params.items()},
+            "fields": "id,updated_time",
+            "limit": min(LISTAGEM_LIMIT, max_items or LISTAGEM_LIMIT),
+            "access_token": self.access_token,
+        }
+        url, versoes = f"{self.base_url}/{account_id}/{edge}", {}
+        while url and (max_items is None or len(versoes) < max_items):
+            data = self._get(url, query)
+            for item in data.get("data", []):
+                versoes[item["id"]] = item.get("updated_time")
+            # O link next já traz todos os parâmetros
+            url, query = data.get("paging", {}).get("next"), None
+        if max_items is not None:
+            versoes = dict(list(versoes.items())[:max_items])
+        return versoes
+
+    def _fetch(self, tipo: str, ids: list[str], fields: list[str]) -> dict[str, dict]:
+        """Busca os IDs com os campos pedidos, em lotes de IDS_POR_CHAMADA."""
+        campos = list(fields)
+        if ENTIDADES[tipo]["edge"] and "updated_time" not in campos:
+            campos.append("updated_time")
+        encontrados = {}
+        for inicio in range(0, len(ids), IDS_POR_CHAMADA):
+            lote = ids[inicio : inicio + IDS_POR_CHAMADA]
+            encontrados.update(
+                self._get(
+                    f"{self.base_url}/",
+                    {
+                        "ids": ",".join(lote),
+                        "fields": ",".join(campos),
+                        "access_token": self.access_token,
+                    },
+                )
+            )
+        return encontrados
+
+    # ------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------
+    def _resolve(
+        self,
+        tipo: str,
+        versoes: dict[str, str | None],
+        fields: list[str],
+        account_id: str | None = None,
+    ) -> dict[str, dict]:
+        if not versoes:
+            return {}
+        campos = fields_key(fields)
+        cache = self._load(tipo, list(versoes), campos)
+        validos = {
+            entity_id: dados
+            for entity_id, (updated_time, dados, fresco) in cache.items()
+            if fresco and updated_time == versoes[entity_id]
+        }
+        faltando = [entity_id for entity_id in versoes if entity_id not in validos]
+        buscados = self._fetch(tipo, faltando, fields) if faltando else {}
+        self._save(tipo, campos, account_id, buscados)
+
+        self.hits += len(validos)
+        self.misses += len(faltando)
+        return {
+            entity_id: validos.get(entity_id) or buscados[entity_id]
+            for entity_id in versoes
+            if entity_id in validos or entity_id in buscados
+        }
+
+    def _ensure_table(self, conn) -> None:
+        if not self._pronta:
+            conn.execute(text(METADATA_CACHE_DDL))
+            self._pronta = True
+
+    def _load(self, tipo: str, ids: list[str], campos: str) -> dict[str, tuple]:
+        """{id: (updated_time, dados, dentro_do_ttl)} das entradas em cache."""
+        with self.engine.begin() as conn:
+            self._ensure_table(conn)
+            result = conn.execute(
+                text(
+                    "SELECT entity_id, updated_time, dados, "
+                    "buscado_em > CURRENT_TIMESTAMP - make_interval(secs => :ttl) "
+                    "FROM etl_metadata_cache "
+                    "WHERE tipo = :tipo AND campos = :campos AND entity_id = ANY(:ids)"
+                ),
+                {"tipo": tipo, "campos": campos, "ids": ids, "ttl": self.ttl_s},
+            )
+            return {row[0]: (row[1], row[2], row[3]) for row in result}
+
+    def _save(self, tipo: str, campos: str, account_id: str | None, buscados: dict) -> None:
+        if not buscados:
+            return
+        ids = list(buscados)
+        params = {
+            "tipo": tipo,
+            "campos": campos,
+            "conta": account_id,
+            "ids": ids,
+            "versoes": [buscados[i].get("updated_time") for i in ids],
+            "dados": [json.dumps(buscados[i]) for i in ids],
+        }
+        with self.engine.begin() as conn:
+            self._ensure_table(conn)
+            conn.execute(
+                text(
+                    "INSERT INTO etl_metadata_cache "
+                    "(tipo, entity_id, campos, account_id, updated_time, dados) "
+                    "SELECT :tipo, t.entity_id, :campos, :conta, t.updated_time, "
+                    "CAST(t.dados AS JSONB) "
+                    "FROM unnest(CAST(:ids AS TEXT[]), CAST(:versoes AS TEXT[]), "
+                    "CAST(:dados AS TEXT[])) AS t(entity_id, updated_time, dados) "
+                    "ON CONFLICT (tipo, entity_id, campos) DO UPDATE SET "
+                    "account_id = EXCLUDED.account_id, updated_time = EXCLUDED.updated_time, "
+                    "dados = EXCLUDED.dados, buscado_em = CURRENT_TIMESTAMP"
+                ),
+                params,
+            )
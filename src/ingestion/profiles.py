@@ -0,0 +1,89 @@
+import os
+
+
+# Campos de métrica comuns a todos os perfis (a granularidade muda, as métricas não)
+CAMPOS_METRICAS = [
+    "spend",
+    "impressions",
+    "inline_link_clicks",
+    "actions",
+    "date_start",
+    "account_id",
+    "account_name",
+    "video_p50_watched_actions",
+    "video_p75_watched_actions",
+]
+
+# Colunas de dimensão que o DataCleaner sabe gerar (as métricas vêm sempre)
+DIMENSOES = [
+    "id_anuncio",
+    "data_registro",
+    "account_id",
+    "nome_conta",
+    "id_campanha",
+    "campanha",
+    "anuncio",
+    "plataforma",
+    "posicionamento",
+]
+
+# Perfis de extração: o que pedir à API e onde gravar.
+#   level/fields/breakdowns/action_breakdowns → parâmetros do get_insights
+#   dimensions → colunas de dimensão da tabela (as demais de DIMENSOES saem)
+#   key → colunas do hash_id (chave do UPSERT)
+#   table → tabela de destino
+PROFILES = {
+    # Anúncio × dia × plataforma × posicionamento (o comportamento original)
+    "granular": {
+        "level": "ad",
+        "fields": ["ad_id", "ad_name", "campaign_id", "campaign_name", *CAMPOS_METRICAS],
+        "breakdowns": ["publisher_platform", "platform_position"],
+        "action_breakdowns": ["action_type"],
+        "dimensions": DIMENSOES,
+        "key": ["id_anuncio", "data_registro", "plataforma", "posicionamento"],
+        "table": "insights_meta_ads",
+    },
+    # Anúncio × dia, sem explodir por posicionamento
+    "ad_daily": {
+        "level": "ad",
+        "fields": ["ad_id", "ad_name", "campaign_id", "campaign_name", *CAMPOS_METRICAS],
+        "breakdowns": [],
+        "action_breakdowns": ["action_type"],
+        "dimensions": [d for d in DIMENSOES if d not in ("plataforma", "posicionamento")],
+        "key": ["id_anuncio", "data_registro"],
+        "table": "insights_meta_ads_diario",
+    },
+    # Totais da conta por dia (dashboards leves)
+    "account_daily": {
+        "level": "account",
+        "fields": CAMPOS_METRICAS,
+        "breakdowns": [],
+        "action_breakdowns": ["action_type"],
+        "dimensions": ["data_registro", "account_id", "nome_conta"],
+        "key": ["account_id", "data_registro"],
+        "table": "insights_meta_contas_diario",
+    },
+}
+
+DEFAULT_PROFILE = os.getenv("ETL_EXTRACTION_PROFILE", "granular")
+
+# Perfil dono das tabelas de controle por conta (agenda adaptativa, carry-over,
+# fila): os perfis leves rodam por fora delas, com lock próprio
+BASE_PROFILE = "granular"
+
+
+def get_profile(name: str | None = None) -> dict:
+    """Devolve o perfil de extração `name` (padrão: ETL_EXTRACTION_PROFILE).
+
+    Returns:
+        Cópia do dict do perfil, com a chave extra 'nome'.
+
+    Raises:
+        ValueError: Se o perfil não existir.
+    """
+    name = name or DEFAULT_PROFILE
+    if name not in PROFILES:
+        raise ValueError(
+            f"Perfil de extração desconhecido: '{name}' (opções: {', '.join(PROFILES)})"
+        )
+    return {"nome": name, **PROFILES[name]}
@@ -0,0 +1,195 @@
+import os
+import uuid
+from contextlib import contextmanager
+
+import pandas as pd
+
+
+# Raiz dos arquivos Parquet (um diretório por tabela de destino)
+PARQUET_DIR = os.getenv("ETL_PARQUET_DIR", "data/processed/parquet")
+# Codec de compressão (zstd: ~o tamanho do gzip, descompressão bem mais rápida)
+PARQUET_COMPRESSION = os.getenv("ETL_PARQUET_COMPRESSION", "zstd")
+
+# Nome do arquivo de cada partição (conta × mês)
+PARTITION_FILE = "data.parquet"
+# Trava da partição, ao lado do arquivo (o "." faz a leitura do dataset ignorá-la)
+LOCK_FILE = ".data.parquet.lock"
+
+# Colunas do Postgres que não vão para o Parquet: o payload bruto (pesado e
+# só para auditoria) e a conta, que já é o diretório da partição
+EXCLUDED_COLUMNS = {"raw_data", "account_id"}
+
+
+def _arrow_type(tipo: str):
+    import pyarrow as pa
+
+    return {
+        "TEXT": pa.string(),
+        "DATE": pa.date32(),
+        "NUMERIC": pa.float64(),
+        "BIGINT": pa.int64(),
+    }[tipo]
+
+
+class ParquetExporter:
+    """Exporta insights limpos para Parquet particionado por conta e mês.
+
+    Layout (particionamento Hive, lido direto por pyarrow/pandas, DuckDB,
+    Spark e afins):
+
+        <root>/<tabela>/account_id=<conta>/mes=<AAAA-MM>/data.parquet
+
+    Cada ciclo só reescreve as partições que recebeu: as linhas novas
+    substituem as de mesmo hash_id e o arquivo é trocado atomicamente
+    (escreve ao lado e faz os.replace), então quem lê nunca vê um arquivo
+    pela metade nem linhas duplicadas. A leitura-mescla-regravação de cada
+    partição roda sob uma trava de arquivo (flock), para réplicas que
+    dividem o diretório não perderem as linhas umas das outras.
+    """
+
+    def __init__(
+        self,
+        table: str = "insights_meta_ads",
+        columns: tuple | None = None,
+        root: str = PARQUET_DIR,
+        compression: str = PARQUET_COMPRESSION,
+    ):
+        from src.load.postgres_loader import INSIGHTS_COLUMNS
+
+        self.table = table
+        self.columns = tuple(columns or INSIGHTS_COLUMNS)
+        self.root = os.path.join(root, table)
+        self.compression = compression
+        self.schema = self._build_schema()
+
+    @classmethod
+    def for_profile(cls, profile: dict, root: str = PARQUET_DIR) -> "ParquetExporter":
+        """Exporter da tabela/colunas de um perfil de extração (ver profiles.py)."""
+        from src.load.postgres_loader import profile_columns
+
+        return cls(table=profile["table"], columns=profile_columns(profile), root=root)
+
+    def _build_schema(self):
+        import pyarrow as pa
+
+        return pa.schema(
+            [
+                (col, _arrow_type(tipo))
+                for col, tipo, _ in self.columns
+                if col not in EXCLUDED_COLUMNS
+            ]
+        )
+
+    def partitioning(self):
+        """Particionamento Hive com conta e mês como texto (sem isso o
+        pyarrow infere account_id=123 como inteiro)."""
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        return ds.partitioning(
+            pa.schema([("account_id", pa.string()), ("mes", pa.string())]), flavor="hive"
+        )
+
+    def read(self, filter=None, columns: list[str] | None = None) -> pd.DataFrame:
+        """Lê as partições exportadas (filtros por conta/mês pulam diretórios).
+
+        Args:
+            filter: Expressão pyarrow.dataset, ex:
+                ds.field("account_id") == "123" & (ds.field("mes") >= "2026-01").
+            columns: Colunas a ler (padrão: todas, com account_id e mes).
+        """
+        import pyarrow.dataset as ds
+
+        dataset = ds.dataset(self.root, format="parquet", partitioning=self.partitioning())
+        return dataset.to_table(filter=filter, columns=columns).to_pandas()
+
+    def partition_path(self, account_id: str, mes: str) -> str:
+        return os.path.join(self.root, f"account_id={account_id}", f"mes={mes}", PARTITION_FILE)
+
+    def _normalize(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Aplica o schema da tabela (mesmos tipos e preenchimentos do Postgres)."""
+        df = df.copy()
+        for col in self.schema.names:
+            if col not in df.columns:
+                df[col] = None
+        for col, tipo, _ in self.columns:
+            if col not in df.columns or col in EXCLUDED_COLUMNS:
+                continue
+            if tipo == "DATE":
+                df[col] = pd.to_datetime(df[col]).dt.date
+            elif tipo == "BIGINT":
+                df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype("int64")
+            elif tipo == "NUMERIC":
+                df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype("float64")
+        return df
+
+    @contextmanager
+    def _partition_lock(self, path: str):
+        """Trava exclusiva da partição (flock no LOCK_FILE do diretório dela).
+
+        Sem fcntl (Windows) não trava: vale só para uma réplica por diretório.
+        """
+        try:
+            import fcntl
+        except ImportError:
+            yield
+            return
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(os.path.join(os.path.dirname(path), LOCK_FILE), "a") as trava:
+            fcntl.flock(trava, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(trava, fcntl.LOCK_UN)
+
+    def _write_partition(self, path: str, novas: pd.DataFrame) -> int:
+        """Mescla as linhas na partição (hash_id novo substitui o antigo) e grava."""
+        with self._partition_lock(path):
+            return self._merge_partition(path, novas)
+
+    def _merge_partition(self, path: str, novas: pd.DataFrame) -> int:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if os.path.exists(path):
+            atual = pq.read_table(path, schema=self.schema).to_pandas()
+            atual = atual[~atual["hash_id"].isin(novas["hash_id"])]
+            novas = pd.concat([atual, novas[self.schema.names]], ignore_index=True)
+        novas = novas.sort_values(["data_registro", "hash_id"], kind="stable")
+
+        tabela = pa.Table.from_pandas(
+            novas[self.schema.names], schema=self.schema, preserve_index=False
+        )
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Oculto ("."), como a trava: a leitura do dataset não vê o arquivo pela metade
+        pasta, nome = os.path.split(path)
+        temporario = os.path.join(pasta, f".{nome}.{uuid.uuid4().hex}.tmp")
+        try:
+            pq.write_table(tabela, temporario, compression=self.compression)
+            os.replace(temporario, path)
+        finally:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+        return tabela.num_rows
+
+    def export(self, df: pd.DataFrame) -> dict[tuple[str, str], int]:
+        """Grava as linhas nas partições (conta × mês) correspondentes.
+
+        Args:
+            df: DataFrame limpo (saída do DataCleaner ou lido da tabela),
+                com account_id, data_registro e hash_id.
+
+        Returns:
+            {(account_id, 'AAAA-MM'): linhas na partição depois da gravação}.
+        """
+        if df.empty:
+            return {}
+
+        df = self._normalize(df)
+        meses = pd.to_datetime(df["data_registro"]).dt.strftime("%Y-%m")
+        particoes = {}
+        for (conta, mes), grupo in df.groupby([df["account_id"].astype(str), meses]):
+            path = self.partition_path(conta, mes)
+            particoes[(conta, mes)] = self._write_partition(path, grupo)
+        return particoes
@@ -1,64 +1,566 @@
 import os
+import io
 import json
+import uuid
+from functools import lru_cache
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import column, create_engine, table, text
+from sqlalchemy.dialects.postgresql import insert
 
 
+# Especificação única das colunas de insights_meta_ads.
+# (coluna, tipo no staging, atualizada no ON CONFLICT)
+# Daqui saem REQUIRED_COLUMNS, o DDL do staging e o SQL do merge; os perfis
+# de extração leves usam um recorte dela (ver profile_columns).
+INSIGHTS_COLUMNS = [
+    ("id_anuncio", "TEXT", False),
+    ("data_registro", "DATE", False),
+    ("account_id", "TEXT", False),
+    ("nome_conta", "TEXT", False),
+    ("id_campanha", "TEXT", False),
+    ("campanha", "TEXT", False),
+    ("anuncio", "TEXT", False),
+    ("plataforma", "TEXT", False),
+    ("posicionamento", "TEXT", False),
+    ("valor_gasto", "NUMERIC", True),
+    ("impressoes", "BIGINT", True),
+    ("clique_link", "BIGINT", True),
+    ("lead_formulario", "BIGINT", True),
+    ("lead_site", "BIGINT", True),
+    ("lead_mensagem", "BIGINT", True),
+    ("seguidores_instagram", "BIGINT", True),
+    ("videoview_3s", "BIGINT", True),
+    ("videoview_50", "BIGINT", True),
+    ("videoview_75", "BIGINT", True),
+    ("lead", "BIGINT", True),
+    ("hash_id", "TEXT", False),
+    ("raw_data", "JSONB", True),
+]
+
 # Colunas que o banco espera — usada como filtro de segurança
-REQUIRED_COLUMNS = [
-    "id_anuncio",
-    "data_registro",
-    "account_id",
-    "nome_conta",
-    "campanha",
-    "anuncio",
-    "plataforma",
-    "posicionamento",
-    "valor_gasto",
-    "impressoes",
-    "clique_link",
-    "lead_formulario",
-    "lead_site",
-    "lead_mensagem",
-    "seguidores_instagram",
-    "videoview_3s",
-    "videoview_50",
-    "videoview_75",
-    "lead",
-    "hash_id",
-    "raw_data",
+REQUIRED_COLUMNS = [col for col, _, _ in INSIGHTS_COLUMNS]
+
+# Nomes que vivem nas tabelas de dimensão (dim_conta, dim_campanha,
+# dim_anuncio) e não na tabela fato: chegam no staging, mas a fato guarda
+# só os IDs (account_id, id_anuncio). Quem precisa dos nomes lê vw_<tabela>.
+NAME_COLUMNS = {"nome_conta", "campanha", "anuncio"}
+# Colunas do staging que só alimentam as dimensões (a campanha do anúncio
+# fica em dim_anuncio)
+DIMENSION_ONLY_COLUMNS = NAME_COLUMNS | {"id_campanha"}
+
+NUMERIC_TYPES = {"NUMERIC", "BIGINT"}
+
+# Colunas devolvidas por upsert_data() (uma linha por hash_id inserido/alterado)
+CHANGE_COLUMNS = ["hash_id", "account_id", "data_registro", "operacao"]
+
+# Dimensões: uma linha por conta/campanha/anúncio, chaveada pelo ID da Meta
+# (account_id, campaign_id, ad_id) e reescrita só quando o nome muda. Renomear
+# não cria linha nova; a fato chega na campanha pelo anúncio.
+DIM_CONTA_DDL = """
+    CREATE TABLE IF NOT EXISTS dim_conta (
+        account_id TEXT PRIMARY KEY,
+        nome_conta TEXT,
+        atualizado_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+DIM_CAMPANHA_DDL = """
+    CREATE TABLE IF NOT EXISTS dim_campanha (
+        id_campanha TEXT PRIMARY KEY,
+        account_id TEXT NOT NULL,
+        campanha TEXT,
+        atualizado_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+DIM_ANUNCIO_DDL = """
+    CREATE TABLE IF NOT EXISTS dim_anuncio (
+        id_anuncio TEXT PRIMARY KEY,
+        account_id TEXT NOT NULL,
+        id_campanha TEXT,
+        anuncio TEXT,
+        atualizado_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+DIMENSIONS_DDL = [DIM_CONTA_DDL, DIM_CAMPANHA_DDL, DIM_ANUNCIO_DDL]
+
+# Histórico de execuções: uma linha por conta em cada ciclo (ver RunRecord)
+ETL_RUNS_DDL = """
+    CREATE TABLE IF NOT EXISTS etl_runs (
+        run_id TEXT NOT NULL,
+        iniciado_em TIMESTAMP NOT NULL,
+        finalizado_em TIMESTAMP,
+        ciclo_duracao_s NUMERIC,
+        account_id TEXT NOT NULL,
+        tipo TEXT,
+        extract_s NUMERIC,
+        transform_s NUMERIC,
+        load_s NUMERIC,
+        linhas BIGINT,
+        linhas_por_seg NUMERIC,
+        linhas_alteradas BIGINT,
+        bytes_baixados BIGINT,
+        chamadas_api INTEGER,
+        pico_rss_mb NUMERIC,
+        status TEXT,
+        erro TEXT,
+        PRIMARY KEY (run_id, account_id)
+    )
+"""
+# Colunas adicionadas depois da criação de etl_runs
+ETL_RUNS_MIGRATIONS = [
+    "ALTER TABLE etl_runs ADD COLUMN IF NOT EXISTS linhas_alteradas BIGINT",
 ]
 
+# Agenda adaptativa: estado e próxima execução de cada conta (ver AdaptiveScheduler)
+ACCOUNT_SCHEDULE_DDL = """
+    CREATE TABLE IF NOT EXISTS etl_account_schedule (
+        account_id TEXT PRIMARY KEY,
+        tipo TEXT NOT NULL,
+        estado TEXT NOT NULL,
+        gasto_recente NUMERIC,
+        assinatura TEXT,
+        ultima_mudanca TIMESTAMP,
+        intervalo_min INTEGER NOT NULL,
+        ultima_execucao TIMESTAMP,
+        proxima_execucao TIMESTAMP NOT NULL,
+        ultimo_status TEXT
+    )
+"""
+
+# Feed de mudanças: hash_ids inseridos/alterados em cada execução, para
+# consumidores (rollups, exports, caches) processarem só o delta
+CHANGES_DDL = """
+    CREATE TABLE IF NOT EXISTS etl_changes (
+        run_id TEXT NOT NULL,
+        tabela TEXT NOT NULL,
+        hash_id TEXT NOT NULL,
+        account_id TEXT,
+        data_registro DATE,
+        operacao TEXT NOT NULL,
+        registrado_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (run_id, tabela, hash_id)
+    )
+"""
+CHANGES_INDEX_DDL = (
+    "CREATE INDEX IF NOT EXISTS idx_etl_changes_registrado_em ON etl_changes (registrado_em)"
+)
+
+# Dias de histórico mantidos em etl_changes
+CHANGES_RETENTION_DAYS = int(os.getenv("ETL_CHANGES_RETENTION_DAYS", "7"))
+
+# Contas adiadas por prazo: entram primeiro no ciclo seguinte
+CARRY_OVER_DDL = """
+    CREATE TABLE IF NOT EXISTS etl_carry_over (
+        account_id TEXT PRIMARY KEY,
+        tipo TEXT NOT NULL,
+        motivo TEXT,
+        adiada_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+def profile_columns(profile: dict) -> tuple:
+    """Recorte de INSIGHTS_COLUMNS para um perfil de extração.
+
+    Mantém as métricas, o hash_id e o raw_data; das dimensões, só as do perfil.
+
+    Args:
+        profile: Saída de src.ingestion.profiles.get_profile().
+
+    Returns:
+        Tupla (hashable, para os caches abaixo) de (coluna, tipo, atualizada).
+    """
+    from src.ingestion.profiles import DIMENSOES
+
+    return tuple(
+        spec
+        for spec in INSIGHTS_COLUMNS
+        if spec[0] not in DIMENSOES or spec[0] in profile["dimensions"]
+    )
+
+
+def fact_columns(columns: tuple, legacy: tuple = ()) -> tuple:
+    """Colunas gravadas na tabela fato: as do staging sem DIMENSION_ONLY_COLUMNS.
+
+    Args:
+        columns: Colunas do perfil (como no staging).
+        legacy: Colunas de nome que a fato ainda tem (ver legacy_name_columns):
+            continuam sendo gravadas até migrate_dimensions() removê-las, para
+            quem lê a tabela direto não perder os nomes.
+    """
+    return tuple(
+        spec for spec in columns if spec[0] not in DIMENSION_ONLY_COLUMNS or spec[0] in legacy
+    )
+
+
+FACT_COLUMNS = fact_columns(tuple(INSIGHTS_COLUMNS))
+
+
+def view_name(table: str) -> str:
+    """View da tabela fato com os nomes das dimensões (ver build_view_ddl)."""
+    return f"vw_{table}"
+
+
+@lru_cache(maxsize=None)
+def build_dimensions_sql(source: str, columns: tuple, backfill: bool = False) -> str | None:
+    """Upsert das dimensões a partir do staging (ou da fato legada), num statement.
+
+    Cada dimensão recebe o nome da linha mais recente de cada ID e só é
+    reescrita se ele mudou (o WHERE do DO UPDATE). Tudo é ON CONFLICT na
+    chave da dimensão: réplicas gravando as mesmas entidades ao mesmo tempo
+    não duplicam linhas nem deixam o anúncio sem campanha.
+
+    Args:
+        source: Tabela lida (staging, ou a fato com as colunas de nome antigas).
+        columns: Colunas de `source` (só as dimensões cujas colunas existem entram).
+        backfill: Só preenche o que falta (DO NOTHING), sem sobrescrever nomes
+            gravados por cargas mais novas; lê apenas linhas com nome.
+
+    Returns:
+        SQL que devolve (contas, campanhas, anúncios) gravados, ou None se o
+        perfil não tem nomes.
+    """
+    nomes = {col for col, _, _ in columns}
+    ctes = {}
+    if "nome_conta" in nomes:
+        filtro = "nome_conta IS NOT NULL" if backfill else "account_id IS NOT NULL"
+        conflito = (
+            "DO NOTHING"
+            if backfill
+            else "DO UPDATE SET nome_conta = EXCLUDED.nome_conta, "
+            "atualizado_em = CURRENT_TIMESTAMP\n"
+            "    WHERE dim_conta.nome_conta IS DISTINCT FROM EXCLUDED.nome_conta"
+        )
+        ctes["contas"] = (
+            "INSERT INTO dim_conta (account_id, nome_conta)\n"
+            f"    SELECT DISTINCT ON (account_id) account_id, nome_conta FROM {source}\n"
+            f"    WHERE {filtro} ORDER BY account_id, data_registro DESC\n"
+            f"    ON CONFLICT (account_id) {conflito}\n"
+            "    RETURNING 1"
+        )
+    if {"id_campanha", "campanha"} <= nomes:
+        filtro = "id_campanha IS NOT NULL" + (" AND campanha IS NOT NULL" if backfill else "")
+        conflito = (
+            "DO NOTHING"
+            if backfill
+            else "DO UPDATE SET account_id = EXCLUDED.account_id, "
+            "campanha = EXCLUDED.campanha, atualizado_em = CURRENT_TIMESTAMP\n"
+            "    WHERE (dim_campanha.account_id, dim_campanha.campanha)\n"
+            "    IS DISTINCT FROM (EXCLUDED.account_id, EXCLUDED.campanha)"
+        )
+        ctes["campanhas"] = (
+            "INSERT INTO dim_campanha (id_campanha, account_id, campanha)\n"
+            "    SELECT DISTINCT ON (id_campanha) id_campanha, account_id, campanha\n"
+            f"    FROM {source} WHERE {filtro}\n"
+            "    ORDER BY id_campanha, data_registro DESC\n"
+            f"    ON CONFLICT (id_campanha) {conflito}\n"
+            "    RETURNING 1"
+        )
+    if {"id_anuncio", "anuncio"} <= nomes:
+        filtro = "id_anuncio IS NOT NULL" + (" AND anuncio IS NOT NULL" if backfill else "")
+        # Sem campaign_id (fato legada, payload antigo no replay) fica a
+        # campanha já gravada para o anúncio
+        campanha = "id_campanha" if "id_campanha" in nomes else "NULL"
+        nova_campanha = "COALESCE(EXCLUDED.id_campanha, dim_anuncio.id_campanha)"
+        conflito = (
+            "DO NOTHING"
+            if backfill
+            else "DO UPDATE SET account_id = EXCLUDED.account_id, "
+            f"id_campanha = {nova_campanha}, anuncio = EXCLUDED.anuncio, "
+            "atualizado_em = CURRENT_TIMESTAMP\n"
+            "    WHERE (dim_anuncio.account_id, dim_anuncio.id_campanha, dim_anuncio.anuncio)\n"
+            f"    IS DISTINCT FROM (EXCLUDED.account_id, {nova_campanha}, EXCLUDED.anuncio)"
+        )
+        ctes["anuncios"] = (
+            "INSERT INTO dim_anuncio (id_anuncio, account_id, id_campanha, anuncio)\n"
+            f"    SELECT DISTINCT ON (id_anuncio) id_anuncio, account_id, {campanha}, anuncio\n"
+            f"    FROM {source} WHERE {filtro}\n"
+            "    ORDER BY id_anuncio, data_registro DESC\n"
+            f"    ON CONFLICT (id_anuncio) {conflito}\n"
+            "    RETURNING 1"
+        )
+    if not ctes:
+        return None
+
+    contagens = ", ".join(
+        f"(SELECT COUNT(*) FROM {nome})" if nome in ctes else "0"
+        for nome in ("contas", "campanhas", "anuncios")
+    )
+    corpo = ",\n".join(f"{nome} AS (\n    {sql}\n)" for nome, sql in ctes.items())
+    return f"WITH {corpo}\nSELECT {contagens}"
+
+
+@lru_cache(maxsize=None)
+def build_view_ddl(
+    table: str, columns: tuple = tuple(INSIGHTS_COLUMNS), legacy: tuple = ()
+) -> str:
+    """View com as colunas de `columns` na ordem original, nomes vindos das dimensões.
+
+    Para quem lia os nomes direto da tabela fato (rollups, export Parquet,
+    dashboards): mesmas colunas, agora por join com dim_conta/dim_anuncio/
+    dim_campanha (LEFT JOIN: linha sem dimensão aparece com nome nulo).
+
+    Args:
+        legacy: Colunas de nome que a fato ainda tem: cobrem o que as
+            dimensões não sabem (ex: campanha de anúncio ainda sem campaign_id).
+    """
+    nomes = {col for col, _, _ in columns}
+    origem = {
+        "nome_conta": "dc.nome_conta",
+        "id_campanha": "da.id_campanha",
+        "campanha": "dp.campanha",
+        "anuncio": "da.anuncio",
+    }
+    select = []
+    for col, _, _ in columns:
+        if col not in DIMENSION_ONLY_COLUMNS:
+            select.append(f"f.{col}")
+        elif col in legacy:
+            select.append(f"COALESCE({origem[col]}, f.{col}) AS {col}")
+        else:
+            select.append(f"{origem[col]} AS {col}")
+    joins = []
+    if "nome_conta" in nomes:
+        joins.append("LEFT JOIN dim_conta dc ON dc.account_id = f.account_id")
+    if nomes & {"id_campanha", "campanha", "anuncio"}:
+        joins.append("LEFT JOIN dim_anuncio da ON da.id_anuncio = f.id_anuncio")
+    if "campanha" in nomes:
+        joins.append("LEFT JOIN dim_campanha dp ON dp.id_campanha = da.id_campanha")
+    return (
+        f"CREATE OR REPLACE VIEW {view_name(table)} AS\n"
+        f"SELECT {', '.join(select)}, f.data_insercao\n"
+        f"FROM {table} f\n" + "\n".join(joins)
+    )
+
+
+def ensure_dimensions(conn, table: str, columns: tuple = tuple(INSIGHTS_COLUMNS)) -> tuple:
+    """Cria as dimensões e a view da tabela fato (idempotente).
+
+    Se as dimensões ainda não existiam e a fato tem as colunas de nome antigas
+    (tabela de antes da normalização), preenche as dimensões a partir delas;
+    para outras tabelas antigas, ver PostgresLoader.migrate_dimensions().
+
+    Args:
+        conn: Conexão SQLAlchemy, dentro de uma transação.
+        table: Tabela fato (já existente).
+        columns: Colunas do perfil (com os nomes, como no staging).
+
+    Returns:
+        Colunas de nome que a fato ainda tem (ver legacy_name_columns).
+    """
+    conn.exec_driver_sql("SELECT pg_advisory_xact_lock(hashtext('etl_ddl'))")
+    novas = conn.exec_driver_sql("SELECT to_regclass('dim_anuncio') IS NULL").scalar()
+    for ddl in DIMENSIONS_DDL:
+        conn.exec_driver_sql(ddl)
+    legado = legacy_name_columns(conn, table)
+    if novas and legado:
+        backfill_sql = build_dimensions_sql(table, fact_columns(columns, legado), backfill=True)
+        if backfill_sql:
+            conn.exec_driver_sql(backfill_sql)
+    conn.exec_driver_sql(build_view_ddl(table, columns, legado))
+    return legado
+
+
+def legacy_name_columns(conn, table: str) -> tuple:
+    """Colunas de NAME_COLUMNS que a tabela fato ainda tem (anteriores às dimensões)."""
+    result = conn.exec_driver_sql(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = %s "
+        "AND column_name = ANY(%s) ORDER BY column_name",
+        (table, sorted(NAME_COLUMNS)),
+    )
+    return tuple(row[0] for row in result)
+
+
+@lru_cache(maxsize=None)
+def build_upsert_sql(
+    table: str,
+    staging: str,
+    conflict_key: str = "hash_id",
+    columns: tuple = FACT_COLUMNS,
+) -> str:
+    """Gera (uma única vez por tabela) o SQL de merge staging → tabela final.
+
+    Linhas que já existem com os mesmos valores não são reescritas (o WHERE
+    do DO UPDATE): não geram WAL/bloat, não mexem em data_insercao e não
+    aparecem no feed de mudanças.
+
+    Args:
+        table: Tabela de destino.
+        staging: Tabela temporária tipada de onde os dados são lidos.
+        conflict_key: Coluna única usada no ON CONFLICT.
+        columns: Colunas da tabela fato (padrão: FACT_COLUMNS, sem os nomes).
+
+    Returns:
+        Texto do INSERT ... SELECT ... ON CONFLICT DO UPDATE ... WHERE.
+    """
+    cols = ", ".join(col for col, _, _ in columns)
+    atualizadas = [col for col, _, update in columns if update]
+    updates = ",\n    ".join(f"{col} = EXCLUDED.{col}" for col in atualizadas)
+    atuais = ", ".join(f"{table}.{col}" for col in atualizadas)
+    novos = ", ".join(f"EXCLUDED.{col}" for col in atualizadas)
+    return (
+        f"INSERT INTO {table} ({cols})\n"
+        f"SELECT {cols} FROM {staging}\n"
+        f"ON CONFLICT ({conflict_key}) DO UPDATE SET\n"
+        f"    {updates},\n"
+        f"    data_insercao = CURRENT_TIMESTAMP\n"
+        f"WHERE ({atuais}) IS DISTINCT FROM ({novos})"
+    )
+
+
+@lru_cache(maxsize=None)
+def build_change_feed_sql(
+    table: str,
+    staging: str,
+    columns: tuple = FACT_COLUMNS,
+    run_id: str = "$1",
+) -> str:
+    """Merge + registro das linhas inseridas/alteradas em etl_changes, num statement.
+
+    O merge roda como CTE com RETURNING (xmax = 0 distingue insert de
+    update) e o INSERT em etl_changes lê dela, então o feed é gravado na
+    mesma transação da carga, sem trazer os hash_ids ao Python e de volta.
+
+    Args:
+        run_id: Expressão do run_id ($1 no PREPARE; um literal no SQL avulso).
+
+    Returns:
+        SQL que devolve (hash_id, account_id, data_registro, operacao).
+    """
+    upsert_sql = build_upsert_sql(table, staging, columns=columns)
+    return (
+        f"WITH merged AS (\n{upsert_sql}\n"
+        "RETURNING hash_id, account_id, data_registro, (xmax = 0) AS inserida)\n"
+        "INSERT INTO etl_changes (run_id, tabela, hash_id, account_id, data_registro, operacao)\n"
+        f"SELECT {run_id}, '{table}', hash_id, account_id, data_registro, "
+        "CASE WHEN inserida THEN 'insert' ELSE 'update' END FROM merged\n"
+        "ON CONFLICT (run_id, tabela, hash_id) DO UPDATE SET registrado_em = EXCLUDED.registrado_em\n"
+        "RETURNING hash_id, account_id, data_registro, operacao"
+    )
+
+
+@lru_cache(maxsize=None)
+def build_staging_ddl(staging: str, columns: tuple = tuple(INSIGHTS_COLUMNS)) -> str:
+    """DDL da tabela temporária de staging (uma por sessão do Postgres).
+
+    ON COMMIT DELETE ROWS esvazia o staging a cada transação, então a mesma
+    tabela (e o plano preparado que aponta para ela) é reaproveitada entre lotes.
+    """
+    cols = ", ".join(f"{col} {tipo}" for col, tipo, _ in columns)
+    return f"CREATE TEMP TABLE IF NOT EXISTS {staging} ({cols}) ON COMMIT DELETE ROWS"
+
+
+@lru_cache(maxsize=None)
+def build_table_ddl(table: str, columns: tuple = FACT_COLUMNS) -> str:
+    """DDL da tabela fato de um perfil (hash_id único, como em insights_meta_ads)."""
+    cols = ", ".join(f"{col} {tipo}" for col, tipo, _ in columns)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {table} ({cols}, "
+        "data_insercao TIMESTAMP DEFAULT CURRENT_TIMESTAMP, "
+        "UNIQUE (hash_id))"
+    )
+
 
 class PostgresLoader:
     """Gerencia conexão e operações de UPSERT no PostgreSQL."""
 
-    def __init__(self):
+    def __init__(self, table: str = "insights_meta_ads", columns: tuple | None = None):
         self.user = os.getenv("DB_USER")
         self.password = os.getenv("DB_PASS")
         self.host = os.getenv("DB_HOST", "haproxy")
         self.port = os.getenv("DB_PORT", "5432")
         self.database = os.getenv("DB_NAME")
 
+        self.table = table
+        self.columns = tuple(columns or INSIGHTS_COLUMNS)
+        self.required_columns = [col for col, _, _ in self.columns]
+        self.fact_columns = fact_columns(self.columns)
+        self.staging_table = f"stg_{table}"
+        self.statement_name = f"upsert_{table}"
+        self.dimensions_statement = f"dims_{table}"
+
         self.engine = create_engine(
             f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}",
             pool_pre_ping=True,
             connect_args={"connect_timeout": 10},
         )
 
-    def upsert_data(self, df: pd.DataFrame, raw_json_list: list[dict]) -> None:
-        """Executa UPSERT no banco usando tabela temporária + ON CONFLICT.
+    @classmethod
+    def for_profile(cls, profile: dict) -> "PostgresLoader":
+        """Loader apontado para a tabela do perfil de extração (só as colunas dele)."""
+        return cls(table=profile["table"], columns=profile_columns(profile))
+
+    def _prepare_session(self, conn) -> None:
+        """Cria o staging temporário e o PREPARE do merge na conexão, se preciso.
+
+        O estado fica em `conn.info`, que acompanha a conexão DBAPI do pool:
+        cada conexão física prepara o statement uma única vez e o reaproveita
+        em todos os lotes seguintes (sem reparse nem replanejamento).
+        """
+        if conn.info.get(self.statement_name):
+            return
+
+        # Réplicas subindo juntas não disputam o CREATE TABLE IF NOT EXISTS
+        conn.exec_driver_sql("SELECT pg_advisory_xact_lock(hashtext('etl_ddl'))")
+        # Tabelas dos perfis leves nascem aqui; a original já existe (no-op)
+        conn.exec_driver_sql(build_table_ddl(self.table, fact_columns(self.columns)))
+        legado = ensure_dimensions(conn, self.table, self.columns)
+        # Enquanto a fato tiver as colunas de nome (até migrate_dimensions), a
+        # carga continua gravando nelas: quem lê a tabela direto não perde nomes
+        self.fact_columns = fact_columns(self.columns, legado)
+        conn.exec_driver_sql(CHANGES_DDL)
+        conn.exec_driver_sql(CHANGES_INDEX_DDL)
+        conn.exec_driver_sql(build_staging_ddl(self.staging_table, self.columns))
+        already_prepared = conn.exec_driver_sql(
+            "SELECT 1 FROM pg_prepared_statements WHERE name = %s",
+            (self.statement_name,),
+        ).first()
+        if not already_prepared:
+            merge_sql = build_change_feed_sql(
+                self.table, self.staging_table, columns=self.fact_columns
+            )
+            conn.exec_driver_sql(f"PREPARE {self.statement_name} (TEXT) AS {merge_sql}")
+            dims_sql = build_dimensions_sql(self.staging_table, self.columns)
+            if dims_sql:
+                conn.exec_driver_sql(f"PREPARE {self.dimensions_statement} AS {dims_sql}")
+        conn.commit()
+        conn.info[self.statement_name] = True
+
+    def _copy_to_staging(self, conn, df: pd.DataFrame) -> None:
+        """Envia o DataFrame ao staging via COPY (CSV UTF-8 em memória)."""
+        buffer = io.BytesIO(df.to_csv(index=False, header=False).encode("utf-8"))
+
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {self.staging_table} ({', '.join(df.columns)}) "
+                "FROM STDIN WITH (FORMAT csv, ENCODING 'UTF8')",
+                buffer,
+            )
+        finally:
+            cursor.close()
+
+    def upsert_data(
+        self, df: pd.DataFrame, raw_json_list: list[dict], run_id: str | None = None
+    ) -> pd.DataFrame:
+        """Executa UPSERT no banco usando staging temporário + merge preparado.
 
         O método filtra dinamicamente as colunas do DataFrame para manter
-        apenas as que existem em REQUIRED_COLUMNS, evitando que colunas
-        extras (como reach ou ctr) quebrem a query.
+        apenas as que existem na tabela (REQUIRED_COLUMNS, ou o recorte do
+        perfil), evitando que colunas extras (como reach ou ctr) quebrem a query.
 
         Args:
             df: DataFrame limpo vindo do DataCleaner.transform().
             raw_json_list: Lista de dicts brutos da API (para auditoria).
+            run_id: Execução a que as mudanças pertencem em etl_changes
+                (padrão: um id novo por chamada).
+
+        Returns:
+            Linhas inseridas ou alteradas (hash_id, account_id, data_registro,
+            operacao 'insert'/'update'); linhas iguais às do banco não entram.
         """
         if df.empty:
-            return
+            return pd.DataFrame(columns=CHANGE_COLUMNS)
 
         # ---------------------------------------------------------
         # 1. TRATAMENTO PRÉVIO DE DADOS
@@ -66,35 +568,24 @@ class PostgresLoader:
         df = df.copy()
         df["raw_data"] = [json.dumps(r) for r in raw_json_list]
 
-        # Preenche vazios numéricos com 0
-        cols_numericas = [
-            "valor_gasto",
-            "impressoes",
-            "clique_link",
-            "lead_formulario",
-            "lead_site",
-            "lead_mensagem",
-            "seguidores_instagram",
-            "videoview_3s",
-            "videoview_50",
-            "videoview_75",
-            "lead",
-        ]
-        for col in cols_numericas:
-            if col in df.columns:
+        # Preenche vazios numéricos com 0 (inteiros seguem inteiros para o COPY)
+        for col, tipo, _ in self.columns:
+            if col in df.columns and tipo in NUMERIC_TYPES:
                 df[col] = df[col].fillna(0)
+                if tipo == "BIGINT":
+                    df[col] = df[col].astype("int64")
 
         # ---------------------------------------------------------
         # 2. FILTRO DE SEGURANÇA (Trava contra colunas extras)
         # ---------------------------------------------------------
-        columns_to_load = [col for col in REQUIRED_COLUMNS if col in df.columns]
+        columns_to_load = [col for col in self.required_columns if col in df.columns]
 
-        missing = set(REQUIRED_COLUMNS) - set(df.columns)
+        missing = set(self.required_columns) - set(df.columns)
         if missing:
             print(f"⚠️ [Load] AVISO: Colunas ausentes no DataFrame: {missing}")
             print("   O pipeline continuará, mas verifique o cleaner.py.")
 
-        extra = set(df.columns) - set(REQUIRED_COLUMNS)
+        extra = set(df.columns) - set(self.required_columns)
         if extra:
             print(f"ℹ️ [Load] Colunas ignoradas (não existem no banco): {extra}")
 
@@ -103,48 +594,292 @@ class PostgresLoader:
         # ---------------------------------------------------------
         # 3. CARGA PARA O BANCO
         # ---------------------------------------------------------
+        run_id = run_id or uuid.uuid4().hex
+        with self.engine.connect() as conn:
+            self._prepare_session(conn)
+
+            with conn.begin():
+                print(
+                    f"📡 [Load] Enviando {len(df_filtered)} registros para o Postgres..."
+                )
+                self._copy_to_staging(conn, df_filtered)
+                dimensoes = self._upsert_dimensions(conn)
+                result = conn.exec_driver_sql(
+                    f"EXECUTE {self.statement_name}(%s)", (run_id,)
+                )
+                changes = pd.DataFrame(result.fetchall(), columns=CHANGE_COLUMNS)
+
+            if any(dimensoes):
+                contas, campanhas, anuncios = dimensoes
+                print(
+                    f"🏷️ [Load] Dimensões gravadas (novas ou renomeadas): {contas} contas, "
+                    f"{campanhas} campanhas, {anuncios} anúncios"
+                )
+
+            inseridas = int((changes["operacao"] == "insert").sum())
+            alteradas = len(changes) - inseridas
+            print(
+                f"✅ [Load] Carga concluída: {inseridas} novas, {alteradas} alteradas, "
+                f"{len(df_filtered) - len(changes)} sem mudança."
+            )
+        return changes
+
+    def _upsert_dimensions(self, conn) -> tuple[int, int, int]:
+        """Grava as dimensões a partir do staging. Retorna (contas, campanhas, anúncios)."""
+        if build_dimensions_sql(self.staging_table, self.columns) is None:
+            return (0, 0, 0)
+        return tuple(conn.exec_driver_sql(f"EXECUTE {self.dimensions_statement}").one())
+
+    def migrate_dimensions(self, drop_columns: bool = False) -> dict[str, int]:
+        """Leva uma tabela fato anterior às dimensões para o formato normalizado.
+
+        Preenche dim_conta/dim_anuncio com os nomes que ainda estão na fato
+        (sem sobrescrever os gravados por cargas mais novas) e, com
+        drop_columns, remove da fato as colunas de nome. O DROP COLUMN não
+        reescreve a tabela: o espaço das linhas antigas volta conforme elas são
+        atualizadas, ou de uma vez com VACUUM FULL.
+
+        A fato antiga não tem o campaign_id: a coluna campanha só é removida
+        quando todo anúncio com nome de campanha já tem a sua em dim_anuncio
+        (gravada pelas cargas novas; para dias fora da janela, `backfill`).
+
+        Rode com o daemon parado ou reinicie-o depois do drop: as conexões
+        abertas têm o merge preparado com as colunas antigas.
+
+        Returns:
+            {'contas'|'campanhas'|'anuncios': gravados, 'colunas_removidas': n,
+            'anuncios_sem_campanha': n}.
+        """
+        with self.engine.begin() as conn:
+            conn.exec_driver_sql(build_table_ddl(self.table, fact_columns(self.columns)))
+            legado = ensure_dimensions(conn, self.table, self.columns)
+            gravados = (0, 0, 0)
+            backfill_sql = build_dimensions_sql(
+                self.table, fact_columns(self.columns, legado), backfill=True
+            )
+            if legado and backfill_sql:
+                gravados = tuple(conn.exec_driver_sql(backfill_sql).one())
+            pendentes = 0
+            if "campanha" in legado:
+                pendentes = conn.exec_driver_sql(
+                    f"SELECT COUNT(DISTINCT f.id_anuncio) FROM {self.table} f "
+                    "LEFT JOIN dim_anuncio da ON da.id_anuncio = f.id_anuncio "
+                    "WHERE f.campanha IS NOT NULL AND da.id_campanha IS NULL"
+                ).scalar()
+            removidas = (
+                tuple(col for col in legado if col != "campanha" or not pendentes)
+                if drop_columns
+                else ()
+            )
+            if removidas:
+                # A view lê as colunas: sai antes do DROP e volta sem elas
+                restantes = tuple(col for col in legado if col not in removidas)
+                conn.exec_driver_sql(f"DROP VIEW IF EXISTS {view_name(self.table)}")
+                drops = ", ".join(f"DROP COLUMN {col}" for col in removidas)
+                conn.exec_driver_sql(f"ALTER TABLE {self.table} {drops}")
+                conn.exec_driver_sql(build_view_ddl(self.table, self.columns, restantes))
+                self.fact_columns = fact_columns(self.columns, restantes)
+        return {
+            **dict(zip(("contas", "campanhas", "anuncios"), gravados)),
+            "colunas_removidas": len(removidas),
+            "anuncios_sem_campanha": pendentes,
+        }
+
+    def load_changes(
+        self, run_id: str | None = None, since=None, table: str | None = None
+    ) -> pd.DataFrame:
+        """Lê o feed de mudanças (etl_changes) de uma execução ou desde um instante.
+
+        Args:
+            run_id: Só as mudanças dessa execução (RunRecord.run_id).
+            since: Só as registradas a partir deste datetime.
+            table: Tabela de origem (padrão: a deste loader).
+
+        Returns:
+            DataFrame com hash_id, account_id, data_registro, operacao e run_id.
+        """
+        filtros, params = ["tabela = :tabela"], {"tabela": table or self.table}
+        if run_id:
+            filtros.append("run_id = :run_id")
+            params["run_id"] = run_id
+        if since is not None:
+            filtros.append("registrado_em >= :since")
+            params["since"] = since
+        query = text(
+            f"SELECT {', '.join(CHANGE_COLUMNS)}, run_id FROM etl_changes "
+            f"WHERE {' AND '.join(filtros)}"
+        )
+        with self.engine.begin() as conn:
+            conn.execute(text(CHANGES_DDL))
+            return pd.read_sql(query, conn, params=params)
+
+    def iter_rows(
+        self,
+        accounts: list[str] | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        chunk_rows: int = 100_000,
+    ):
+        """Lê a tabela em blocos (cursor no servidor), sem o raw_data.
+
+        Lê da view com os nomes das dimensões (mesmas colunas do DataCleaner).
+
+        Ordenado por conta e data, para quem reagrupa (ex: ParquetExporter)
+        tocar cada partição em poucos blocos.
+
+        Args:
+            accounts: Filtra contas (aceita com ou sem o prefixo act_).
+            since: Data inicial (AAAA-MM-DD), inclusiva.
+            until: Data final (AAAA-MM-DD), inclusiva.
+            chunk_rows: Linhas por bloco.
+
+        Yields:
+            DataFrames de até chunk_rows linhas.
+        """
+        filtros, params = [], {}
+        if accounts:
+            filtros.append("account_id = ANY(:contas)")
+            params["contas"] = [str(a).removeprefix("act_") for a in accounts]
+        if since:
+            filtros.append("data_registro >= :since")
+            params["since"] = since
+        if until:
+            filtros.append("data_registro <= :until")
+            params["until"] = until
+        where = f"WHERE {' AND '.join(filtros)}" if filtros else ""
+        cols = ", ".join(col for col in self.required_columns if col != "raw_data")
+        query = text(
+            f"SELECT {cols} FROM {view_name(self.table)} {where} "
+            "ORDER BY account_id, data_registro"
+        )
+        with self.engine.begin() as conn:
+            ensure_dimensions(conn, self.table, self.columns)
+        with self.engine.connect().execution_options(stream_results=True) as conn:
+            yield from pd.read_sql(query, conn, params=params, chunksize=chunk_rows)
+
+    def prune_changes(self, days: int = CHANGES_RETENTION_DAYS) -> int:
+        """Apaga do feed de mudanças o que tem mais de `days` dias."""
+        with self.engine.begin() as conn:
+            conn.execute(text(CHANGES_DDL))
+            result = conn.execute(
+                text(
+                    "DELETE FROM etl_changes "
+                    "WHERE registrado_em < CURRENT_TIMESTAMP - make_interval(days => :dias)"
+                ),
+                {"dias": days},
+            )
+            return result.rowcount
+
+    def upsert_followers(self, df: pd.DataFrame) -> None:
+        """UPSERT em instagram_crescimento pela chave composta (conta + dia).
+
+        Atualiza caso rode mais de uma vez no mesmo dia para a MESMA conta.
+
+        Args:
+            df: DataFrame de InstagramProfileExtractor.get_daily_followers().
+        """
+        if df.empty:
+            return
+
+        instagram_crescimento = table(
+            "instagram_crescimento",
+            column("ig_account_id"),
+            column("data_registro"),
+            column("seguidores_ganhos"),
+        )
+        stmt = insert(instagram_crescimento).values(df.to_dict(orient="records"))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["ig_account_id", "data_registro"],
+            set_={"seguidores_ganhos": stmt.excluded.seguidores_ganhos},
+        )
+        with self.engine.begin() as conn:
+            conn.execute(stmt)
+
+    def save_run_record(self, rows: list[dict]) -> None:
+        """Persiste as linhas de um RunRecord na tabela etl_runs.
+
+        Args:
+            rows: Saída de RunRecord.to_rows() (uma linha por conta).
+        """
+        if not rows:
+            return
+
+        cols = list(rows[0].keys())
+        insert_sql = text(
+            f"INSERT INTO etl_runs ({', '.join(cols)}) "
+            f"VALUES ({', '.join(':' + c for c in cols)}) "
+            "ON CONFLICT (run_id, account_id) DO NOTHING"
+        )
         with self.engine.begin() as conn:
-            print(f"📡 [Load] Enviando {len(df_filtered)} registros para o Postgres...")
+            conn.execute(text(ETL_RUNS_DDL))
+            for alter in ETL_RUNS_MIGRATIONS:
+                conn.execute(text(alter))
+            conn.execute(insert_sql, rows)
 
-            df_filtered.to_sql(
-                "temp_meta_insights", conn, if_exists="replace", index=False
+    def load_account_schedule(self) -> dict[str, dict]:
+        """Lê a agenda adaptativa (etl_account_schedule), indexada por account_id."""
+        with self.engine.begin() as conn:
+            conn.execute(text(ACCOUNT_SCHEDULE_DDL))
+            result = conn.execute(text("SELECT * FROM etl_account_schedule"))
+            return {row["account_id"]: dict(row) for row in result.mappings()}
+
+    def save_account_schedule(self, rows: list[dict]) -> None:
+        """Grava (UPSERT por account_id) o estado e a próxima execução das contas.
+
+        Args:
+            rows: Saída de AdaptiveScheduler.update().
+        """
+        if not rows:
+            return
+
+        cols = list(rows[0].keys())
+        updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in cols if c != "account_id")
+        upsert_sql = text(
+            f"INSERT INTO etl_account_schedule ({', '.join(cols)}) "
+            f"VALUES ({', '.join(':' + c for c in cols)}) "
+            f"ON CONFLICT (account_id) DO UPDATE SET {updates}"
+        )
+        with self.engine.begin() as conn:
+            conn.execute(text(ACCOUNT_SCHEDULE_DDL))
+            conn.execute(upsert_sql, rows)
+
+    def load_carry_over(self) -> list[str]:
+        """Contas adiadas em ciclos anteriores, da mais antiga para a mais nova."""
+        with self.engine.begin() as conn:
+            conn.execute(text(CARRY_OVER_DDL))
+            result = conn.execute(
+                text("SELECT account_id FROM etl_carry_over ORDER BY adiada_em")
             )
+            return [row[0] for row in result]
+
+    def save_carry_over(self, record) -> None:
+        """Atualiza etl_carry_over com o resultado de um ciclo.
 
-            upsert_query = text("""
-                INSERT INTO insights_meta_ads (
-                    id_anuncio, data_registro, account_id, nome_conta, campanha,
-                    anuncio, plataforma, posicionamento, valor_gasto, impressoes,
-                    clique_link, lead_formulario, lead_site, lead_mensagem,
-                    seguidores_instagram, videoview_3s, videoview_50, videoview_75,
-                    lead, hash_id, raw_data
+        Contas processadas (ok ou erro) saem da fila; contas adiadas entram,
+        mantendo o adiada_em original para não perderem a prioridade.
+
+        Args:
+            record: RunRecord do ciclo.
+        """
+        processadas = [a for a, m in record.accounts.items() if m["status"] != "adiada"]
+        adiadas = [
+            {"account_id": a, "tipo": m["tipo"], "motivo": m["erro"]}
+            for a, m in record.accounts.items()
+            if m["status"] == "adiada"
+        ]
+        with self.engine.begin() as conn:
+            conn.execute(text(CARRY_OVER_DDL))
+            if processadas:
+                conn.execute(
+                    text("DELETE FROM etl_carry_over WHERE account_id = ANY(:ids)"),
+                    {"ids": processadas},
+                )
+            if adiadas:
+                conn.execute(
+                    text(
+                        "INSERT INTO etl_carry_over (account_id, tipo, motivo) "
+                        "VALUES (:account_id, :tipo, :motivo) "
+                        "ON CONFLICT (account_id) DO UPDATE SET motivo = EXCLUDED.motivo"
+                    ),
+                    adiadas,
                 )
-                SELECT
-                    id_anuncio,
-                    CAST(data_registro AS DATE),
-                    account_id, nome_conta, campanha,
-                    anuncio, plataforma, posicionamento,
-                    CAST(valor_gasto AS NUMERIC),
-                    impressoes, clique_link, lead_formulario, lead_site, lead_mensagem,
-                    seguidores_instagram, videoview_3s, videoview_50, videoview_75,
-                    lead, hash_id,
-                    CAST(raw_data AS JSONB)
-                FROM temp_meta_insights
-                ON CONFLICT (hash_id) DO UPDATE SET
-                    valor_gasto = EXCLUDED.valor_gasto,
-                    impressoes = EXCLUDED.impressoes,
-                    clique_link = EXCLUDED.clique_link,
-                    lead_formulario = EXCLUDED.lead_formulario,
-                    lead_site = EXCLUDED.lead_site,
-                    lead_mensagem = EXCLUDED.lead_mensagem,
-                    seguidores_instagram = EXCLUDED.seguidores_instagram,
-                    videoview_3s = EXCLUDED.videoview_3s,
-                    videoview_50 = EXCLUDED.videoview_50,
-                    videoview_75 = EXCLUDED.videoview_75,
-                    lead = EXCLUDED.lead,
-                    raw_data = EXCLUDED.raw_data,
-                    data_insercao = CURRENT_TIMESTAMP;
-            """)
-
-            conn.execute(upsert_query)
-            conn.execute(text("DROP TABLE IF EXISTS temp_meta_insights;"))
-            print("✅ [Load] Carga concluída com sucesso!")
@@ -1,38 +1,174 @@
+import atexit
 import os
-import requests
-import json
+import queue
+import re
+import threading
+import time
 from datetime import datetime
 
 
+# Timeout de cada POST no webhook (conexão e leitura)
+ALERT_TIMEOUT_S = float(os.getenv("ETL_ALERT_TIMEOUT_S", "10"))
+# Retentativas por digest (erro de conexão, 5xx e 429)
+ALERT_RETRIES = int(os.getenv("ETL_ALERT_RETRIES", "3"))
+# Backoff base entre retentativas (dobra a cada uma); 429 usa o retry_after do Discord
+ALERT_BACKOFF_S = float(os.getenv("ETL_ALERT_BACKOFF_S", "1"))
+# Teto de espera por retentativa (um retry_after absurdo não segura o sender)
+ALERT_MAX_WAIT_S = 60.0
+# Quanto o processo espera, ao sair, pelos alertas ainda na fila
+ALERT_DRAIN_S = float(os.getenv("ETL_ALERT_DRAIN_S", "15"))
+# Digests aguardando envio; com a fila cheia o novo é descartado (e logado)
+ALERT_QUEUE_SIZE = 50
+
+# Limite do Discord para a descrição de um embed
+DESCRIPTION_LIMIT = 4096
+
+# Configurações visuais (Emojis e Cores), da menos para a mais grave
+LEVELS = {
+    "info": {"emoji": "✅", "color": 3066993},  # Verde
+    "warning": {"emoji": "⚠️", "color": 16776960},  # Amarelo
+    "error": {"emoji": "🚨", "color": 15158332},  # Vermelho
+}
+
+
+def similarity_key(message: str) -> str:
+    """Chave de agrupamento: a primeira linha com os números trocados por #.
+
+    "Erro na conta act_123: timeout" e "Erro na conta act_456: timeout" caem
+    no mesmo grupo.
+    """
+    primeira = message.strip().split("\n", 1)[0]
+    return re.sub(r"\d+", "#", primeira)
+
+
+def coalesce(mensagens: list[tuple[str, str]]) -> tuple[str, str]:
+    """Junta as mensagens do ciclo num digest só.
+
+    Mensagens semelhantes (ver similarity_key) viram a primeira delas mais
+    a contagem das demais; os grupos mais graves vêm primeiro.
+
+    Args:
+        mensagens: [(level, message)] na ordem em que foram enviadas.
+
+    Returns:
+        (texto do digest, level mais grave).
+    """
+    grupos: dict[tuple[str, str], list[str]] = {}
+    for level, message in mensagens:
+        level = level if level in LEVELS else "info"
+        grupos.setdefault((level, similarity_key(message)), []).append(message)
+
+    gravidade = list(LEVELS)
+    ordem = sorted(grupos.items(), key=lambda item: -gravidade.index(item[0][0]))
+    nivel = ordem[0][0][0]
+
+    if len(mensagens) == 1:
+        texto = mensagens[0][1]
+    else:
+        partes = []
+        for (level, _), lista in ordem:
+            parte = f"{LEVELS[level]['emoji']} {lista[0]}"
+            if len(lista) > 1:
+                parte += f"\n↳ +{len(lista) - 1} semelhante(s)"
+            partes.append(parte)
+        texto = "\n\n".join(partes)
+
+    if len(texto) > DESCRIPTION_LIMIT:
+        texto = texto[: DESCRIPTION_LIMIT - 20] + "\n… (truncado)"
+    return texto, nivel
+
+
+def retry_after(response) -> float | None:
+    """Segundos pedidos pelo Discord num 429 (corpo JSON ou header Retry-After)."""
+    try:
+        return float(response.json()["retry_after"])
+    except (ValueError, KeyError, TypeError):
+        pass
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
 class DiscordAlert:
-    def __init__(self):
+    """Alertas do ETL no Discord, sem bloquear o pipeline.
+
+    send() só guarda a mensagem; flush() (fim de cada ciclo) junta as
+    guardadas num digest (ver coalesce) e o entrega a uma thread de envio,
+    que faz o POST com timeout, retentativas e respeito ao 429 do Discord.
+    Um webhook lento ou fora do ar atrasa só o alerta, nunca o ciclo. Ao
+    sair, o processo espera até ALERT_DRAIN_S pelo que ainda está na fila.
+    """
+
+    def __init__(self, webhook_url: str | None = None):
         # Carrega a URL do ambiente. Se não existir, avisa no log.
-        self.webhook_url = os.getenv("DISCORD_WEBHOOK_URL")
+        self.webhook_url = webhook_url or os.getenv("DISCORD_WEBHOOK_URL")
+        self._pendentes: list[tuple[str, str]] = []
+        self._fila: queue.Queue = queue.Queue(maxsize=ALERT_QUEUE_SIZE)
+        self._lock = threading.Lock()
+        self._sender: threading.Thread | None = None
         if not self.webhook_url:
             print("⚠️ [Discord] Webhook não configurado. Alertas serão ignorados.")
+            return
+        atexit.register(self.close)
 
     def send(self, message, level="info"):
         """
-        Envia mensagem para o Discord.
+        Guarda a mensagem para o digest do ciclo (não faz I/O).
         Args:
             message (str): O texto do erro ou sucesso.
             level (str): 'info', 'warning' ou 'error'. Muda a cor/emoji.
         """
         if not self.webhook_url:
             return
+        with self._lock:
+            self._pendentes.append((level, message))
 
-        # Configurações visuais (Emojis e Títulos)
-        config = {
-            "info": {"emoji": "✅", "color": 3066993},  # Verde
-            "warning": {"emoji": "⚠️", "color": 16776960},  # Amarelo
-            "error": {"emoji": "🚨", "color": 15158332},  # Vermelho
-        }
+    def flush(self) -> bool:
+        """Entrega o digest das mensagens guardadas à thread de envio.
+
+        Returns:
+            False se havia mensagens e a fila de envio estava cheia.
+        """
+        with self._lock:
+            pendentes, self._pendentes = self._pendentes, []
+        if not pendentes:
+            return True
+
+        texto, level = coalesce(pendentes)
+        try:
+            self._fila.put_nowait(self.build_payload(texto, level))
+        except queue.Full:
+            print(f"❌ [Discord] Fila de envio cheia: digest com {len(pendentes)} alertas descartado")
+            _observe("descartado")
+            return False
+        self._start_sender()
+        return True
+
+    def close(self, timeout: float = ALERT_DRAIN_S) -> bool:
+        """Envia o que sobrou e espera a fila esvaziar (até `timeout` segundos).
+
+        Returns:
+            True se tudo foi entregue (ou desistido) dentro do prazo.
+        """
+        self.flush()
+        limite = time.monotonic() + timeout
+        with self._fila.all_tasks_done:
+            while self._fila.unfinished_tasks:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    print("⚠️ [Discord] Alertas ainda na fila ao encerrar foram perdidos")
+                    return False
+                self._fila.all_tasks_done.wait(restante)
+        return True
 
-        cfg = config.get(level, config["info"])
+    @staticmethod
+    def build_payload(message: str, level: str) -> dict:
+        cfg = LEVELS.get(level, LEVELS["info"])
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
         # Payload formatado (Embed fica mais bonito no Discord)
-        payload = {
+        return {
             "username": "ETL Bot - Vetorial",
             "embeds": [
                 {
@@ -44,8 +180,59 @@ class DiscordAlert:
             ],
         }
 
-        try:
-            response = requests.post(self.webhook_url, json=payload)
-            response.raise_for_status()
-        except Exception as e:
-            print(f"❌ [Discord] Falha ao enviar alerta: {e}")
+    def _start_sender(self) -> None:
+        with self._lock:
+            if self._sender is None or not self._sender.is_alive():
+                self._sender = threading.Thread(
+                    target=self._run_sender, name="discord-alert", daemon=True
+                )
+                self._sender.start()
+
+    def _run_sender(self) -> None:
+        while True:
+            payload = self._fila.get()
+            try:
+                _observe("enviado" if self._post(payload) else "falha")
+            except Exception as e:
+                print(f"❌ [Discord] Falha ao enviar alerta: {e}")
+                _observe("falha")
+            finally:
+                self._fila.task_done()
+
+    def _post(self, payload: dict) -> bool:
+        """POST com timeout e retentativas. Retorna True se o Discord aceitou."""
+        import requests
+
+        from src.utils.http import get_session
+
+        for tentativa in range(ALERT_RETRIES + 1):
+            espera = ALERT_BACKOFF_S * 2**tentativa
+            try:
+                response = get_session().post(
+                    self.webhook_url, json=payload, timeout=ALERT_TIMEOUT_S
+                )
+            except requests.RequestException as e:
+                erro = str(e)
+            else:
+                if response.status_code == 429:
+                    espera = retry_after(response) or espera
+                    erro = f"429 (rate limit, retry_after {espera:g}s)"
+                elif response.status_code >= 500:
+                    erro = f"HTTP {response.status_code}"
+                elif response.status_code >= 400:
+                    # Webhook inválido/removido ou payload recusado: repetir não adianta
+                    print(f"❌ [Discord] Alerta recusado: HTTP {response.status_code} {response.text[:200]}")
+                    return False
+                else:
+                    return True
+            if tentativa < ALERT_RETRIES:
+                time.sleep(min(espera, ALERT_MAX_WAIT_S))
+
+        print(f"❌ [Discord] Falha ao enviar alerta após {ALERT_RETRIES + 1} tentativas: {erro}")
+        return False
+
+
+def _observe(resultado: str) -> None:
+    from src.utils.metrics import observe_alert
+
+    observe_alert(resultado)
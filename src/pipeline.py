@@ -0,0 +1,1109 @@
+import os
+import json
+import queue
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+# Módulos leves no import; pandas, SQLAlchemy e facebook_business só são
+# carregados quando um ciclo realmente roda.
+from src.ingestion.profiles import BASE_PROFILE, get_profile
+from src.notification.discord_alert import DiscordAlert
+from src.utils.deadline import Deadline, DeadlineExceeded
+from src.utils.instrumentation import RunRecord
+
+DATE_PRESET = "last_30d"
+
+# Prazos: o ciclo termina antes do próximo disparo (4h) e nenhuma conta sozinha
+# segura o ciclo. O que não coube vai para etl_carry_over e roda primeiro depois.
+CYCLE_DEADLINE_S = float(os.getenv("ETL_CYCLE_DEADLINE_MIN", "210")) * 60
+ACCOUNT_DEADLINE_S = float(os.getenv("ETL_ACCOUNT_DEADLINE_MIN", "30")) * 60
+
+# Rollups de src/analysis atualizados ao fim de cada ciclo ("0" desliga)
+ROLLUPS_ENABLED = os.getenv("ETL_ROLLUPS", "1") != "0"
+# Detecção de anomalias de gasto/leads sobre os rollups ("0" desliga)
+ANOMALIES_ENABLED = os.getenv("ETL_ANOMALIES", "1") != "0"
+# Pipeline em estágios (ver _run_ads_staged): threads de extração e de
+# transformação, e blocos em trânsito por fila. ETL_EXTRACT_WORKERS=0 volta
+# ao modo sequencial (uma conta por vez, extract → transform → load)
+EXTRACT_WORKERS = int(os.getenv("ETL_EXTRACT_WORKERS", "2"))
+TRANSFORM_WORKERS = max(1, int(os.getenv("ETL_TRANSFORM_WORKERS", "1")))
+STAGE_QUEUE_CHUNKS = max(1, int(os.getenv("ETL_STAGE_QUEUE_CHUNKS", "2")))
+
+# Export das linhas alteradas para Parquet (conta × mês) em ETL_PARQUET_DIR ("1" liga)
+PARQUET_ENABLED = os.getenv("ETL_PARQUET_EXPORT", "0") == "1"
+
+# Instancia o Alerta globalmente para usar nos ciclos
+alert = DiscordAlert()
+
+
+def env_ids(name: str) -> list[str]:
+    """Lê uma lista de IDs separados por vírgula do ambiente (ignora vazios)."""
+    return [item.strip() for item in os.getenv(name, "").split(",") if item.strip()]
+
+
+def normalize_account_id(account_id: str) -> str:
+    """Garante o prefixo act_ (a API devolve o account_id sem ele)."""
+    account_id = account_id.strip()
+    return account_id if account_id.startswith("act_") else f"act_{account_id}"
+
+
+def date_windows(since: date, until: date, days: int):
+    """Quebra [since, until] em janelas de até `days` dias (inclusivas)."""
+    inicio = since
+    while inicio <= until:
+        fim = min(inicio + timedelta(days=days - 1), until)
+        yield inicio, fim
+        inicio = fim + timedelta(days=1)
+
+
+def prioritize(ids: list[str], pendentes: list[str]) -> list[str]:
+    """Reordena ids colocando primeiro os adiados do ciclo anterior (na ordem deles)."""
+    primeiro = [p for p in pendentes if p in ids]
+    return primeiro + [i for i in ids if i not in primeiro]
+
+
+def save_raw(raw_dir: str, account_id: str, raw_data: list[dict], append: bool = False) -> str:
+    """Grava o payload bruto da conta em <raw_dir>/<conta>.jsonl (para replay).
+
+    Com append=True acrescenta ao arquivo (blocos seguintes da mesma conta).
+    """
+    os.makedirs(raw_dir, exist_ok=True)
+    path = os.path.join(raw_dir, f"{normalize_account_id(account_id)}.jsonl")
+    with open(path, "a" if append else "w", encoding="utf-8") as f:
+        for row in raw_data:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    return path
+
+
+def raw_files(path: str) -> list[tuple[str, str]]:
+    """Lista (conta, arquivo) de um .jsonl/.json ou de um diretório deles.
+
+    A conta vem do nome do arquivo (act_123.jsonl → act_123), o mesmo formato
+    gravado por save_raw() e por scripts/benchmarks/synthetic_insights.py.
+    """
+    if os.path.isfile(path):
+        arquivos = [path]
+    else:
+        arquivos = [
+            os.path.join(path, nome)
+            for nome in sorted(os.listdir(path))
+            if nome.endswith((".jsonl", ".json"))
+        ]
+    return [
+        (normalize_account_id(os.path.splitext(os.path.basename(arq))[0]), arq)
+        for arq in arquivos
+    ]
+
+
+def load_raw(path: str) -> list[dict]:
+    """Lê um payload bruto: .jsonl (uma linha por insight) ou .json (lista/'data')."""
+    return [row for chunk in iter_raw(path) for row in chunk]
+
+
+def iter_raw(path: str, chunk_rows=None):
+    """Lê um payload bruto em blocos de até chunk_rows linhas (ver load_raw).
+
+    .jsonl é lido em streaming; .json precisa ser carregado inteiro antes.
+
+    Args:
+        chunk_rows: Linhas por bloco, ou função sem argumentos consultada a
+            cada bloco. Padrão: um bloco só.
+    """
+
+    def limite() -> float:
+        if chunk_rows is None:
+            return float("inf")
+        return chunk_rows() if callable(chunk_rows) else chunk_rows
+
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            linhas = (json.loads(line) for line in f if line.strip())
+        else:
+            data = json.load(f)
+            linhas = iter(data.get("data", []) if isinstance(data, dict) else data)
+        bloco = []
+        for row in linhas:
+            bloco.append(row)
+            if len(bloco) >= limite():
+                yield bloco
+                bloco = []
+        if bloco:
+            yield bloco
+
+
+def lock_name(perfil: dict) -> str:
+    """Nome do advisory lock do perfil: perfis gravam em tabelas diferentes,
+    então só ciclos do mesmo perfil se excluem."""
+    from src.scheduling.locks import RUN_LOCK_NAME
+
+    if perfil["nome"] == BASE_PROFILE:
+        return RUN_LOCK_NAME
+    return f"{RUN_LOCK_NAME}:{perfil['nome']}"
+
+
+def _transform_and_load(acc_id, raw_data, cleaner, loader, record, perfil=None) -> int:
+    """Transforma e carrega o payload de uma conta. Retorna as linhas salvas."""
+    clean_df, atividade = _transform(acc_id, raw_data, cleaner, record, perfil)
+    return _load(acc_id, raw_data, clean_df, atividade, loader, record, perfil)
+
+
+def _transform(acc_id, raw_data, cleaner, record, perfil=None):
+    """Transforma um bloco da conta. Retorna (clean_df, resumo de atividade).
+
+    Não altera estado compartilhado da conta: pode rodar em paralelo com
+    outros blocos (ver _run_ads_staged).
+    """
+    from src.scheduling.adaptive import summarize_activity
+
+    with record.stage(acc_id, "transform"):
+        clean_df = cleaner.transform(raw_data, perfil)
+        atividade = summarize_activity(clean_df)
+    return clean_df, atividade
+
+
+def _load(acc_id, raw_data, clean_df, atividade, loader, record, perfil=None) -> int:
+    """Carrega um bloco transformado da conta. Retorna as linhas salvas."""
+    from src.scheduling.adaptive import merge_activity
+
+    metrics = record.account(acc_id)
+    # A conta pode chegar em vários blocos: a atividade é somada
+    metrics["atividade"] = merge_activity(metrics["atividade"], atividade)
+    with record.stage(acc_id, "load"):
+        changes = loader.upsert_data(clean_df, raw_data, run_id=record.run_id)
+    record.add(acc_id, linhas=len(clean_df), linhas_alteradas=len(changes))
+    # Só o que mudou de fato (feed de mudanças) marca fatias para os rollups
+    if not changes.empty:
+        datas = changes.groupby("account_id")["data_registro"].agg(["min", "max"])
+        for conta, (inicio, fim) in datas.iterrows():
+            record.touch(str(conta), str(inicio), str(fim))
+        _export_parquet(acc_id, clean_df[clean_df["hash_id"].isin(changes["hash_id"])], perfil)
+    return len(clean_df)
+
+
+def _export_parquet(acc_id, df, perfil) -> None:
+    """Mescla as linhas alteradas nas partições Parquet da conta.
+
+    Falha aqui não derruba a conta: os dados já estão no Postgres e
+    `main.py export-parquet` regrava o período.
+    """
+    if not PARQUET_ENABLED:
+        return
+    from src.load.parquet_exporter import ParquetExporter
+
+    try:
+        particoes = ParquetExporter.for_profile(perfil or get_profile()).export(df)
+    except Exception as e:
+        print(f"⚠️ [Parquet] Falha ao exportar {acc_id}: {e}")
+        return
+    print(f"🗂️ [Parquet] {len(df)} linhas em {len(particoes)} partições ({acc_id})")
+
+
+def _refresh_rollups(loader, record, perfil) -> None:
+    """Atualiza os rollups de src.analysis nas fatias (conta, datas) gravadas.
+
+    Só o perfil granular alimenta os rollups. Falha aqui não derruba o ciclo:
+    os dados já estão na tabela fato (e o delta em etl_changes); o período é
+    refeito com `main.py rollup`.
+    """
+    if not ROLLUPS_ENABLED or perfil["nome"] != BASE_PROFILE or not record.touched:
+        return
+    from src.analysis.rollups import refresh_rollups
+
+    inicio = time.perf_counter()
+    try:
+        linhas = refresh_rollups(loader.engine, record.touched)
+    except Exception as e:
+        print(f"⚠️ [Rollups] Falha ao atualizar rollups: {e}")
+        return
+    detalhes = ", ".join(f"{nome} {total}" for nome, total in linhas.items())
+    print(
+        f"🧮 [Rollups] {len(record.touched)} contas atualizadas ({detalhes} linhas) "
+        f"em {time.perf_counter() - inicio:.2f}s"
+    )
+    _check_anomalies(loader, record)
+
+
+def _check_anomalies(loader, record) -> None:
+    """Anomalias de gasto/leads de ontem nas contas gravadas, num alerta só.
+
+    Roda logo após os rollups (que são a fonte); só entram as contas cujo
+    intervalo gravado inclui o dia avaliado.
+    """
+    if not ANOMALIES_ENABLED:
+        return
+    from src.analysis.anomalies import check_anomalies
+
+    ontem = (date.today() - timedelta(days=1)).isoformat()
+    contas = [c for c, (i, f) in record.touched.items() if i <= ontem <= f]
+    if not contas:
+        return
+
+    inicio = time.perf_counter()
+    try:
+        total = check_anomalies(loader.engine, contas, alert=alert)
+    except Exception as e:
+        print(f"⚠️ [Anomalias] Falha na detecção: {e}")
+        return
+    print(
+        f"🔎 [Anomalias] {len(contas)} contas avaliadas, {total} anomalias novas "
+        f"em {time.perf_counter() - inicio:.2f}s"
+    )
+
+
+def _finish_cycle(record, loader, start_time, erros_lista, resumo: list[str]) -> None:
+    """Relatório final, métricas, etl_runs e digest de alertas do ciclo."""
+    from src.utils.metrics import observe_run
+
+    duration = datetime.now() - start_time
+    record.finish()
+    etapas = record.stage_totals()
+
+    msg_final = (
+        f"**Ciclo Finalizado!**\n"
+        f"⏱️ Duração: {duration}\n"
+        f"🧭 Etapas: extração {etapas['extract']:.1f}s | "
+        f"transformação {etapas['transform']:.1f}s | carga {etapas['load']:.1f}s\n"
+        + "\n".join(resumo)
+    )
+    print(f"\n🏁 {msg_final}")
+    print(f"\n📐 Desempenho por conta:\n{record.summary()}")
+    observe_run(record)
+
+    try:
+        loader.save_run_record(record.to_rows())
+    except Exception as e:
+        print(f"⚠️ [Runs] Falha ao registrar execução em etl_runs: {e}")
+
+    try:
+        loader.prune_changes()
+    except Exception as e:
+        print(f"⚠️ [Changes] Falha ao limpar etl_changes: {e}")
+
+    if erros_lista:
+        detalhes = "\n".join(erros_lista)
+        alert.send(f"{msg_final}\n\n**Erros Encontrados:**\n{detalhes}", level="error")
+    else:
+        # alert.send(msg_final, level="info") # Descomente se quiser receber notificação a cada ciclo bem sucedido
+        pass
+    # Um digest por ciclo (erros + anomalias), enviado em background
+    alert.flush()
+
+
+def _crash(e_critico: Exception) -> None:
+    from src.utils.metrics import observe_crash
+
+    msg_crash = f"💥 O ETL PAROU COMPLETAMENTE!\nErro: {str(e_critico)}"
+    print(msg_crash)
+    observe_crash()
+    alert.send(msg_crash, level="error")
+    alert.flush()
+
+
+def _process_ads_account(
+    acc_id: str,
+    cleaner,
+    loader,
+    record: RunRecord,
+    erros_lista: list[str],
+    date_preset: str = DATE_PRESET,
+    time_range: dict | None = None,
+    raw_dir: str | None = None,
+    deadline: Deadline | None = None,
+    perfil: dict | None = None,
+) -> int:
+    """Extract → transform → load de uma conta Ads. Retorna as linhas salvas.
+
+    A conta passa em blocos do tamanho que o orçamento de memória permite
+    (src.utils.memory): cada bloco é transformado e carregado antes do
+    próximo ser baixado, então o pico de memória não cresce com a conta.
+
+    Falhas (inclusive erro da API no meio da extração) e estouro de prazo
+    ficam registrados no record (fail/defer) e em erros_lista; nada sobe,
+    para o loop de contas seguir.
+    """
+    from src.ingestion.extractor import MetaExtractor
+    from src.utils.memory import budget, reset_peak_rss
+
+    print(f"\n🚀 Conta Ads: {acc_id}")
+    # Pico de memória medido só desta conta (RunRecord.stage lê o pico)
+    reset_peak_rss()
+
+    extractor = None
+    try:
+        # Extração, transformação e carga, bloco a bloco
+        extractor = MetaExtractor(acc_id)
+        blocos = extractor.iter_ad_insights(
+            date_preset=date_preset,
+            time_range=time_range,
+            deadline=deadline,
+            profile=perfil,
+            chunk_rows=lambda: budget.chunk_rows,
+        )
+        linhas = extraidas = 0
+        while True:
+            with record.stage(acc_id, "extract"):
+                raw_data = next(blocos, None)
+            if raw_data is None:
+                break
+            if raw_dir:
+                path = save_raw(raw_dir, acc_id, raw_data, append=extraidas > 0)
+                print(f"💾 [Raw] Payload salvo em {path}")
+            extraidas += len(raw_data)
+            linhas += _transform_and_load(acc_id, raw_data, cleaner, loader, record, perfil)
+            budget.adjust(len(raw_data))
+            del raw_data
+
+        if not extraidas:
+            print("⚠️ Sem dados (pausado/sem gasto).")
+            return 0
+
+        print("✅ Conta finalizada.")
+        time.sleep(2)
+        record.add(acc_id, pausa_entre_contas_s=2)
+        return linhas
+
+    except DeadlineExceeded as e:
+        print(f"⏳ {e}. Conta adiada para o próximo ciclo.")
+        record.defer(acc_id, str(e))
+
+    except Exception as e:
+        # Inclui erro da API no meio da paginação: extração incompleta é falha
+        erro_msg = f"Falha na conta Ads {acc_id}: {e}"
+        print(f"❌ {erro_msg}")
+        erros_lista.append(erro_msg)
+        record.fail(acc_id, str(e))
+
+    finally:
+        if extractor is not None:
+            record.add(
+                acc_id,
+                chamadas_api=extractor.api_calls,
+                bytes_baixados=extractor.bytes_downloaded,
+                espera_throttle_s=extractor.backoff_wait_s,
+            )
+            record.add_api_errors(acc_id, extractor.api_errors)
+    return 0
+
+
+def _put(fila, item, parar) -> bool:
+    """put() numa fila limitada que desiste se o pipeline for abortado."""
+    while not parar.is_set():
+        try:
+            fila.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _run_ads_staged(
+    accounts: list[str],
+    cleaner,
+    loader,
+    record: RunRecord,
+    erros_lista: list[str],
+    ciclo: Deadline,
+    account_deadline_s: float | None = ACCOUNT_DEADLINE_S,
+    date_preset: str = DATE_PRESET,
+    time_range: dict | None = None,
+    raw_dir: str | None = None,
+    perfil: dict | None = None,
+    extract_workers: int = EXTRACT_WORKERS,
+    transform_workers: int = TRANSFORM_WORKERS,
+) -> int:
+    """Extract → transform → load das contas Ads em estágios concorrentes.
+
+    extract_workers threads baixam contas (cada uma a sua, bloco a bloco) e
+    entregam os blocos a transform_workers threads, que entregam ao load
+    nesta thread (uma conexão, uma carga por vez). Entre os estágios há
+    filas de STAGE_QUEUE_CHUNKS blocos: quando o load atrasa, as filas
+    enchem e a extração espera (backpressure), então a memória em trânsito
+    fica limitada a ~(2 × STAGE_QUEUE_CHUNKS + workers) blocos, que o
+    MemoryBudget dimensiona.
+
+    Mesma semântica de _process_ads_account por conta: prazo e falhas ficam
+    no record (defer/fail) e em erros_lista; blocos de uma conta que falhou
+    são descartados. O pico de RSS é do processo, e as contas aqui rodam
+    juntas: cada uma recebe o pico do grupo (RunRecord.share_peak_rss).
+
+    Returns:
+        Linhas salvas.
+    """
+    from src.ingestion.extractor import MetaExtractor
+    from src.utils.memory import budget, reset_peak_rss
+
+    contas = queue.SimpleQueue()
+    for acc_id in accounts:
+        contas.put(acc_id)
+    brutos = queue.Queue(maxsize=STAGE_QUEUE_CHUNKS)
+    limpos = queue.Queue(maxsize=STAGE_QUEUE_CHUNKS)
+    parar = threading.Event()
+    falhas: set[str] = set()
+    # O último extrator a terminar avisa cada transformador (um None para cada)
+    extratores_ativos = [extract_workers]
+    trava = threading.Lock()
+    # Linhas extraídas e ainda não descartadas (todas em memória) e o máximo
+    # desde o último ajuste do orçamento: é sobre elas que o pico foi medido
+    transito = {"linhas": 0, "maximo": 0}
+    blocos_no_caminho = 2 * STAGE_QUEUE_CHUNKS + extract_workers + transform_workers + 1
+
+    def entrar(linhas: int) -> None:
+        with trava:
+            transito["linhas"] += linhas
+            transito["maximo"] = max(transito["maximo"], transito["linhas"])
+
+    def sair(linhas: int) -> None:
+        with trava:
+            transito["linhas"] -= linhas
+
+    def falhar(acc_id: str, erro_msg: str, erro: Exception) -> None:
+        with trava:
+            if acc_id in falhas:
+                return
+            falhas.add(acc_id)
+        print(f"❌ {erro_msg}")
+        erros_lista.append(erro_msg)
+        record.fail(acc_id, str(erro))
+
+    def extrair() -> None:
+        try:
+            while not parar.is_set():
+                try:
+                    acc_id = contas.get_nowait()
+                except queue.Empty:
+                    return
+                if ciclo.expired:
+                    record.defer(acc_id, "prazo do ciclo estourado antes de começar")
+                    continue
+
+                print(f"\n🚀 Conta Ads: {acc_id}")
+                record.account(acc_id)
+                extractor, extraidas = None, 0
+                try:
+                    extractor = MetaExtractor(acc_id)
+                    blocos = extractor.iter_ad_insights(
+                        date_preset=date_preset,
+                        time_range=time_range,
+                        deadline=Deadline(account_deadline_s, parent=ciclo),
+                        profile=perfil,
+                        chunk_rows=lambda: budget.chunk_rows,
+                    )
+                    while acc_id not in falhas:
+                        with record.stage(acc_id, "extract"):
+                            raw_data = next(blocos, None)
+                        if raw_data is None:
+                            break
+                        entrar(len(raw_data))
+                        if raw_dir:
+                            path = save_raw(raw_dir, acc_id, raw_data, append=extraidas > 0)
+                            print(f"💾 [Raw] Payload salvo em {path}")
+                        extraidas += len(raw_data)
+                        if not _put(brutos, (acc_id, raw_data), parar):
+                            return
+                    if not extraidas:
+                        print(f"⚠️ {acc_id}: sem dados (pausado/sem gasto).")
+                except DeadlineExceeded as e:
+                    print(f"⏳ {e}. Conta adiada para o próximo ciclo.")
+                    record.defer(acc_id, str(e))
+                except Exception as e:
+                    falhar(acc_id, f"Falha na conta Ads {acc_id}: {e}", e)
+                if extractor is not None:
+                    record.add(
+                        acc_id,
+                        chamadas_api=extractor.api_calls,
+                        bytes_baixados=extractor.bytes_downloaded,
+                        espera_throttle_s=extractor.backoff_wait_s,
+                    )
+                    record.add_api_errors(acc_id, extractor.api_errors)
+                if extraidas:
+                    time.sleep(2)
+                    record.add(acc_id, pausa_entre_contas_s=2)
+        finally:
+            with trava:
+                extratores_ativos[0] -= 1
+                ultimo = extratores_ativos[0] == 0
+            if ultimo:
+                for _ in range(transform_workers):
+                    _put(brutos, None, parar)
+
+    def transformar() -> None:
+        try:
+            while True:
+                item = brutos.get()
+                if item is None:
+                    return
+                acc_id, raw_data = item
+                if acc_id in falhas:
+                    sair(len(raw_data))
+                    continue
+                try:
+                    clean_df, atividade = _transform(acc_id, raw_data, cleaner, record, perfil)
+                except Exception as e:
+                    falhar(acc_id, f"Falha na conta Ads {acc_id}: {e}", e)
+                    sair(len(raw_data))
+                    continue
+                if not _put(limpos, (acc_id, raw_data, clean_df, atividade), parar):
+                    return
+        finally:
+            _put(limpos, None, parar)
+
+    extratores = [
+        threading.Thread(target=extrair, name=f"etl-extract-{i}", daemon=True)
+        for i in range(extract_workers)
+    ]
+    transformadores = [
+        threading.Thread(target=transformar, name=f"etl-transform-{i}", daemon=True)
+        for i in range(transform_workers)
+    ]
+    reset_peak_rss()
+    for thread in extratores + transformadores:
+        thread.start()
+
+    # Cada transformador avisa o fim com um None
+    transformadores_ativos = len(transformadores)
+    total = 0
+    try:
+        while transformadores_ativos:
+            item = limpos.get()
+            if item is None:
+                transformadores_ativos -= 1
+                continue
+            acc_id, raw_data, clean_df, atividade = item
+            if acc_id in falhas:
+                sair(len(raw_data))
+                continue
+            try:
+                total += _load(acc_id, raw_data, clean_df, atividade, loader, record, perfil)
+            except Exception as e:
+                falhar(acc_id, f"Falha na conta Ads {acc_id}: {e}", e)
+            sair(len(raw_data))
+            del raw_data, clean_df
+            with trava:
+                medidas, transito["maximo"] = transito["maximo"], transito["linhas"]
+            budget.adjust(medidas, chunks=blocos_no_caminho)
+    finally:
+        parar.set()
+        for thread in extratores + transformadores:
+            thread.join(timeout=5)
+        record.share_peak_rss(accounts)
+    return total
+
+
+def _process_ig_account(
+    ig_id: str,
+    loader,
+    record: RunRecord,
+    erros_lista: list[str],
+    access_token: str | None,
+    ig_days: list[date] | None = None,
+) -> int:
+    """Seguidores de uma conta IG (D-1 ou os dias de ig_days). Retorna as linhas salvas."""
+    from src.ingestion.ig_profile_extractor import InstagramProfileExtractor
+    from src.utils.memory import reset_peak_rss
+
+    print(f"\n   🔎 Extraindo IG ID: {ig_id}...")
+    reset_peak_rss()
+    salvos = 0
+    try:
+        ig_extractor = InstagramProfileExtractor(
+            access_token=access_token, ig_account_id=ig_id
+        )
+        record.account(ig_id, tipo="instagram")
+        for dia in ig_days or [None]:
+            with record.stage(ig_id, "extract"):
+                df_seguidores = ig_extractor.get_daily_followers(day=dia)
+            record.add(ig_id, chamadas_api=1)
+
+            if not df_seguidores.empty:
+                # UPSERT com Chave Primária Composta (ig_account_id + data_registro)
+                with record.stage(ig_id, "load"):
+                    loader.upsert_followers(df_seguidores)
+
+                record.add(ig_id, linhas=len(df_seguidores))
+                salvos += len(df_seguidores)
+                print(f"   ✅ Seguidores da conta {ig_id} atualizados com sucesso.")
+            else:
+                print(f"   ⚠️ Nenhum dado retornado para a conta {ig_id} ({dia or 'ontem'}).")
+
+    except Exception as e:
+        erro_msg = f"Falha na extração do Instagram {ig_id}: {e}"
+        print(f"   ❌ {erro_msg}")
+        erros_lista.append(erro_msg)
+        record.fail(ig_id, str(e))
+    return salvos
+
+
+def run_etl_pipeline(
+    accounts: list[str] | None = None,
+    ig_accounts: list[str] | None = None,
+    date_preset: str = DATE_PRESET,
+    time_range: dict | None = None,
+    ig_days: list[date] | None = None,
+    raw_dir: str | None = None,
+    cycle_deadline_s: float | None = CYCLE_DEADLINE_S,
+    account_deadline_s: float | None = ACCOUNT_DEADLINE_S,
+    carry_over: bool = True,
+    profile: str | None = None,
+) -> RunRecord | None:
+    """Executa um ciclo completo: Ads (extract → transform → load) e seguidores IG.
+
+    O ciclo roda sob um advisory lock do Postgres (RunLock): se outro processo
+    já estiver num ciclo, este é pulado. Contas que não couberem no prazo do
+    ciclo (ou que estourarem o próprio prazo na extração) são adiadas, e não
+    marcadas como erro.
+
+    Args:
+        accounts: Contas de anúncio (padrão: META_AD_ACCOUNT_IDS do .env).
+        ig_accounts: Contas do Instagram (padrão: META_IG_ACCOUNT_IDS; [] pula).
+        date_preset: Janela relativa da API, usada quando não há time_range.
+        time_range: Janela fixa {'since': 'AAAA-MM-DD', 'until': 'AAAA-MM-DD'}.
+        ig_days: Dias a buscar no Instagram (padrão: só D-1).
+        raw_dir: Se informado, grava o payload bruto de cada conta para replay.
+        cycle_deadline_s: Prazo do ciclo inteiro (None = sem limite).
+        account_deadline_s: Prazo de extração por conta (None = sem limite).
+        carry_over: Prioriza as contas adiadas antes e registra as adiadas agora
+            (só no perfil granular; os leves não usam etl_carry_over).
+        profile: Perfil de extração (padrão: ETL_EXTRACTION_PROFILE): define
+            campos, level e breakdowns pedidos à API e a tabela de destino.
+
+    Returns:
+        O RunRecord do ciclo (vazio se o lock estava ocupado), ou None se o
+        ciclo quebrou por completo.
+    """
+    from src.transformation.cleaner import DataCleaner
+    from src.load.postgres_loader import PostgresLoader
+    from src.scheduling.locks import RunLock
+
+    if accounts is None:
+        accounts = env_ids("META_AD_ACCOUNT_IDS")
+    accounts = [normalize_account_id(a) for a in accounts if a.strip()]
+    if ig_accounts is None:
+        ig_accounts = env_ids("META_IG_ACCOUNT_IDS")
+        if not ig_accounts:
+            print(
+                "⚠️ Nenhuma conta de Instagram configurada no .env (META_IG_ACCOUNT_IDS)."
+            )
+    perfil = get_profile(profile)
+    carry_over = carry_over and perfil["nome"] == BASE_PROFILE
+    ciclo = Deadline(cycle_deadline_s)
+    access_token = os.getenv("META_ACCESS_TOKEN")
+    janela = f"{time_range['since']} → {time_range['until']}" if time_range else date_preset
+
+    start_time = datetime.now()
+    record = RunRecord()
+    print("\n" + "=" * 60)
+    print(f"🏭 COVIL LABS - ETL PIPELINE - {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
+    print(
+        f"   Janela: {janela} | Perfil: {perfil['nome']} → {perfil['table']} | "
+        f"{len(accounts)} contas Ads | {len(ig_accounts)} contas IG"
+    )
+    print("=" * 60)
+
+    lock = None
+    try:
+        # Inicializa Workers globais
+        cleaner = DataCleaner()
+        loader = PostgresLoader.for_profile(perfil)
+
+        lock = RunLock(loader.engine, lock_name(perfil))
+        if not lock.acquire():
+            print("⏭️ [Lock] Outro ciclo em andamento (advisory lock ocupado). Ciclo pulado.")
+            return record
+
+        if carry_over:
+            pendentes = loader.load_carry_over()
+            if pendentes:
+                print(f"↪️ [Carry-over] {len(pendentes)} contas adiadas do ciclo anterior vão primeiro.")
+                accounts = prioritize(accounts, pendentes)
+                ig_accounts = prioritize(ig_accounts, pendentes)
+
+        total_processado = 0
+        erros_lista = []
+
+        # ==========================================
+        # 1. BLOCO DE ANÚNCIOS (META ADS)
+        # ==========================================
+        if EXTRACT_WORKERS > 0 and accounts:
+            # Extração, transformação e carga sobrepostas (filas limitadas)
+            total_processado += _run_ads_staged(
+                accounts,
+                cleaner,
+                loader,
+                record,
+                erros_lista,
+                ciclo,
+                account_deadline_s=account_deadline_s,
+                date_preset=date_preset,
+                time_range=time_range,
+                raw_dir=raw_dir,
+                perfil=perfil,
+                extract_workers=min(EXTRACT_WORKERS, len(accounts)),
+            )
+        else:
+            for acc_id in accounts:
+                if ciclo.expired:
+                    record.defer(acc_id, "prazo do ciclo estourado antes de começar")
+                    continue
+                total_processado += _process_ads_account(
+                    acc_id,
+                    cleaner,
+                    loader,
+                    record,
+                    erros_lista,
+                    date_preset=date_preset,
+                    time_range=time_range,
+                    raw_dir=raw_dir,
+                    deadline=Deadline(account_deadline_s, parent=ciclo),
+                    perfil=perfil,
+                )
+
+        # ==========================================
+        # 2. BLOCO DE SEGUIDORES (INSTAGRAM MULTI-CONTA)
+        # ==========================================
+        seguidores_salvos = 0
+
+        if ig_accounts:
+            print("\n📱 Iniciando Extração de Seguidores do Instagram...")
+        for ig_id_raw in ig_accounts:
+            ig_id = ig_id_raw.strip()
+            if not ig_id:
+                continue
+            if ciclo.expired:
+                record.defer(ig_id, "prazo do ciclo estourado antes de começar", tipo="instagram")
+                continue
+            seguidores_salvos += _process_ig_account(
+                ig_id, loader, record, erros_lista, access_token, ig_days
+            )
+
+        # ==========================================
+        # 3. RELATÓRIO FINAL E ALERTAS
+        # ==========================================
+        resumo = [
+            f"📊 Anúncios Salvos: {total_processado} linhas",
+            f"📈 IG Contas Salvas: {seguidores_salvos}",
+        ]
+        if record.deferred:
+            resumo.append(f"⏳ Contas Adiadas (prazo): {len(record.deferred)}")
+        if carry_over:
+            try:
+                loader.save_carry_over(record)
+            except Exception as e:
+                print(f"⚠️ [Carry-over] Falha ao registrar contas adiadas: {e}")
+
+        _refresh_rollups(loader, record, perfil)
+        _finish_cycle(record, loader, start_time, erros_lista, resumo)
+        return record
+
+    except Exception as e_critico:
+        _crash(e_critico)
+        return None
+
+    finally:
+        if lock is not None:
+            lock.release()
+
+
+def run_due_accounts(
+    scheduler=None,
+    accounts: list[str] | None = None,
+    ig_accounts: list[str] | None = None,
+    profile: str | None = None,
+    **kwargs,
+) -> RunRecord | None:
+    """Roda um ciclo só com as contas vencidas na agenda adaptativa.
+
+    Args:
+        scheduler: AdaptiveScheduler (padrão: um novo, no Postgres do .env).
+        accounts: Universo de contas Ads (padrão: META_AD_ACCOUNT_IDS).
+        ig_accounts: Universo de contas IG (padrão: META_IG_ACCOUNT_IDS).
+        profile: Perfil de extração (só o granular tem agenda).
+        **kwargs: Repassados a run_etl_pipeline (date_preset, raw_dir...).
+
+    Returns:
+        O RunRecord do ciclo (vazio se nenhuma conta venceu), ou None se quebrou.
+
+    Raises:
+        ValueError: Se o perfil não for o granular (a agenda é dele).
+    """
+    from src.scheduling.adaptive import AdaptiveScheduler
+    from src.utils.metrics import observe_schedule
+
+    perfil = get_profile(profile)
+    if perfil["nome"] != BASE_PROFILE:
+        raise ValueError(f"A agenda adaptativa só vale para o perfil '{BASE_PROFILE}'")
+
+    scheduler = scheduler or AdaptiveScheduler()
+    if accounts is None:
+        accounts = env_ids("META_AD_ACCOUNT_IDS")
+    accounts = [normalize_account_id(a) for a in accounts if a.strip()]
+    if ig_accounts is None:
+        ig_accounts = env_ids("META_IG_ACCOUNT_IDS")
+
+    ads_vencidas, ig_vencidas = scheduler.due(accounts, ig_accounts)
+    if not ads_vencidas and not ig_vencidas:
+        print(f"🗓️ [Scheduler] Nenhuma conta vencida ({datetime.now():%H:%M}).")
+        return RunRecord()
+
+    print(
+        f"🗓️ [Scheduler] Vencidas: {len(ads_vencidas)}/{len(accounts)} contas Ads, "
+        f"{len(ig_vencidas)}/{len(ig_accounts)} contas IG"
+    )
+    record = run_etl_pipeline(
+        accounts=ads_vencidas, ig_accounts=ig_vencidas, profile=perfil["nome"], **kwargs
+    )
+    if record is None:
+        return None
+
+    try:
+        rows = scheduler.update(record)
+        observe_schedule(rows)
+        print(f"\n🗓️ [Scheduler] Próximas coletas:\n{scheduler.summary(rows)}")
+    except Exception as e:
+        print(f"⚠️ [Scheduler] Falha ao atualizar a agenda: {e}")
+    return record
+
+
+def run_queue_worker(
+    accounts: list[str] | None = None,
+    ig_accounts: list[str] | None = None,
+    interval_min: int = 240,
+    scheduler=None,
+    date_preset: str = DATE_PRESET,
+    raw_dir: str | None = None,
+    cycle_deadline_s: float | None = CYCLE_DEADLINE_S,
+    account_deadline_s: float | None = ACCOUNT_DEADLINE_S,
+    profile: str | None = None,
+) -> RunRecord | None:
+    """Modo fila: enfileira o ciclo atual e consome jobs até a fila esvaziar.
+
+    Várias réplicas podem rodar isto ao mesmo tempo: todas enfileiram o mesmo
+    ciclo (chave = início da janela de interval_min minutos, sem duplicar) e
+    cada conta é arrendada por uma só réplica (SKIP LOCKED). Por isso aqui não
+    há RunLock global; o carry-over é a própria fila (adiadas voltam com
+    prioridade, e o que sobrar pendente é pego pela próxima réplica livre).
+    A fila é sempre do perfil granular (BASE_PROFILE).
+
+    Args:
+        accounts: Contas Ads (padrão: META_AD_ACCOUNT_IDS).
+        ig_accounts: Contas IG (padrão: META_IG_ACCOUNT_IDS).
+        interval_min: Tamanho da janela que define o ciclo (chave dos jobs).
+        scheduler: AdaptiveScheduler opcional: só enfileira as contas vencidas
+            e reagenda as processadas por esta réplica.
+        date_preset: Janela relativa da API.
+        raw_dir: Se informado, grava o payload bruto de cada conta.
+        cycle_deadline_s: Prazo desta réplica para parar de pegar jobs.
+        account_deadline_s: Prazo de extração por conta (também define o lease).
+        profile: Perfil de extração (só o granular tem fila).
+
+    Returns:
+        O RunRecord com as contas processadas por esta réplica, ou None se quebrou.
+
+    Raises:
+        ValueError: Se o perfil não for o granular.
+    """
+    from src.transformation.cleaner import DataCleaner
+    from src.load.postgres_loader import PostgresLoader
+    from src.scheduling.queue import AccountQueue, cycle_key
+    from src.utils.metrics import observe_queue, observe_schedule
+
+    if accounts is None:
+        accounts = env_ids("META_AD_ACCOUNT_IDS")
+    accounts = [normalize_account_id(a) for a in accounts if a.strip()]
+    if ig_accounts is None:
+        ig_accounts = env_ids("META_IG_ACCOUNT_IDS")
+    perfil = get_profile(profile)
+    if perfil["nome"] != BASE_PROFILE:
+        raise ValueError(f"A fila só vale para o perfil '{BASE_PROFILE}'")
+    ciclo = Deadline(cycle_deadline_s)
+    # Lease com folga sobre o prazo da conta (carga e IG não têm prazo próprio)
+    lease_s = (account_deadline_s or 3600) + 600
+    access_token = os.getenv("META_ACCESS_TOKEN")
+
+    start_time = datetime.now()
+    record = RunRecord()
+
+    try:
+        cleaner = DataCleaner()
+        loader = PostgresLoader.for_profile(perfil)
+        fila = AccountQueue(loader.engine)
+
+        if scheduler is not None:
+            accounts, ig_accounts = scheduler.due(accounts, ig_accounts)
+        key = cycle_key(interval_min)
+        novos = fila.enqueue(key, accounts, ig_accounts)
+        if novos:
+            print(f"📬 [Fila] {novos} jobs enfileirados no ciclo {key}.")
+
+        total_processado = 0
+        seguidores_salvos = 0
+        erros_lista = []
+
+        # Cada conta uma vez por execução: o erro volta para a fila (ver
+        # AccountQueue.complete) e a nova tentativa fica para depois
+        feitas: list[str] = []
+        while not ciclo.expired:
+            job = fila.claim(lease_s, skip=feitas)
+            if job is None:
+                break
+            job_key, acc_id, tipo = job
+            feitas.append(acc_id)
+            if not record.accounts:
+                print("\n" + "=" * 60)
+                print(f"🏭 COVIL LABS - ETL WORKER {fila.worker_id} - {start_time:%Y-%m-%d %H:%M:%S}")
+                print("=" * 60)
+            print(f"\n📦 [Fila] Job {job_key} → {acc_id} ({tipo})")
+
+            if tipo == "instagram":
+                seguidores_salvos += _process_ig_account(
+                    acc_id, loader, record, erros_lista, access_token
+                )
+            else:
+                total_processado += _process_ads_account(
+                    acc_id,
+                    cleaner,
+                    loader,
+                    record,
+                    erros_lista,
+                    date_preset=date_preset,
+                    raw_dir=raw_dir,
+                    deadline=Deadline(account_deadline_s, parent=ciclo),
+                    perfil=perfil,
+                )
+            m = record.account(acc_id, tipo=tipo)
+            if fila.complete(job, m["status"], m["erro"]) == "pendente":
+                print(f"🔁 [Fila] {acc_id} volta para a fila (nova tentativa em breve).")
+
+        observe_queue(fila.pending())
+        if not record.accounts:
+            print(f"📭 [Fila] Nada a processar ({datetime.now():%H:%M}).")
+            return record
+
+        if scheduler is not None:
+            try:
+                rows = scheduler.update(record)
+                observe_schedule(rows)
+            except Exception as e:
+                print(f"⚠️ [Scheduler] Falha ao atualizar a agenda: {e}")
+
+        resumo = [
+            f"📊 Anúncios Salvos: {total_processado} linhas",
+            f"📈 IG Contas Salvas: {seguidores_salvos}",
+        ]
+        if record.deferred:
+            resumo.append(f"⏳ Contas Adiadas (prazo): {len(record.deferred)}")
+        _refresh_rollups(loader, record, perfil)
+        _finish_cycle(record, loader, start_time, erros_lista, resumo)
+        return record
+
+    except Exception as e_critico:
+        _crash(e_critico)
+        return None
+
+
+def replay_raw(
+    path: str,
+    accounts: list[str] | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    profile: str | None = None,
+) -> RunRecord | None:
+    """Reprocessa payloads brutos salvos (transform → load), sem chamar a API.
+
+    Args:
+        path: Arquivo .jsonl/.json ou diretório com um arquivo por conta.
+        accounts: Se informado, só reprocessa essas contas.
+        since: Descarta linhas com date_start anterior (AAAA-MM-DD).
+        until: Descarta linhas com date_start posterior (AAAA-MM-DD).
+        profile: Perfil com que o payload foi extraído (define a tabela).
+
+    Returns:
+        O RunRecord do replay, ou None se quebrou por completo.
+    """
+    from src.transformation.cleaner import DataCleaner
+    from src.load.postgres_loader import PostgresLoader
+    from src.scheduling.locks import RunLock
+    from src.utils.memory import budget, reset_peak_rss
+
+    filtro = {normalize_account_id(a) for a in accounts} if accounts else None
+    perfil = get_profile(profile)
+    start_time = datetime.now()
+    record = RunRecord()
+    print("\n" + "=" * 60)
+    print(f"♻️ COVIL LABS - ETL REPLAY - {path}")
+    print("=" * 60)
+
+    lock = None
+    try:
+        cleaner = DataCleaner()
+        loader = PostgresLoader.for_profile(perfil)
+
+        # Mesmo lock do ciclo: replay e extração não escrevem ao mesmo tempo
+        lock = RunLock(loader.engine, lock_name(perfil))
+        if not lock.acquire():
+            print("⏭️ [Lock] Ciclo em andamento (advisory lock ocupado). Replay pulado.")
+            return record
+
+        total_processado = 0
+        erros_lista = []
+
+        for acc_id, arquivo in raw_files(path):
+            if filtro is not None and acc_id not in filtro:
+                continue
+
+            print(f"\n🚀 Replay: {acc_id} ({arquivo})")
+            record.account(acc_id, tipo="replay")
+            reset_peak_rss()
+            try:
+                blocos = iter_raw(arquivo, chunk_rows=lambda: budget.chunk_rows)
+                linhas_conta = 0
+                while True:
+                    with record.stage(acc_id, "extract"):
+                        raw_data = next(blocos, None)
+                        if raw_data is not None and (since or until):
+                            raw_data = [
+                                row
+                                for row in raw_data
+                                if (not since or row.get("date_start", "") >= since)
+                                and (not until or row.get("date_start", "") <= until)
+                            ]
+                    if raw_data is None:
+                        break
+                    if raw_data:
+                        linhas_conta += _transform_and_load(
+                            acc_id, raw_data, cleaner, loader, record, perfil
+                        )
+                    budget.adjust(len(raw_data))
+                    del raw_data
+                record.add(acc_id, bytes_baixados=os.path.getsize(arquivo))
+
+                if not linhas_conta:
+                    print("⚠️ Nenhuma linha no filtro.")
+                    continue
+
+                total_processado += linhas_conta
+                print("✅ Conta reprocessada.")
+
+            except Exception as e:
+                erro_msg = f"Falha no replay {acc_id}: {e}"
+                print(f"❌ {erro_msg}")
+                erros_lista.append(erro_msg)
+                record.fail(acc_id, str(e))
+
+        _refresh_rollups(loader, record, perfil)
+        _finish_cycle(
+            record,
+            loader,
+            start_time,
+            erros_lista,
+            [f"♻️ Linhas Reprocessadas: {total_processado}"],
+        )
+        return record
+
+    except Exception as e_critico:
+        _crash(e_critico)
+        return None
+
+    finally:
+        if lock is not None:
+            lock.release()
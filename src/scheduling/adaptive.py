@@ -0,0 +1,249 @@
+import os
+from datetime import date, datetime, timedelta
+
+
+# Política de intervalos (minutos) por estado de atividade da conta
+INTERVALO_ATIVA_MIN = int(os.getenv("ETL_INTERVAL_ACTIVE_MIN", "60"))
+INTERVALO_MORNA_MIN = int(os.getenv("ETL_INTERVAL_WARM_MIN", "240"))
+INTERVALO_DORMENTE_MIN = int(os.getenv("ETL_INTERVAL_DORMANT_MIN", "1440"))
+INTERVALO_IG_MIN = int(os.getenv("ETL_INTERVAL_IG_MIN", "240"))
+
+# Dias de gasto considerados "recentes" e dias sem mudança até dormir
+JANELA_GASTO_DIAS = int(os.getenv("ETL_ACTIVITY_WINDOW_DAYS", "7"))
+DORMENTE_APOS_DIAS = int(os.getenv("ETL_DORMANT_AFTER_DAYS", "3"))
+
+INTERVALOS = {
+    "ativa": INTERVALO_ATIVA_MIN,
+    "morna": INTERVALO_MORNA_MIN,
+    "dormente": INTERVALO_DORMENTE_MIN,
+    "instagram": INTERVALO_IG_MIN,
+}
+
+
+def summarize_activity(clean_df, hoje: date | None = None) -> dict:
+    """Resume a atividade de uma conta a partir do DataFrame limpo do ciclo.
+
+    Args:
+        clean_df: Saída de DataCleaner.transform().
+        hoje: Data de referência (padrão: hoje).
+
+    Returns:
+        Dict com gasto_recente (soma de valor_gasto nos últimos
+        JANELA_GASTO_DIAS dias), dias (soma dos hashes das linhas com gasto
+        ou impressões, por dia) e assinatura (ver activity_signature).
+    """
+    import pandas as pd
+
+    hoje = hoje or date.today()
+    dias = pd.to_datetime(clean_df["data_registro"]).dt.date
+    recentes = dias >= hoje - timedelta(days=JANELA_GASTO_DIAS)
+    gasto_recente = float(clean_df.loc[recentes, "valor_gasto"].fillna(0).sum())
+
+    # Só linhas com entrega: a janela last_30d traz o mesmo conteúdo enquanto
+    # a conta está parada. Soma dos hashes por linha: independe da ordem em
+    # que a API paginou (e soma bloco a bloco, ver merge_activity)
+    ativas = (clean_df["valor_gasto"].fillna(0) > 0) | (clean_df["impressoes"].fillna(0) > 0)
+    hashes = pd.util.hash_pandas_object(clean_df[ativas], index=False)
+    por_dia = {}
+    for dia, valor in zip(dias[ativas], hashes):
+        chave = dia.isoformat()
+        por_dia[chave] = (por_dia.get(chave, 0) + int(valor)) % 2**64
+
+    return {
+        "gasto_recente": round(gasto_recente, 2),
+        "dias": por_dia,
+        "referencia": hoje.isoformat(),
+        "assinatura": activity_signature(por_dia, hoje),
+    }
+
+
+def activity_signature(por_dia: dict[str, int], hoje: date) -> str | None:
+    """Assinatura da atividade: muda quando chega entrega nova ou corrigida.
+
+    Cobre os JANELA_GASTO_DIAS dias até o último dia com entrega (não até
+    hoje): quando a janela da API anda um dia e a conta não entregou nada, as
+    linhas que saem pela borda não mudam a assinatura. Sem entrega recente,
+    vale só o último dia ativo, para a borda da API também não mexer nela.
+
+    Returns:
+        Hash hexadecimal, "ultimo:AAAA-MM-DD", ou None se não houve entrega.
+    """
+    if not por_dia:
+        return None
+    ultimo = date.fromisoformat(max(por_dia))
+    if ultimo < hoje - timedelta(days=JANELA_GASTO_DIAS):
+        return f"ultimo:{ultimo.isoformat()}"
+    inicio = (ultimo - timedelta(days=JANELA_GASTO_DIAS)).isoformat()
+    total = sum(valor for dia, valor in por_dia.items() if dia >= inicio) % 2**64
+    return f"{total:016x}"
+
+
+def merge_activity(anterior: dict | None, atividade: dict) -> dict:
+    """Soma o resumo de um bloco ao dos blocos anteriores da mesma conta.
+
+    gasto_recente e os hashes por dia (módulo 2⁶⁴) são aditivos: o resultado
+    é o mesmo de summarize_activity() na conta inteira.
+    """
+    if anterior is None:
+        return atividade
+    por_dia = dict(anterior["dias"])
+    for dia, valor in atividade["dias"].items():
+        por_dia[dia] = (por_dia.get(dia, 0) + valor) % 2**64
+    referencia = atividade["referencia"]
+    return {
+        "gasto_recente": round(anterior["gasto_recente"] + atividade["gasto_recente"], 2),
+        "dias": por_dia,
+        "referencia": referencia,
+        "assinatura": activity_signature(por_dia, date.fromisoformat(referencia)),
+    }
+
+
+def classify(anterior: dict | None, atividade: dict | None, agora: datetime) -> dict:
+    """Decide o estado da conta (ativa/morna/dormente) após uma execução.
+
+    - ativa: gastou nos últimos dias e os dados mudaram desde a última coleta
+    - morna: gastou recentemente ou mudou há menos de DORMENTE_APOS_DIAS dias
+    - dormente: sem gasto recente e sem mudança há DORMENTE_APOS_DIAS dias
+
+    Args:
+        anterior: Linha atual em etl_account_schedule (None se conta nova).
+        atividade: Saída de summarize_activity() (None se a API não trouxe dados).
+        agora: Momento da execução.
+
+    Returns:
+        Dict com estado, gasto_recente, assinatura e ultima_mudanca.
+    """
+    anterior = anterior or {}
+    gasto = atividade["gasto_recente"] if atividade else 0.0
+    assinatura = atividade["assinatura"] if atividade else None
+    mudou = assinatura != anterior.get("assinatura")
+    ultima_mudanca = agora if mudou else anterior.get("ultima_mudanca")
+
+    if gasto > 0 and mudou:
+        estado = "ativa"
+    elif gasto > 0 or (
+        ultima_mudanca and agora - ultima_mudanca < timedelta(days=DORMENTE_APOS_DIAS)
+    ):
+        estado = "morna"
+    else:
+        estado = "dormente"
+
+    return {
+        "estado": estado,
+        "gasto_recente": gasto,
+        "assinatura": assinatura,
+        "ultima_mudanca": ultima_mudanca,
+    }
+
+
+class AdaptiveScheduler:
+    """Agenda cada conta conforme a própria atividade, em vez de um ciclo fixo.
+
+    O estado fica na tabela etl_account_schedule (ver PostgresLoader): a cada
+    execução a conta é reclassificada e ganha uma proxima_execucao. O loop do
+    daemon só roda as contas vencidas, então contas pausadas deixam de gastar
+    chamadas à API e escritas no banco a cada 4 horas.
+    """
+
+    def __init__(self, loader=None):
+        if loader is None:
+            from src.load.postgres_loader import PostgresLoader
+
+            loader = PostgresLoader()
+        self.loader = loader
+
+    def due(
+        self, ads_accounts: list[str], ig_accounts: list[str], agora: datetime | None = None
+    ) -> tuple[list[str], list[str]]:
+        """Filtra as contas cuja proxima_execucao já passou (contas novas entram).
+
+        Se o banco não responder, devolve todas: melhor coletar a mais do que parar.
+        """
+        agora = agora or datetime.now()
+        try:
+            agenda = self.loader.load_account_schedule()
+        except Exception as e:
+            print(f"⚠️ [Scheduler] Agenda indisponível, rodando todas as contas: {e}")
+            return list(ads_accounts), list(ig_accounts)
+
+        def vencida(account_id: str) -> bool:
+            linha = agenda.get(account_id)
+            return linha is None or linha["proxima_execucao"] <= agora
+
+        def atraso(account_id: str) -> datetime:
+            linha = agenda.get(account_id)
+            return linha["proxima_execucao"] if linha else datetime.min
+
+        # Mais atrasadas primeiro (contas novas antes de todas)
+        return (
+            sorted((a for a in ads_accounts if vencida(a)), key=atraso),
+            sorted((a for a in ig_accounts if vencida(a)), key=atraso),
+        )
+
+    def update(self, record, agora: datetime | None = None) -> list[dict]:
+        """Reclassifica as contas de um ciclo e grava a próxima execução de cada uma.
+
+        Args:
+            record: RunRecord do ciclo (usa tipo, status e atividade de cada conta).
+
+        Returns:
+            Linhas gravadas em etl_account_schedule.
+        """
+        agora = agora or datetime.now()
+        agenda = self.loader.load_account_schedule()
+
+        rows = []
+        for account_id, m in record.accounts.items():
+            # Adiadas continuam vencidas: entram de novo na próxima verificação
+            if m["tipo"] not in ("ads", "instagram") or m["status"] == "adiada":
+                continue
+            anterior = agenda.get(account_id)
+            # Erro da API sem dados não é sinal de inatividade (não rebaixa a conta)
+            falhou = m["status"] != "ok" or bool(m.get("erros_api"))
+
+            if m["tipo"] == "instagram":
+                # Seguidores D-1: sem sinal de gasto, intervalo fixo
+                estado = {
+                    "estado": "instagram",
+                    "gasto_recente": None,
+                    "assinatura": None,
+                    "ultima_mudanca": None,
+                }
+            elif falhou:
+                # Falhou: mantém a classificação e tenta de novo sem esperar um dia
+                estado = {
+                    "estado": (anterior or {}).get("estado", "morna"),
+                    "gasto_recente": (anterior or {}).get("gasto_recente"),
+                    "assinatura": (anterior or {}).get("assinatura"),
+                    "ultima_mudanca": (anterior or {}).get("ultima_mudanca"),
+                }
+            else:
+                estado = classify(anterior, m.get("atividade"), agora)
+
+            intervalo = INTERVALOS[estado["estado"]]
+            if falhou:
+                intervalo = min(intervalo, INTERVALO_MORNA_MIN)
+
+            rows.append(
+                {
+                    "account_id": account_id,
+                    "tipo": m["tipo"],
+                    **estado,
+                    "intervalo_min": intervalo,
+                    "ultima_execucao": agora,
+                    "proxima_execucao": agora + timedelta(minutes=intervalo),
+                    "ultimo_status": m["status"],
+                }
+            )
+
+        self.loader.save_account_schedule(rows)
+        return rows
+
+    @staticmethod
+    def summary(rows: list[dict]) -> str:
+        """Resumo da agenda (uma linha por conta) para o log do daemon."""
+        return "\n".join(
+            f"   {r['account_id']:<22} | {r['estado']:<9} | a cada {r['intervalo_min']:>5} min"
+            f" | próxima {r['proxima_execucao']:%d/%m %H:%M}"
+            for r in rows
+        )
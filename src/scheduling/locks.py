@@ -0,0 +1,52 @@
+import os
+
+from sqlalchemy import text
+
+
+RUN_LOCK_NAME = os.getenv("ETL_LOCK_NAME", "etl_vetorial_meta")
+
+
+class RunLock:
+    """Trava de execução entre processos via advisory lock do Postgres.
+
+    Usa pg_try_advisory_lock numa conexão dedicada, mantida aberta enquanto
+    o ciclo roda: se outro processo (réplica, cron sobreposto, ciclo atrasado)
+    já tiver a trava, acquire() devolve False na hora em vez de esperar. Se o
+    processo morrer, o Postgres libera a trava junto com a sessão.
+    """
+
+    def __init__(self, engine, name: str = RUN_LOCK_NAME):
+        self.engine = engine
+        self.name = name
+        self.conn = None
+
+    def acquire(self) -> bool:
+        conn = self.engine.connect()
+        acquired = conn.execute(
+            text("SELECT pg_try_advisory_lock(hashtext(:name))"), {"name": self.name}
+        ).scalar()
+        # A trava é de sessão: fecha a transação para não ficar "idle in transaction"
+        conn.commit()
+        if not acquired:
+            conn.close()
+            return False
+        self.conn = conn
+        return True
+
+    def release(self) -> None:
+        if self.conn is None:
+            return
+        try:
+            self.conn.execute(
+                text("SELECT pg_advisory_unlock(hashtext(:name))"), {"name": self.name}
+            )
+            self.conn.commit()
+        finally:
+            self.conn.close()
+            self.conn = None
+
+    def __enter__(self) -> bool:
+        return self.acquire()
+
+    def __exit__(self, *exc) -> None:
+        self.release()
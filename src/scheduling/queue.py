@@ -0,0 +1,233 @@
+import os
+import socket
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+
+# Jobs de contas por ciclo. Cada réplica enfileira (idempotente) e consome com
+# FOR UPDATE SKIP LOCKED, então cada conta roda em uma única réplica por ciclo.
+ACCOUNT_JOBS_DDL = """
+    CREATE TABLE IF NOT EXISTS etl_account_jobs (
+        cycle_key TEXT NOT NULL,
+        account_id TEXT NOT NULL,
+        tipo TEXT NOT NULL,
+        prioridade INTEGER NOT NULL DEFAULT 0,
+        status TEXT NOT NULL DEFAULT 'pendente',
+        worker TEXT,
+        tentativas INTEGER NOT NULL DEFAULT 0,
+        criado_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        iniciado_em TIMESTAMP,
+        lease_ate TIMESTAMP,
+        finalizado_em TIMESTAMP,
+        erro TEXT,
+        PRIMARY KEY (cycle_key, account_id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_etl_account_jobs_fila
+        ON etl_account_jobs (status, cycle_key, prioridade DESC);
+"""
+
+# Pendentes (as que voltaram por erro só depois da espera, em lease_ate), ou
+# em execução com lease vencido (réplica que morreu no meio). Contas que esta
+# execução do worker já processou ficam de fora (:feitas).
+CLAIM_SQL = """
+    UPDATE etl_account_jobs AS j
+    SET status = 'executando',
+        worker = :worker,
+        tentativas = j.tentativas + 1,
+        iniciado_em = CURRENT_TIMESTAMP,
+        lease_ate = CURRENT_TIMESTAMP + make_interval(secs => :lease_s)
+    FROM (
+        SELECT cycle_key, account_id
+        FROM etl_account_jobs
+        WHERE (
+            (status = 'pendente' AND (lease_ate IS NULL OR lease_ate <= CURRENT_TIMESTAMP))
+            OR (status = 'executando' AND lease_ate < CURRENT_TIMESTAMP)
+        )
+          AND NOT (account_id = ANY(CAST(:feitas AS TEXT[])))
+        ORDER BY cycle_key, prioridade DESC, account_id
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    ) AS proximo
+    WHERE j.cycle_key = proximo.cycle_key AND j.account_id = proximo.account_id
+    RETURNING j.cycle_key, j.account_id, j.tipo
+"""
+
+STATUS_FINAL = {"ok": "concluida", "erro": "erro", "adiada": "adiada"}
+
+# Job com erro volta para a fila até JOB_MAX_ATTEMPTS tentativas no total,
+# esperando JOB_RETRY_DELAY_S entre elas (erro da API costuma ser limite de uso)
+JOB_MAX_ATTEMPTS = int(os.getenv("ETL_JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_DELAY_S = float(os.getenv("ETL_JOB_RETRY_DELAY_S", "300"))
+
+JOBS_RETENTION_DAYS = int(os.getenv("ETL_JOBS_RETENTION_DAYS", "7"))
+
+
+def cycle_key(interval_min: int, agora: datetime | None = None) -> str:
+    """Chave do ciclo: o início da janela de `interval_min` minutos em que `agora` cai.
+
+    Réplicas que sobem em momentos diferentes dentro da mesma janela geram a
+    mesma chave e, portanto, enfileiram os mesmos jobs (sem duplicar).
+    """
+    agora = agora or datetime.now()
+    meia_noite = agora.replace(hour=0, minute=0, second=0, microsecond=0)
+    minutos = agora.hour * 60 + agora.minute
+    inicio = meia_noite + timedelta(minutes=minutos - minutos % max(1, interval_min))
+    return inicio.strftime("%Y-%m-%dT%H:%M")
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class AccountQueue:
+    """Fila de contas no Postgres para várias réplicas do ETL.
+
+    - enqueue(): cria os jobs do ciclo (ON CONFLICT DO NOTHING). Contas com
+      job ainda pendente/em execução de um ciclo anterior não são duplicadas,
+      e as adiadas no ciclo anterior entram com prioridade.
+    - claim(): pega o próximo job com FOR UPDATE SKIP LOCKED (réplicas nunca
+      esperam umas pelas outras nem pegam o mesmo job) e o arrenda por
+      lease_s segundos; se a réplica morrer, o job volta para a fila.
+    - complete(): grava o status final (concluida/erro/adiada). Job com
+      erro volta a 'pendente' (com espera) até JOB_MAX_ATTEMPTS tentativas.
+    """
+
+    def __init__(self, engine, worker_id: str | None = None):
+        self.engine = engine
+        self.worker_id = worker_id or default_worker_id()
+        self._table_ready = False
+
+    def _ensure_table(self, conn) -> None:
+        # Uma vez por processo: o CREATE INDEX trava a tabela contra os claims.
+        # A trava evita a corrida de CREATE TABLE entre réplicas subindo juntas.
+        if not self._table_ready:
+            conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('etl_account_jobs'))"))
+            conn.execute(text(ACCOUNT_JOBS_DDL))
+            self._table_ready = True
+
+    def enqueue(self, key: str, ads_accounts: list[str], ig_accounts: list[str]) -> int:
+        """Enfileira as contas do ciclo `key`. Retorna quantos jobs novos foram criados."""
+        contas = [(a, "ads") for a in ads_accounts] + [(a, "instagram") for a in ig_accounts]
+        if not contas:
+            return 0
+        ids = [a for a, _ in contas]
+
+        with self.engine.begin() as conn:
+            # Serializa enfileiradores concorrentes (só dentro desta transação)
+            conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('etl_account_jobs'))"))
+            self._ensure_table(conn)
+
+            conn.execute(
+                text(
+                    "DELETE FROM etl_account_jobs "
+                    "WHERE criado_em < CURRENT_TIMESTAMP - make_interval(days => :dias)"
+                ),
+                {"dias": JOBS_RETENTION_DAYS},
+            )
+            em_aberto = {
+                row[0]
+                for row in conn.execute(
+                    text(
+                        "SELECT account_id FROM etl_account_jobs "
+                        "WHERE account_id = ANY(:ids) AND status IN ('pendente', 'executando')"
+                    ),
+                    {"ids": ids},
+                )
+            }
+            prioritarias = {
+                row[0]
+                for row in conn.execute(
+                    text(
+                        "UPDATE etl_account_jobs SET status = 'reenfileirada' "
+                        "WHERE account_id = ANY(:ids) AND status = 'adiada' "
+                        "RETURNING account_id"
+                    ),
+                    {"ids": ids},
+                )
+            }
+
+            novos = [
+                {
+                    "cycle_key": key,
+                    "account_id": account_id,
+                    "tipo": tipo,
+                    "prioridade": 1 if account_id in prioritarias else 0,
+                }
+                for account_id, tipo in contas
+                if account_id not in em_aberto
+            ]
+            if not novos:
+                return 0
+            result = conn.execute(
+                text(
+                    "INSERT INTO etl_account_jobs (cycle_key, account_id, tipo, prioridade) "
+                    "VALUES (:cycle_key, :account_id, :tipo, :prioridade) "
+                    "ON CONFLICT (cycle_key, account_id) DO NOTHING"
+                ),
+                novos,
+            )
+            return result.rowcount
+
+    def claim(self, lease_s: float, skip: list[str] | None = None) -> tuple[str, str, str] | None:
+        """Arrenda o próximo job livre. Retorna (cycle_key, account_id, tipo) ou None.
+
+        Args:
+            lease_s: Duração do arrendamento.
+            skip: Contas a ignorar (as que o worker já processou nesta execução:
+                a nova tentativa de uma que falhou fica para outra execução).
+        """
+        with self.engine.begin() as conn:
+            self._ensure_table(conn)
+            row = conn.execute(
+                text(CLAIM_SQL),
+                {"worker": self.worker_id, "lease_s": lease_s, "feitas": list(skip or [])},
+            ).first()
+        return tuple(row) if row else None
+
+    def complete(
+        self, job: tuple[str, str, str], status: str, erro: str | None = None
+    ) -> str | None:
+        """Finaliza um job com o status da conta no RunRecord (ok/erro/adiada).
+
+        Com erro e tentativas sobrando, o job volta a 'pendente' e só pode ser
+        pego de novo depois de JOB_RETRY_DELAY_S.
+
+        Returns:
+            Status gravado ('pendente' se voltou para a fila), ou None se o job
+            não era mais desta réplica (lease vencido e retomado por outra).
+        """
+        key, account_id, _ = job
+        with self.engine.begin() as conn:
+            return conn.execute(
+                text(
+                    "UPDATE etl_account_jobs SET "
+                    "status = CASE WHEN :status = 'erro' AND tentativas < :max "
+                    "THEN 'pendente' ELSE :status END, "
+                    "lease_ate = CASE WHEN :status = 'erro' AND tentativas < :max "
+                    "THEN CURRENT_TIMESTAMP + make_interval(secs => :espera) ELSE lease_ate END, "
+                    "finalizado_em = CURRENT_TIMESTAMP, erro = :erro "
+                    "WHERE cycle_key = :key AND account_id = :account_id AND worker = :worker "
+                    "RETURNING status"
+                ),
+                {
+                    "status": STATUS_FINAL.get(status, "erro"),
+                    "max": JOB_MAX_ATTEMPTS,
+                    "espera": JOB_RETRY_DELAY_S,
+                    "erro": erro,
+                    "key": key,
+                    "account_id": account_id,
+                    "worker": self.worker_id,
+                },
+            ).scalar()
+
+    def pending(self) -> int:
+        """Jobs ainda na fila (pendentes ou em execução)."""
+        with self.engine.begin() as conn:
+            self._ensure_table(conn)
+            return conn.execute(
+                text(
+                    "SELECT COUNT(*) FROM etl_account_jobs "
+                    "WHERE status IN ('pendente', 'executando')"
+                )
+            ).scalar()
@@ -0,0 +1,126 @@
+import json
+import os
+from functools import lru_cache
+
+
+# Mapeamento action_type → coluna de negócio. Padrão: action_mapping.json ao
+# lado deste módulo; ETL_ACTION_MAPPING aponta para outro arquivo (mesmo formato).
+MAPPING_PATH = os.getenv(
+    "ETL_ACTION_MAPPING", os.path.join(os.path.dirname(__file__), "action_mapping.json")
+)
+
+# Campo da API de onde saem as actions quando a coluna não diz outro
+CAMPO_PADRAO = "actions"
+
+
+def _conta(account_id) -> str:
+    """A API devolve account_id sem o prefixo act_; o config aceita os dois."""
+    return str(account_id).removeprefix("act_")
+
+
+def _validate(colunas: dict, origem: str) -> None:
+    for coluna, definicao in colunas.items():
+        if not isinstance(definicao.get("tipos"), list):
+            raise ValueError(
+                f"Mapeamento de actions ({origem}): coluna '{coluna}' sem lista 'tipos'"
+            )
+
+
+def compile_index(colunas: dict) -> dict[str, dict[str, tuple[str, ...]]]:
+    """Compila as definições de colunas num índice {campo: {action_type: colunas}}.
+
+    Um action_type que alimenta mais de uma coluna aparece uma vez só no
+    índice, apontando para todas elas.
+
+    Args:
+        colunas: {coluna: {"tipos": [...], "campo": "actions"}}.
+
+    Returns:
+        Índice por campo da API, com as colunas de destino de cada action_type.
+    """
+    index: dict[str, dict[str, list[str]]] = {}
+    for coluna, definicao in colunas.items():
+        campo = index.setdefault(definicao.get("campo", CAMPO_PADRAO), {})
+        for tipo in definicao["tipos"]:
+            campo.setdefault(tipo, []).append(coluna)
+    return {
+        campo: {tipo: tuple(destinos) for tipo, destinos in tipos.items()}
+        for campo, tipos in index.items()
+    }
+
+
+class ActionMapping:
+    """Mapeamento declarativo de action_types para colunas, compilado uma vez.
+
+    Formato (JSON):
+        {
+          "colunas": {"lead_site": {"tipos": ["onsite_web_lead", ...]},
+                      "videoview_50": {"campo": "video_p50_watched_actions",
+                                       "tipos": ["video_view"]}, ...},
+          "clientes": {"act_123": {"lead_site": {"tipos": [...]}}}
+        }
+
+    Cada entrada de "clientes" substitui a definição das colunas indicadas só
+    para aquela conta; as colunas em si são sempre as do mapeamento padrão
+    (são as colunas da tabela).
+
+    Raises:
+        ValueError: Se um override citar coluna inexistente ou faltar "tipos".
+    """
+
+    def __init__(self, mapping: dict):
+        colunas = mapping["colunas"]
+        _validate(colunas, "padrão")
+
+        self.columns = list(colunas)
+        self._default = compile_index(colunas)
+        self._clientes = {}
+        for conta, overrides in mapping.get("clientes", {}).items():
+            desconhecidas = set(overrides) - set(colunas)
+            if desconhecidas:
+                raise ValueError(
+                    f"Mapeamento de actions: override de {conta} cita colunas "
+                    f"inexistentes {sorted(desconhecidas)}"
+                )
+            _validate(overrides, conta)
+            self._clientes[_conta(conta)] = compile_index({**colunas, **overrides})
+
+    @classmethod
+    def from_file(cls, path: str = MAPPING_PATH) -> "ActionMapping":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    @property
+    def has_overrides(self) -> bool:
+        return bool(self._clientes)
+
+    def index_for(self, account_id=None) -> dict[str, dict[str, tuple[str, ...]]]:
+        """Índice da conta (com os overrides dela) ou o padrão."""
+        return self._clientes.get(_conta(account_id), self._default)
+
+    @property
+    def fields(self) -> list[str]:
+        """Campos da API lidos por alguma conta (actions, video_p50..., ...)."""
+        campos = dict.fromkeys(self._default)
+        for index in self._clientes.values():
+            campos.update(dict.fromkeys(index))
+        return list(campos)
+
+    def action_types(self) -> list[str]:
+        """Todos os action_types usados por alguma conta (ordenados)."""
+        tipos = set()
+        for index in [self._default, *self._clientes.values()]:
+            for por_tipo in index.values():
+                tipos.update(por_tipo)
+        return sorted(tipos)
+
+
+@lru_cache(maxsize=None)
+def default_mapping() -> ActionMapping:
+    """Mapeamento de MAPPING_PATH, lido e compilado uma vez por processo."""
+    return ActionMapping.from_file()
+
+
+def used_action_types() -> list[str]:
+    """action_types que o DataCleaner usa (filtro enviado à API)."""
+    return default_mapping().action_types()
@@ -1,11 +1,40 @@
 import hashlib
 import pandas as pd
 
+from src.ingestion.profiles import get_profile
+from src.transformation.action_mapping import ActionMapping, default_mapping
+
+# Coluna limpa ← campo da API (só as presentes nas dimensões do perfil)
+CAMPOS_TEXTO = {
+    "id_anuncio": "ad_id",
+    "data_registro": "date_start",
+    "account_id": "account_id",
+    "nome_conta": "account_name",
+    "id_campanha": "campaign_id",
+    "campanha": "campaign_name",
+    "anuncio": "ad_name",
+}
+
+
+def _numeric(df: pd.DataFrame, campo: str) -> pd.Series:
+    """Campo numérico da API como Series (0 onde falta ou se o campo não veio)."""
+    if campo not in df.columns:
+        return pd.Series(0, index=df.index)
+    return pd.to_numeric(df[campo], errors="coerce").fillna(0)
+
 
 class DataCleaner:
-    """Transforma dados brutos da Meta Marketing API em DataFrame normalizado."""
+    """Transforma dados brutos da Meta Marketing API em DataFrame normalizado.
+
+    Args:
+        mapping: Mapeamento action_type → coluna (padrão: action_mapping.json,
+            ou o arquivo de ETL_ACTION_MAPPING).
+    """
 
-    def extract_action_value(self, actions_list: list, action_types: list[str]) -> int:
+    def __init__(self, mapping: ActionMapping | None = None):
+        self.mapping = mapping or default_mapping()
+
+    def extract_action_value(self, actions_list: list, action_types) -> int:
         """Soma valores de actions filtrados por tipo.
 
         Args:
@@ -17,13 +46,54 @@ class DataCleaner:
         """
         if not isinstance(actions_list, list):
             return 0
+        tipos = set(action_types)
         return sum(
             int(float(a.get("value", 0)))
             for a in actions_list
-            if a.get("action_type") in action_types
+            if a.get("action_type") in tipos
         )
 
-    def transform(self, raw_data: list[dict]) -> pd.DataFrame:
+    def map_actions(self, df: pd.DataFrame) -> dict[str, list[int]]:
+        """Soma as actions de cada linha nas colunas de negócio, numa passada só.
+
+        Cada lista de actions (e de video_p50/p75) é percorrida uma vez; o
+        índice compilado diz para quais colunas vai cada action_type, então
+        uma coluna nova no mapeamento não acrescenta outra varredura.
+
+        Args:
+            df: DataFrame bruto (uma linha por insight).
+
+        Returns:
+            {coluna: valores por linha}, na ordem de df.
+        """
+        n = len(df)
+        totais = {col: [0] * n for col in self.mapping.columns}
+        contas = df["account_id"] if "account_id" in df.columns else [None] * n
+
+        for campo in self.mapping.fields:
+            if campo not in df.columns:
+                continue
+            padrao = self.mapping.index_for().get(campo)
+            for i, (acoes, conta) in enumerate(zip(df[campo], contas)):
+                # Garante lista: células ausentes chegam como NaN
+                if not isinstance(acoes, list):
+                    continue
+                index = (
+                    self.mapping.index_for(conta).get(campo)
+                    if self.mapping.has_overrides
+                    else padrao
+                )
+                if not index:
+                    continue
+                for acao in acoes:
+                    destinos = index.get(acao.get("action_type"))
+                    if destinos:
+                        valor = int(float(acao.get("value", 0)))
+                        for col in destinos:
+                            totais[col][i] += valor
+        return totais
+
+    def transform(self, raw_data: list[dict], profile: dict | None = None) -> pd.DataFrame:
         """Recebe JSON bruto da API, retorna DataFrame com colunas normalizadas.
 
         Fluxo:
@@ -34,6 +104,9 @@ class DataCleaner:
 
         Args:
             raw_data: Lista de dicts retornada por MetaExtractor.get_ad_insights().
+            profile: Perfil de extração usado na coleta (padrão:
+                ETL_EXTRACTION_PROFILE). Define as colunas de dimensão e a
+                chave do hash_id.
 
         Returns:
             DataFrame pronto para envio ao PostgresLoader.
@@ -41,124 +114,74 @@ class DataCleaner:
         if not raw_data:
             return pd.DataFrame()
 
+        profile = profile or get_profile()
+        dimensoes = profile["dimensions"]
+
         df = pd.DataFrame(raw_data)
         clean_df = pd.DataFrame()
 
         # -----------------------------------------------------------------
         # 1. CAMPOS DE TEXTO (IDs, Nomes e Breakdowns)
         # -----------------------------------------------------------------
-        clean_df["id_anuncio"] = df["ad_id"]
-        clean_df["data_registro"] = df["date_start"]
-        clean_df["account_id"] = df["account_id"]
-        clean_df["nome_conta"] = df["account_name"]
-        clean_df["campanha"] = df["campaign_name"]
-        clean_df["anuncio"] = df["ad_name"]
-        clean_df["plataforma"] = df.get(
-            "publisher_platform", pd.Series("unknown", index=df.index)
-        ).fillna("unknown")
-        clean_df["posicionamento"] = df.get(
-            "platform_position", pd.Series("unknown", index=df.index)
-        ).fillna("unknown")
+        for col, campo in CAMPOS_TEXTO.items():
+            if col in dimensoes:
+                # campaign_id falta em payloads gravados antes dele (replay)
+                clean_df[col] = df[campo] if campo in df.columns else None
+        if "plataforma" in dimensoes:
+            clean_df["plataforma"] = df.get(
+                "publisher_platform", pd.Series("unknown", index=df.index)
+            ).fillna("unknown")
+        if "posicionamento" in dimensoes:
+            clean_df["posicionamento"] = df.get(
+                "platform_position", pd.Series("unknown", index=df.index)
+            ).fillna("unknown")
 
         # -----------------------------------------------------------------
         # 2. MÉTRICAS NUMÉRICAS DIRETAS
         # -----------------------------------------------------------------
-        clean_df["valor_gasto"] = (
-            pd.to_numeric(df.get("spend"), errors="coerce").fillna(0).round(2)
-        )
-        clean_df["impressoes"] = (
-            pd.to_numeric(df.get("impressions"), errors="coerce").fillna(0).astype(int)
-        )
+        clean_df["valor_gasto"] = _numeric(df, "spend").round(2)
+        clean_df["impressoes"] = _numeric(df, "impressions").astype(int)
 
         # -----------------------------------------------------------------
-        # 3. TRATAMENTO SEGURO DE ACTIONS
+        # 3. ACTIONS → COLUNAS DE NEGÓCIO (action_mapping.json)
         # -----------------------------------------------------------------
-        # Garante que cada célula seja uma lista, nunca NaN ou string
-        actions_safe = df.get("actions", pd.Series(dtype=object)).apply(
-            lambda x: x if isinstance(x, list) else []
-        )
+        # Cliques, leads (formulário/site/mensagem), seguidores e vídeo
+        # (3s em actions; 50%/75% nos campos video_p50/p75_watched_actions)
+        for col, valores in self.map_actions(df).items():
+            clean_df[col] = valores
 
-        # --- CLIQUES (inline raiz + link_click de actions) ---
-        cliques_inline = (
-            pd.to_numeric(df.get("inline_link_clicks"), errors="coerce")
-            .fillna(0)
-            .astype(int)
-        )
-        cliques_actions = actions_safe.apply(
-            lambda x: self.extract_action_value(x, ["link_click"])
-        )
-        clean_df["clique_link"] = cliques_inline + cliques_actions
-
-        # --- LEADS (3 origens unificadas) ---
-        # Formulário: leads gerados dentro do Facebook/Instagram
-        clean_df["lead_formulario"] = actions_safe.apply(
-            lambda x: self.extract_action_value(
-                x, ["lead", "onsite_conversion.lead_grouped", "onsite_conversion.lead"]
-            )
-        )
-        # Site/Pixel: leads capturados via pixel no site externo
-        clean_df["lead_site"] = actions_safe.apply(
-            lambda x: self.extract_action_value(
-                x, ["onsite_web_lead", "offsite_conversion.fb_pixel_lead"]
-            )
-        )
-        # Mensagem: leads via WhatsApp/Direct/Messenger
-        clean_df["lead_mensagem"] = actions_safe.apply(
-            lambda x: self.extract_action_value(
-                x,
-                [
-                    "onsite_conversion.messaging_first_reply",
-                    "onsite_conversion.total_messaging_connection",
-                ],
-            )
-        )
-        # Total consolidado
+        # Cliques: inline_link_clicks (raiz, às vezes ausente) + link_click de actions
+        clean_df["clique_link"] += _numeric(df, "inline_link_clicks").astype(int)
+
+        # Total consolidado de leads (3 origens)
         clean_df["lead"] = (
             clean_df["lead_formulario"]
             + clean_df["lead_site"]
             + clean_df["lead_mensagem"]
         )
 
-        # --- SEGUIDORES (Instagram + Facebook) ---
-        clean_df["seguidores_instagram"] = actions_safe.apply(
-            lambda x: self.extract_action_value(
-                x,
-                [
-                    "onsite_conversion.post_save_follow",
-                    "instagram_follower_count_total",
-                    "page_like",
-                ],
-            )
-        )
-
-        # --- VIDEO VIEWS ---
-        # 3s: vem como 'video_view' dentro da lista de actions
-        clean_df["videoview_3s"] = actions_safe.apply(
-            lambda x: self.extract_action_value(x, ["video_view"])
-        )
-        # 50% e 75%: vêm como campos raiz do DataFrame (são listas de actions)
-        for col_name, meta_field in [
-            ("videoview_50", "video_p50_watched_actions"),
-            ("videoview_75", "video_p75_watched_actions"),
-        ]:
-            if meta_field in df.columns:
-                clean_df[col_name] = df[meta_field].apply(
-                    lambda x: (
-                        self.extract_action_value(x, ["video_view"])
-                        if isinstance(x, list)
-                        else 0
-                    )
-                )
-            else:
-                clean_df[col_name] = 0
-
         # -----------------------------------------------------------------
         # 4. HASH ID ÚNICO (Chave do UPSERT)
         # -----------------------------------------------------------------
+        clean_df["hash_id"] = self.build_hash_ids(clean_df, profile["key"])
+
+        return clean_df
+
+    def build_hash_ids(self, clean_df: pd.DataFrame, key: list[str] | None = None) -> pd.Series:
+        """Gera o hash_id (md5 das colunas-chave unidas por '_').
+
+        Args:
+            clean_df: DataFrame com as colunas de `key`.
+            key: Colunas da chave do perfil (padrão: anúncio + data +
+                plataforma + posicionamento, a chave do perfil granular).
+
+        Returns:
+            Series de hashes hexadecimais alinhada ao índice de clean_df.
+        """
+        key = key or get_profile("granular")["key"]
+
         def generate_hash(row: pd.Series) -> str:
-            base = f"{row['id_anuncio']}_{row['data_registro']}_{row['plataforma']}_{row['posicionamento']}"
+            base = "_".join(str(row[col]) for col in key)
             return hashlib.md5(base.encode()).hexdigest()
 
-        clean_df["hash_id"] = clean_df.apply(generate_hash, axis=1)
-
-        return clean_df
+        return clean_df.apply(generate_hash, axis=1)
@@ -0,0 +1,28 @@
+import time
+
+
+class DeadlineExceeded(Exception):
+    """Prazo do ciclo ou da conta estourado: a conta é adiada, não marcada como erro."""
+
+
+class Deadline:
+    """Prazo absoluto (relógio monotônico) para cancelamento cooperativo.
+
+    O código longo (paginação da API, loop de contas) consulta `expired` entre
+    unidades de trabalho; nada é interrompido no meio de uma requisição ou
+    de uma carga.
+
+    Args:
+        seconds: Tempo disponível a partir de agora (None ou 0 = sem limite).
+        parent: Prazo externo que também vale (ex: o do ciclo para uma conta);
+            o efetivo é o que vencer primeiro.
+    """
+
+    def __init__(self, seconds: float | None = None, parent: "Deadline | None" = None):
+        self.at = time.monotonic() + seconds if seconds else None
+        if parent is not None and parent.at is not None:
+            self.at = parent.at if self.at is None else min(self.at, parent.at)
+
+    @property
+    def expired(self) -> bool:
+        return self.at is not None and time.monotonic() >= self.at
@@ -0,0 +1,37 @@
+import os
+
+
+GRAPH_API_VERSION = "v25.0"
+DEFAULT_GRAPH_URL = "https://graph.facebook.com"
+
+
+def graph_url() -> str:
+    """URL base da Graph API, sem barra final.
+
+    Pode ser trocada por META_GRAPH_URL (ex: http://localhost:8765 para o
+    servidor falso de scripts/benchmarks/fake_graph_api.py).
+    """
+    return os.getenv("META_GRAPH_URL", DEFAULT_GRAPH_URL).rstrip("/")
+
+
+def init_facebook_api(access_token: str):
+    """Inicializa o SDK da Meta (import tardio) apontando para graph_url().
+
+    O facebook_business só é importado aqui, então scripts que falham antes
+    (token ausente, conta inválida) não pagam o custo do import do SDK. A
+    sessão do SDK usa o pool HTTP compartilhado de src.utils.http.
+
+    Returns:
+        Instância FacebookAdsApi registrada como padrão.
+    """
+    from facebook_business.api import FacebookAdsApi
+    from facebook_business.session import FacebookSession
+
+    from src.utils.http import mount_shared_adapter
+
+    FacebookSession.GRAPH = graph_url()
+    session = FacebookSession(access_token=access_token)
+    mount_shared_adapter(session.requests)
+    api = FacebookAdsApi(session)
+    FacebookAdsApi.set_default_api(api)
+    return api
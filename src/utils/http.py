@@ -0,0 +1,149 @@
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# Timeouts (connect, leitura): nenhuma chamada HTTP do ETL fica pendurada para sempre
+HTTP_CONNECT_TIMEOUT_S = float(os.getenv("ETL_HTTP_CONNECT_TIMEOUT_S", "5"))
+HTTP_READ_TIMEOUT_S = float(os.getenv("ETL_HTTP_READ_TIMEOUT_S", "60"))
+
+# Retentativas com backoff para falhas de conexão e 5xx (só métodos idempotentes
+# em erro de leitura/status; POST só é repetido se a conexão nem abriu)
+HTTP_RETRIES = int(os.getenv("ETL_HTTP_RETRIES", "3"))
+HTTP_BACKOFF_S = float(os.getenv("ETL_HTTP_BACKOFF_S", "0.5"))
+
+# Conexões mantidas abertas por host (keep-alive)
+HTTP_POOL_SIZE = int(os.getenv("ETL_HTTP_POOL_SIZE", "10"))
+
+USER_AGENT = "etl-vetorial-meta"
+
+_lock = threading.Lock()
+_adapter: HTTPAdapter | None = None
+_session: requests.Session | None = None
+
+# Tempo dormido em backoff/Retry-After, por thread (cada conta extrai numa só)
+_espera = threading.local()
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter com timeout padrão (quem chama ainda pode passar o seu)."""
+
+    def __init__(self, *args, timeout: tuple[float, float] | None = None, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+class MeteredRetry(Retry):
+    """Retry que mede o tempo dormido entre as tentativas.
+
+    Cobre o backoff exponencial (5xx, conexão) e a espera pedida por
+    Retry-After em 429/503. O total fica na thread que fez a chamada; veja
+    backoff_wait_s().
+    """
+
+    def sleep(self, response=None):
+        inicio = time.perf_counter()
+        try:
+            super().sleep(response)
+        finally:
+            _espera.total = backoff_wait_s() + time.perf_counter() - inicio
+
+
+def backoff_wait_s() -> float:
+    """Segundos que a thread atual já passou dormindo em retentativas HTTP."""
+    return getattr(_espera, "total", 0.0)
+
+
+def build_adapter(
+    retries: int = HTTP_RETRIES,
+    timeout: tuple[float, float] = (HTTP_CONNECT_TIMEOUT_S, HTTP_READ_TIMEOUT_S),
+    pool_size: int = HTTP_POOL_SIZE,
+) -> TimeoutHTTPAdapter:
+    """Adapter com pool de conexões, timeout padrão e retry com backoff.
+
+    Respeita Retry-After em 429/503 e mede a espera (MeteredRetry). Depois das retentativas a resposta de
+    erro é devolvida (raise_on_status=False), e quem chama decide com
+    raise_for_status() ou lendo o JSON de erro da Graph API.
+    """
+    retry = MeteredRetry(
+        total=retries,
+        backoff_factor=HTTP_BACKOFF_S,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    return TimeoutHTTPAdapter(
+        timeout=timeout,
+        max_retries=retry,
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+    )
+
+
+def shared_adapter() -> TimeoutHTTPAdapter:
+    """Adapter único do processo: todas as sessões montadas nele dividem o pool."""
+    global _adapter
+    with _lock:
+        if _adapter is None:
+            _adapter = build_adapter()
+        return _adapter
+
+
+def mount_shared_adapter(session: requests.Session) -> requests.Session:
+    """Monta o adapter compartilhado numa sessão existente (ex: a do SDK da Meta).
+
+    Cada MetaExtractor cria a própria sessão (os hooks de contagem são por
+    conta), mas as conexões TCP/TLS abertas continuam no pool e são
+    reaproveitadas pela conta seguinte.
+    """
+    adapter = shared_adapter()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Accept-Encoding"] = "gzip, deflate"
+    return session
+
+
+def wire_bytes(response: requests.Response) -> int | None:
+    """Bytes do corpo como vieram da rede (comprimidos, se gzip).
+
+    `len(response.content)` é o corpo já descomprimido: não mostra o ganho do
+    gzip. Usa o Content-Length ou, sem ele, o que o urllib3 leu do socket
+    (`raw.tell()`, contado antes da descompressão; o urllib3 não conta as
+    respostas chunked).
+
+    Returns:
+        Bytes na rede, ou None se a resposta não permite saber.
+    """
+    tamanho = response.headers.get("Content-Length", "")
+    if tamanho.isdigit():
+        return int(tamanho)
+    try:
+        lidos = response.raw.tell()
+    except (AttributeError, OSError):
+        return None
+    return lidos if isinstance(lidos, int) and lidos > 0 else None
+
+
+def get_session() -> requests.Session:
+    """Sessão HTTP compartilhada (keep-alive, gzip, timeouts e retry).
+
+    Para chamadas fora do SDK: Instagram Graph API, webhook do Discord,
+    scripts de diagnóstico.
+    """
+    global _session
+    with _lock:
+        if _session is None:
+            session = requests.Session()
+            session.headers["User-Agent"] = USER_AGENT
+            _session = session
+    return mount_shared_adapter(_session)
@@ -0,0 +1,195 @@
+import os
+import time
+import uuid
+import resource
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+
+STAGES = ("extract", "transform", "load")
+
+
+def current_rss_mb() -> float:
+    """RSS atual do processo em MB (lido de /proc; cai para o pico se indisponível)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    """Pico de RSS do processo em MB (ru_maxrss vem em KB no Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class RunRecord:
+    """Registro estruturado de um ciclo do ETL.
+
+    Acumula, por conta, o tempo de cada etapa (extract/transform/load), linhas,
+    bytes baixados, chamadas à API e pico de memória. Cada conta vira uma linha
+    na tabela `etl_runs` (ver PostgresLoader.save_run_record).
+
+    Thread-safe: os estágios concorrentes (_run_ads_staged) registram contas
+    de várias threads ao mesmo tempo.
+    """
+
+    def __init__(self):
+        self.run_id = uuid.uuid4().hex
+        self.started_at = datetime.now()
+        self.finished_at = None
+        self.accounts: dict[str, dict] = {}
+        # Intervalo de data_registro gravado por account_id da tabela fato
+        # (recorte do refresh incremental dos rollups)
+        self.touched: dict[str, tuple[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def account(self, account_id: str, tipo: str = "ads") -> dict:
+        """Retorna (criando se preciso) as métricas de uma conta."""
+        with self._lock:
+            return self._account(account_id, tipo)
+
+    def _account(self, account_id: str, tipo: str = "ads") -> dict:
+        if account_id not in self.accounts:
+            self.accounts[account_id] = {
+                "tipo": tipo,
+                "stages": {stage: 0.0 for stage in STAGES},
+                "linhas": 0,
+                # Linhas inseridas/alteradas de fato (feed de mudanças)
+                "linhas_alteradas": 0,
+                "bytes_baixados": 0,
+                "chamadas_api": 0,
+                "pausa_entre_contas_s": 0.0,
+                # Dormido em backoff/Retry-After das chamadas HTTP (throttling)
+                "espera_throttle_s": 0.0,
+                "erros_api": {},
+                "pico_rss_mb": 0.0,
+                "status": "ok",
+                "erro": None,
+                # Resumo de gasto/mudança usado pela agenda adaptativa
+                "atividade": None,
+            }
+        return self.accounts[account_id]
+
+    @contextmanager
+    def stage(self, account_id: str, stage: str):
+        """Cronometra uma etapa da conta (acumula se chamada mais de uma vez)."""
+        metrics = self.account(account_id)
+        inicio = time.perf_counter()
+        try:
+            yield metrics
+        finally:
+            duracao, pico = time.perf_counter() - inicio, peak_rss_mb()
+            with self._lock:
+                metrics["stages"][stage] += duracao
+                metrics["pico_rss_mb"] = max(metrics["pico_rss_mb"], pico)
+
+    def add(self, account_id: str, **counters) -> None:
+        """Soma contadores (linhas, bytes_baixados, chamadas_api...) à conta."""
+        with self._lock:
+            metrics = self._account(account_id)
+            for key, value in counters.items():
+                metrics[key] += value
+
+    def add_api_errors(self, account_id: str, errors: dict[str, int]) -> None:
+        """Soma contagens de erros da API por código (ex: {'17': 2})."""
+        with self._lock:
+            erros_api = self._account(account_id)["erros_api"]
+            for code, total in errors.items():
+                erros_api[code] = erros_api.get(code, 0) + total
+
+    def share_peak_rss(self, account_ids) -> None:
+        """Dá a todas as contas o maior pico de RSS entre elas.
+
+        O pico é do processo: contas processadas ao mesmo tempo (estágios
+        concorrentes) medem umas às outras, então o único valor honesto para
+        cada uma é o pico do grupo.
+        """
+        with self._lock:
+            contas = [self.accounts[a] for a in account_ids if a in self.accounts]
+            pico = max((m["pico_rss_mb"] for m in contas), default=0.0)
+            for metrics in contas:
+                metrics["pico_rss_mb"] = pico
+
+    def touch(self, account_id: str, inicio: str, fim: str) -> None:
+        """Registra (ampliando, se já houver) o intervalo de datas gravado da conta."""
+        with self._lock:
+            if account_id in self.touched:
+                anterior = self.touched[account_id]
+                inicio, fim = min(inicio, anterior[0]), max(fim, anterior[1])
+            self.touched[account_id] = (inicio, fim)
+
+    def fail(self, account_id: str, erro: str) -> None:
+        with self._lock:
+            metrics = self._account(account_id)
+            metrics["status"] = "erro"
+            metrics["erro"] = erro
+
+    def defer(self, account_id: str, motivo: str, tipo: str = "ads") -> None:
+        """Marca a conta como adiada (prazo estourado; volta no próximo ciclo)."""
+        with self._lock:
+            metrics = self._account(account_id, tipo=tipo)
+            metrics["status"] = "adiada"
+            metrics["erro"] = motivo
+
+    @property
+    def deferred(self) -> list[str]:
+        return [a for a, m in self.accounts.items() if m["status"] == "adiada"]
+
+    def finish(self) -> None:
+        self.finished_at = datetime.now()
+
+    @property
+    def duration(self) -> float:
+        fim = self.finished_at or datetime.now()
+        return (fim - self.started_at).total_seconds()
+
+    def stage_totals(self) -> dict[str, float]:
+        """Tempo total por etapa somando todas as contas."""
+        return {
+            stage: sum(m["stages"][stage] for m in self.accounts.values())
+            for stage in STAGES
+        }
+
+    def to_rows(self) -> list[dict]:
+        """Uma linha por conta, no formato da tabela etl_runs."""
+        rows = []
+        for account_id, m in self.accounts.items():
+            total = sum(m["stages"].values())
+            rows.append(
+                {
+                    "run_id": self.run_id,
+                    "iniciado_em": self.started_at,
+                    "finalizado_em": self.finished_at,
+                    "ciclo_duracao_s": round(self.duration, 3),
+                    "account_id": account_id,
+                    "tipo": m["tipo"],
+                    "extract_s": round(m["stages"]["extract"], 3),
+                    "transform_s": round(m["stages"]["transform"], 3),
+                    "load_s": round(m["stages"]["load"], 3),
+                    "linhas": m["linhas"],
+                    "linhas_por_seg": round(m["linhas"] / total, 1) if total else 0.0,
+                    "linhas_alteradas": m["linhas_alteradas"],
+                    "bytes_baixados": m["bytes_baixados"],
+                    "chamadas_api": m["chamadas_api"],
+                    "pico_rss_mb": round(m["pico_rss_mb"], 1),
+                    "status": m["status"],
+                    "erro": m["erro"],
+                }
+            )
+        return rows
+
+    def summary(self) -> str:
+        """Resumo em texto (uma linha por conta) para o log do ciclo."""
+        linhas = []
+        for row in self.to_rows():
+            linhas.append(
+                f"   {row['account_id']:<22} | E {row['extract_s']:>7.2f}s"
+                f" | T {row['transform_s']:>6.2f}s | L {row['load_s']:>6.2f}s"
+                f" | {row['linhas']:>7} linhas ({row['linhas_por_seg']:.0f}/s,"
+                f" {row['linhas_alteradas']} alteradas)"
+                f" | {row['bytes_baixados'] / 1024:.0f} KB em {row['chamadas_api']} chamadas"
+            )
+        return "\n".join(linhas)
@@ -0,0 +1,135 @@
+import ctypes
+import gc
+import os
+import threading
+
+from src.utils.instrumentation import current_rss_mb, peak_rss_mb
+
+
+# Linhas por bloco de extract → transform → load: no máximo CHUNK_ROWS e no
+# mínimo CHUNK_MIN_ROWS (uma página da API)
+CHUNK_ROWS = int(os.getenv("ETL_CHUNK_ROWS", "20000"))
+CHUNK_MIN_ROWS = int(os.getenv("ETL_CHUNK_MIN_ROWS", "500"))
+
+# Fração do orçamento que o pico de cada bloco deve atingir (o resto é folga
+# para a variação entre contas e para o que não passa pelos blocos)
+ALVO_ORCAMENTO = 0.7
+
+
+def container_limit_mb() -> float | None:
+    """Limite de memória do container (cgroup v2 ou v1), em MB, se houver."""
+    for path in (
+        "/sys/fs/cgroup/memory.max",
+        "/sys/fs/cgroup/memory/memory.limit_in_bytes",
+    ):
+        try:
+            with open(path) as f:
+                valor = f.read().strip()
+        except OSError:
+            continue
+        # "max" (v2) ou um número astronômico (v1) = sem limite
+        if valor.isdigit() and int(valor) < 1 << 50:
+            return int(valor) / (1024 * 1024)
+    return None
+
+
+def default_budget_mb() -> float:
+    """ETL_MEMORY_BUDGET_MB ou 80% do limite do container (400 MB sem limite)."""
+    if os.getenv("ETL_MEMORY_BUDGET_MB"):
+        return float(os.getenv("ETL_MEMORY_BUDGET_MB"))
+    limite = container_limit_mb()
+    return round(limite * 0.8) if limite else 400.0
+
+
+MEMORY_BUDGET_MB = default_budget_mb()
+
+
+def reset_peak_rss() -> bool:
+    """Zera o pico de RSS do processo (VmHWM/ru_maxrss), para medir por conta.
+
+    Usa /proc/self/clear_refs (Linux >= 4.0). Sem ele, o pico medido é o do
+    processo inteiro.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def release_memory() -> None:
+    """Coleta ciclos e devolve ao sistema a memória livre do heap (glibc).
+
+    Sem o malloc_trim, o que pandas/json liberam fica reservado no processo
+    e o RSS não cai entre blocos.
+    """
+    gc.collect()
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+class MemoryBudget:
+    """Dimensiona os blocos de linhas para o pico de RSS ficar abaixo do orçamento.
+
+    Depois de cada bloco, mede quanto ele custou por linha (pico do bloco
+    menos a base que sobra depois de liberar a memória) e calcula o próximo
+    para o pico cair em ALVO_ORCAMENTO do orçamento. O tamanho aprendido vale
+    para as contas seguintes. No piso (CHUNK_MIN_ROWS) o ciclo continua, em
+    blocos pequenos: o objetivo é degradar antes do OOM killer, não abortar.
+
+    Com vários blocos em memória ao mesmo tempo (estágios concorrentes), quem
+    chama informa as linhas em trânsito e quantos blocos cabem no caminho.
+    """
+
+    def __init__(
+        self,
+        budget_mb: float = MEMORY_BUDGET_MB,
+        max_rows: int = CHUNK_ROWS,
+        min_rows: int = CHUNK_MIN_ROWS,
+    ):
+        self.budget_mb = budget_mb
+        self.max_rows = max(max_rows, min_rows)
+        self.min_rows = min_rows
+        self.chunk_rows = self.max_rows
+        self._lock = threading.Lock()
+
+    def adjust(self, rows: int, chunks: int = 1) -> int:
+        """Recalcula o tamanho do bloco depois de um bloco de `rows` linhas.
+
+        Lê o pico do bloco e zera a medição para o próximo (quem registra o
+        pico por conta, RunRecord.stage, já o leu ao fim de cada etapa).
+
+        Args:
+            rows: Linhas em memória durante a medição (o bloco, ou todas as
+                em trânsito entre os estágios).
+            chunks: Blocos que podem estar em memória ao mesmo tempo: o
+                orçamento é dividido entre eles.
+
+        Returns:
+            Linhas do próximo bloco.
+        """
+        with self._lock:
+            pico = peak_rss_mb()
+            release_memory()
+            reset_peak_rss()
+            base = current_rss_mb()
+
+            custo = (pico - base) / rows if rows else 0.0
+            if custo <= 0:
+                return self.chunk_rows
+            ideal = int((ALVO_ORCAMENTO * self.budget_mb - base) / custo / max(chunks, 1))
+            novo = max(self.min_rows, min(self.max_rows, ideal))
+            if novo < self.chunk_rows * 0.8:
+                print(
+                    f"🧠 [Memória] Pico {pico:.0f}/{self.budget_mb:.0f} MB "
+                    f"(base {base:.0f} MB): blocos reduzidos para {novo} linhas"
+                )
+            self.chunk_rows = novo
+            return novo
+
+
+# Orçamento do processo (contas rodam em sequência e dividem o aprendizado)
+budget = MemoryBudget()
@@ -0,0 +1,140 @@
+import os
+import time
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+
+from src.utils.instrumentation import STAGES, RunRecord, peak_rss_mb
+
+
+CYCLE_DURATION = Histogram(
+    "etl_cycle_duration_seconds",
+    "Duração total de cada ciclo do ETL.",
+    buckets=(30, 60, 120, 300, 600, 1200, 1800, 3600, 7200, 14400),
+)
+STAGE_DURATION = Histogram(
+    "etl_stage_duration_seconds",
+    "Duração de cada etapa (extract/transform/load) por conta.",
+    ["stage"],
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+ACCOUNT_STAGE_SECONDS = Gauge(
+    "etl_account_stage_seconds",
+    "Duração da etapa no último ciclo, por conta.",
+    ["account_id", "stage"],
+)
+ROWS_LOADED = Counter(
+    "etl_rows_loaded_total",
+    "Linhas carregadas no Postgres.",
+    ["account_id", "tipo"],
+)
+API_ERRORS = Counter(
+    "etl_api_errors_total",
+    "Erros retornados pela Graph API, por código.",
+    ["code"],
+)
+# Espera de throttling: o sleep do retry HTTP (backoff e Retry-After)
+THROTTLE_WAIT = Counter(
+    "etl_throttle_wait_seconds_total",
+    "Tempo dormido em backoff/Retry-After nas chamadas à Graph API.",
+)
+# Só a pausa fixa entre contas do pipeline (separada do throttling)
+ACCOUNT_PAUSE = Counter(
+    "etl_account_pause_seconds_total",
+    "Pausa fixa entre contas (após cada conta com dados).",
+)
+CYCLES = Counter(
+    "etl_cycles_total",
+    "Ciclos executados, por status.",
+    ["status"],
+)
+LAST_SUCCESS = Gauge(
+    "etl_last_success_timestamp_seconds",
+    "Unix timestamp da última carga bem-sucedida, por conta.",
+    ["account_id"],
+)
+PEAK_RSS = Gauge(
+    "etl_peak_rss_megabytes",
+    "Pico de memória residente do processo no último ciclo (maior entre as contas).",
+)
+ACCOUNTS_DEFERRED = Counter(
+    "etl_accounts_deferred_total",
+    "Contas adiadas para o ciclo seguinte por estouro de prazo.",
+    ["tipo"],
+)
+QUEUE_PENDING = Gauge(
+    "etl_queue_pending_jobs",
+    "Jobs de conta pendentes ou em execução na fila (modo --queue).",
+)
+ALERTS = Counter(
+    "etl_alerts_total",
+    "Digests de alerta do Discord, por resultado (enviado/falha/descartado).",
+    ["resultado"],
+)
+ACCOUNT_INTERVAL = Gauge(
+    "etl_account_interval_minutes",
+    "Intervalo de coleta atual da conta na agenda adaptativa.",
+    ["account_id"],
+)
+
+
+def start_metrics_server() -> None:
+    """Sobe o endpoint /metrics em background (porta em METRICS_PORT; 0 desliga)."""
+    port = int(os.getenv("METRICS_PORT", "9108"))
+    if not port:
+        print("ℹ️ [Metrics] Endpoint desativado (METRICS_PORT=0).")
+        return
+    start_http_server(port)
+    print(f"📈 [Metrics] Prometheus exposto em :{port}/metrics")
+
+
+def observe_run(record: RunRecord) -> None:
+    """Publica no registry do Prometheus as métricas de um ciclo finalizado."""
+    CYCLE_DURATION.observe(record.duration)
+
+    falhas = 0
+    for account_id, m in record.accounts.items():
+        for stage in STAGES:
+            if m["stages"][stage]:
+                STAGE_DURATION.labels(stage).observe(m["stages"][stage])
+            ACCOUNT_STAGE_SECONDS.labels(account_id, stage).set(m["stages"][stage])
+
+        ROWS_LOADED.labels(account_id, m["tipo"]).inc(m["linhas"])
+        ACCOUNT_PAUSE.inc(m["pausa_entre_contas_s"])
+        THROTTLE_WAIT.inc(m["espera_throttle_s"])
+        for code, total in m["erros_api"].items():
+            API_ERRORS.labels(code).inc(total)
+
+        # Conta com erro da API não conta como sucesso, mesmo com linhas carregadas
+        if m["status"] == "ok" and not m["erros_api"]:
+            LAST_SUCCESS.labels(account_id).set(time.time())
+        elif m["status"] == "adiada":
+            ACCOUNTS_DEFERRED.labels(m["tipo"]).inc()
+        else:
+            falhas += 1
+
+    # O pico é zerado a cada conta (src.utils.memory.reset_peak_rss): o do
+    # ciclo é o maior entre as contas
+    PEAK_RSS.set(
+        max([peak_rss_mb(), *(m["pico_rss_mb"] for m in record.accounts.values())])
+    )
+    CYCLES.labels("erro" if falhas else "ok").inc()
+
+
+def observe_crash() -> None:
+    """Conta um ciclo que parou por erro crítico (fora do loop de contas)."""
+    CYCLES.labels("crash").inc()
+
+
+def observe_schedule(rows: list[dict]) -> None:
+    """Publica o intervalo atual de cada conta (saída de AdaptiveScheduler.update)."""
+    for row in rows:
+        ACCOUNT_INTERVAL.labels(row["account_id"]).set(row["intervalo_min"])
+
+
+def observe_queue(pendentes: int) -> None:
+    """Publica o tamanho da fila de contas visto por esta réplica."""
+    QUEUE_PENDING.set(pendentes)
+
+
+def observe_alert(resultado: str) -> None:
+    """Conta um digest de alerta entregue, desistido ou descartado (fila cheia)."""
+    ALERTS.labels(resultado).inc()